@@ -1,5 +1,7 @@
 from abc import ABCMeta, abstractmethod
 
+import numpy as np
+
 
 class FeeModel(object):
     """
@@ -25,4 +27,29 @@ class FeeModel(object):
     def calc_total_cost(self, asset, quantity, consideration, broker=None):
         raise NotImplementedError(
             "Should implement calc_total_cost()"
-        )
\ No newline at end of file
+        )
+
+    def calc_total_costs(self, assets, quantities, considerations, broker=None):
+        """
+        Calculate the total commission and tax of many trades at once.
+        Subclasses whose costs are array arithmetic should override
+        this; by default it calls calc_total_cost() per trade.
+        Parameters
+        ----------
+        assets : `list[str]`
+            The asset symbol strings.
+        quantities : `np.ndarray`
+            The quantities of assets, aligned with assets.
+        considerations : `np.ndarray`
+            Price times quantity of each order.
+        broker : `Broker`, optional
+            An optional Broker reference.
+        Returns
+        -------
+        `np.ndarray`
+            The total commission and tax of each trade.
+        """
+        return np.array([
+            self.calc_total_cost(asset, quantity, consideration, broker)
+            for asset, quantity, consideration in zip(assets, quantities, considerations)
+        ], dtype=np.float64)
\ No newline at end of file
@@ -1,3 +1,5 @@
+import numpy as np
+
 from qfengine.broker.fee_model.fee_model import FeeModel
 
 
@@ -85,3 +87,25 @@ class PercentFeeModel(FeeModel):
         commission = self._calc_commission(asset, quantity, consideration, broker)
         tax = self._calc_tax(asset, quantity, consideration, broker)
         return commission + tax
+
+    def calc_total_costs(self, assets, quantities, considerations, broker=None):
+        """
+        Calculate the total commission and tax of many trades at once
+        as array arithmetic on the considerations.
+        Parameters
+        ----------
+        assets : `list[str]`
+            The asset symbol strings.
+        quantities : `np.ndarray`
+            The quantities of assets, aligned with assets.
+        considerations : `np.ndarray`
+            Price times quantity of each order.
+        broker : `Broker`, optional
+            An optional Broker reference.
+        Returns
+        -------
+        `np.ndarray`
+            The total commission and tax of each trade.
+        """
+        considerations = np.abs(np.asarray(considerations, dtype=np.float64))
+        return self.commission_pct * considerations + self.tax_pct * considerations
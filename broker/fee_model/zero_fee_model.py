@@ -1,3 +1,5 @@
+import numpy as np
+
 from qfengine.broker.fee_model.fee_model import FeeModel
 
 
@@ -75,3 +77,22 @@ class ZeroFeeModel(FeeModel):
         tax = self._calc_tax(asset, quantity, consideration, broker)
         return commission + tax
 
+    def calc_total_costs(self, assets, quantities, considerations, broker=None):
+        """
+        Returns zero total cost for every trade.
+        Parameters
+        ----------
+        assets : `list[str]`
+            The asset symbol strings.
+        quantities : `np.ndarray`
+            The quantities of assets, aligned with assets.
+        considerations : `np.ndarray`
+            Price times quantity of each order.
+        broker : `Broker`, optional
+            An optional Broker reference.
+        Returns
+        -------
+        `np.ndarray`
+            The zero-cost total of each trade.
+        """
+        return np.zeros(len(assets), dtype=np.float64)
@@ -0,0 +1,49 @@
+from abc import ABCMeta, abstractmethod
+
+import numpy as np
+
+
+class MarketImpactModel(object):
+    """
+    Abstract class to handle the calculation of the market
+    impact of trading, i.e. the adverse move in the fill price
+    caused by the order itself.
+    Impact is returned per unit of the asset as a non-negative
+    amount, which the broker adds to the price of buys and
+    subtracts from the price of sells.
+    """
+
+    __metaclass__ = ABCMeta
+
+    @abstractmethod
+    def calc_market_impact(self, dt, asset, quantity, price, broker=None):
+        raise NotImplementedError(
+            "Should implement calc_market_impact()"
+        )
+
+    def calc_market_impacts(self, dt, assets, quantities, prices, broker=None):
+        """
+        Calculate the market impact of many orders at once.
+        Subclasses whose impact is array arithmetic should override
+        this; by default it calls calc_market_impact() per order.
+        Parameters
+        ----------
+        dt : `pd.Timestamp`
+            The time the orders are filled at.
+        assets : `list[str]`
+            The asset symbol strings.
+        quantities : `np.ndarray`
+            The quantities of assets, aligned with assets.
+        prices : `np.ndarray`
+            The quoted fill prices (ask for buys, bid for sells).
+        broker : `Broker`, optional
+            An optional Broker reference.
+        Returns
+        -------
+        `np.ndarray`
+            The per unit market impact of each order.
+        """
+        return np.array([
+            self.calc_market_impact(dt, asset, quantity, price, broker)
+            for asset, quantity, price in zip(assets, quantities, prices)
+        ], dtype=np.float64)
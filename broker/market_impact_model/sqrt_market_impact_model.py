@@ -0,0 +1,134 @@
+import numpy as np
+import pandas as pd
+from qfengine import settings
+
+from qfengine.broker.market_impact_model.market_impact_model import MarketImpactModel
+
+
+class SquareRootMarketImpactModel(MarketImpactModel):
+    """
+    A MarketImpactModel subclass using the square-root law: the
+    impact, as a fraction of the price, is
+        coefficient * volatility * sqrt(|quantity| / ADV)
+    where ADV is the average daily volume and volatility the
+    standard deviation of daily close returns, both over the
+    previous window bars (the current bar is never used).
+    The rolling ADV and volatility of an asset are computed once,
+    over its whole history, the first time it is traded and kept
+    as arrays. Each batch of orders is then priced with one binary
+    search on the bar times and fancy indexing, with no pandas
+    work per order. Assets without volume history have no impact.
+    Parameters
+    ----------
+    data_handler : `DataHandler`, optional
+        The data handler providing historical volumes and closes,
+        defaulting to the data handler of the broker.
+    coefficient : `float`, optional
+        The impact coefficient (of order one).
+    window : `int`, optional
+        The number of bars in the rolling ADV and volatility.
+    """
+
+    def __init__(self, data_handler=None, coefficient=1.0, window=20):
+        super().__init__()
+        if coefficient < 0.0 or window < 2:
+            raise ValueError(
+                "Impact coefficient of %s must not be negative and the "
+                "window of %s bars must be at least 2. Could not create "
+                "the SquareRootMarketImpactModel." % (coefficient, window)
+            )
+        self.data_handler = data_handler
+        self.coefficient = coefficient
+        self.window = window
+        self._loc = {}
+        self._ts = np.array([], dtype=np.int64)
+        self._adv = np.zeros((0, 0), dtype=np.float64)
+        self._vol = np.zeros((0, 0), dtype=np.float64)
+        self._adv_df = pd.DataFrame()
+        self._vol_df = pd.DataFrame()
+
+    def calc_market_impact(self, dt, asset, quantity, price, broker=None):
+        """
+        Returns the square-root law market impact of an order.
+        Parameters
+        ----------
+        dt : `pd.Timestamp`
+            The time the order is filled at.
+        asset : `str`
+            The asset symbol string.
+        quantity : `int`
+            The quantity of assets.
+        price : `float`
+            The quoted fill price.
+        broker : `Broker`, optional
+            An optional Broker reference.
+        Returns
+        -------
+        `float`
+            The per unit market impact.
+        """
+        return float(self.calc_market_impacts(dt, [asset], [quantity], [price], broker)[0])
+
+    def calc_market_impacts(self, dt, assets, quantities, prices, broker=None):
+        """
+        Returns the square-root law market impact of many orders at once.
+        """
+        missing = [a for a in dict.fromkeys(assets) if a not in self._loc]
+        if len(missing) > 0:
+            self._load_assets(missing, broker)
+        if len(self._ts) == 0:
+            return np.zeros(len(assets), dtype=np.float64)
+
+        row = int(np.searchsorted(self._ts, self._dt_value(dt), side='right')) - 1
+        if row < 0:
+            return np.zeros(len(assets), dtype=np.float64)
+        cols = np.fromiter((self._loc[a] for a in assets), dtype=np.int64, count=len(assets))
+        adv, vol = self._adv[row, cols], self._vol[row, cols]
+        quantities = np.abs(np.asarray(quantities, dtype=np.float64))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            fraction = self.coefficient * vol * np.sqrt(quantities / adv)
+        fraction = np.where(np.isfinite(fraction), fraction, 0.0)
+        return fraction * np.asarray(prices, dtype=np.float64)
+
+    def _load_assets(self, assets, broker=None):
+        """
+        Compute the rolling ADV and volatility of assets over their
+        whole history and merge them into the lookup arrays.
+        """
+        data_handler = self.data_handler
+        if data_handler is None and broker is not None:
+            data_handler = broker.data_handler
+        if data_handler is None:
+            raise ValueError(
+                "SquareRootMarketImpactModel needs a data handler (or a "
+                "broker with one) to load the volumes of %s." % assets
+            )
+        volumes = data_handler.get_assets_historical_volumes(
+            asset_symbols=assets
+        ).reindex(columns=assets).astype(np.float64)
+        closes = data_handler.get_assets_historical_closes(
+            asset_symbols=assets
+        ).reindex(index=volumes.index, columns=assets).astype(np.float64)
+
+        #---| shifted by one bar so that only completed bars are used
+        adv = volumes.rolling(self.window, min_periods=1).mean().shift(1)
+        vol = closes.pct_change().rolling(self.window, min_periods=2).std().shift(1)
+        self._adv_df = pd.concat([self._adv_df, adv], axis=1).sort_index()
+        self._vol_df = pd.concat([self._vol_df, vol], axis=1).sort_index()
+
+        #---| on a bar time missing for an asset, use its previous bar
+        self._adv_df = self._adv_df.ffill()
+        self._vol_df = self._vol_df.ffill()
+        index = pd.DatetimeIndex(self._adv_df.index)
+        if index.tz is None:
+            index = index.tz_localize(settings.TIMEZONE)
+        self._ts = index.asi8
+        self._adv = self._adv_df.values
+        self._vol = self._vol_df.values
+        self._loc = {a: i for i, a in enumerate(self._adv_df.columns)}
+
+    def _dt_value(self, dt):
+        dt = pd.Timestamp(dt)
+        if dt.tz is None:
+            dt = dt.tz_localize(settings.TIMEZONE)
+        return dt.value
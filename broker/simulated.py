@@ -1,11 +1,14 @@
 import queue
 import numpy as np
 from qfengine import settings
+from qfengine.tracing import INFO, WARNING, as_tracer
 from qfengine.portfolio.portfolio import Portfolio
 from qfengine.broker.broker import Broker
 from qfengine.broker.transaction.transaction import Transaction
 from qfengine.broker.fee_model.fee_model import FeeModel
 from qfengine.broker.fee_model.zero_fee_model import ZeroFeeModel
+from qfengine.broker.slippage_model.slippage_model import SlippageModel
+from qfengine.broker.market_impact_model.market_impact_model import MarketImpactModel
 
 
 class SimulatedBroker(Broker):
@@ -35,8 +38,13 @@ class SimulatedBroker(Broker):
         Defaults to the ZeroFeeModel.
     slippage_model : `SlippageModel`, optional
         The model used to simulate trade slippage.
+        Defaults to no slippage.
     market_impact_model : `MarketImpactModel`, optional
         The model used to simulate market impact of trading.
+        Defaults to no market impact.
+    tracer : `Tracer`, optional
+        The tracer of the broker events, defaulting to the
+        settings.PRINT_EVENTS controlled default tracer.
     """
 
     def __init__(
@@ -49,8 +57,10 @@ class SimulatedBroker(Broker):
         initial_funds=0.0,
         fee_model=ZeroFeeModel(),
         slippage_model=None,
-        market_impact_model=None
+        market_impact_model=None,
+        tracer=None
     ):
+        self.tracer = as_tracer(tracer)
         self.start_dt = start_dt
         self.exchange = exchange
         self.data_handler = data_handler
@@ -60,15 +70,14 @@ class SimulatedBroker(Broker):
         self.base_currency = self._set_base_currency(base_currency)
         self.initial_funds = self._set_initial_funds(initial_funds)
         self.fee_model = self._set_fee_model(fee_model)
-        self.slippage_model = None  # TODO: Implement
-        self.market_impact_model = None  # TODO: Implement
+        self.slippage_model = self._set_slippage_model(slippage_model)
+        self.market_impact_model = self._set_market_impact_model(market_impact_model)
 
         self.cash_balances = self._set_cash_balances()
         self.portfolios = self._set_initial_portfolios()
         self.open_orders = self._set_initial_open_orders()
 
-        if settings.PRINT_EVENTS:
-            print('Initializing simulated broker "%s"...' % self.account_id)
+        self.tracer.info('Initializing simulated broker "%s"...', self.account_id)
 
     def _set_base_currency(self, base_currency):
         """
@@ -138,6 +147,48 @@ class SimulatedBroker(Broker):
                 "Broker entity." % fee_model.__class__
             )
 
+    def _set_slippage_model(self, slippage_model):
+        """
+        Check and set the optional SlippageModel instance for the broker.
+        Parameters
+        ----------
+        slippage_model : `SlippageModel` (instance) or None
+            The slippage model provided to the Broker.
+        Returns
+        -------
+        `SlippageModel` (instance) or None
+            The checked SlippageModel.
+        """
+        if slippage_model is None or issubclass(slippage_model.__class__, SlippageModel):
+            return slippage_model
+        else:
+            raise TypeError(
+                "Provided slippage model '%s' in SimulatedBroker is not a "
+                "SlippageModel subclass. Failed to create the "
+                "Broker entity." % slippage_model.__class__
+            )
+
+    def _set_market_impact_model(self, market_impact_model):
+        """
+        Check and set the optional MarketImpactModel instance for the broker.
+        Parameters
+        ----------
+        market_impact_model : `MarketImpactModel` (instance) or None
+            The market impact model provided to the Broker.
+        Returns
+        -------
+        `MarketImpactModel` (instance) or None
+            The checked MarketImpactModel.
+        """
+        if market_impact_model is None or issubclass(market_impact_model.__class__, MarketImpactModel):
+            return market_impact_model
+        else:
+            raise TypeError(
+                "Provided market impact model '%s' in SimulatedBroker is not "
+                "a MarketImpactModel subclass. Failed to create the "
+                "Broker entity." % market_impact_model.__class__
+            )
+
     def _set_cash_balances(self):
         """
         Set the appropriate cash balances in the various
@@ -192,12 +243,10 @@ class SimulatedBroker(Broker):
                 "'%s' to the broker account." % amount
             )
         self.cash_balances[self.base_currency] += amount
-        if settings.PRINT_EVENTS:
-            print(
-                '(%s) - subscription: %0.2f subscribed to broker account "%s"' % (
-                    self.current_dt, amount, self.account_id
-                )
-            )
+        self.tracer.info(
+            '(%s) - subscription: %0.2f subscribed to broker account "%s"',
+            self.current_dt, amount, self.account_id
+        )
 
     def withdraw_funds_from_account(self, amount):
         """
@@ -224,12 +273,10 @@ class SimulatedBroker(Broker):
                 )
             )
         self.cash_balances[self.base_currency] -= amount
-        if settings.PRINT_EVENTS:
-            print(
-                '(%s) - withdrawal: %0.2f withdrawn from broker account "%s"' % (
-                    self.current_dt, amount, self.account_id
-                )
-            )
+        self.tracer.info(
+            '(%s) - withdrawal: %0.2f withdrawn from broker account "%s"',
+            self.current_dt, amount, self.account_id
+        )
 
     def get_account_cash_balance(self, currency=None):
         """
@@ -314,16 +361,15 @@ class SimulatedBroker(Broker):
                 self.current_dt,
                 currency=self.base_currency,
                 portfolio_id=portfolio_id_str,
-                name=name
+                name=name,
+                tracer=self.tracer
             )
             self.portfolios[portfolio_id_str] = p
             self.open_orders[portfolio_id_str] = queue.Queue()
-            if settings.PRINT_EVENTS:
-                print(
-                    '(%s) - portfolio creation: Portfolio "%s" created at broker "%s"' % (
-                        self.current_dt, portfolio_id_str, self.account_id
-                    )
-                )
+            self.tracer.info(
+                '(%s) - portfolio creation: Portfolio "%s" created at broker "%s"',
+                self.current_dt, portfolio_id_str, self.account_id
+            )
 
     def list_all_portfolios(self):
         """
@@ -374,12 +420,10 @@ class SimulatedBroker(Broker):
             )
         self.portfolios[portfolio_id].subscribe_funds(self.current_dt, amount)
         self.cash_balances[self.base_currency] -= amount
-        if settings.PRINT_EVENTS:
-            print(
-                '(%s) - subscription: %0.2f subscribed to portfolio "%s"' % (
-                    self.current_dt, amount, portfolio_id
-                )
-            )
+        self.tracer.info(
+            '(%s) - subscription: %0.2f subscribed to portfolio "%s"',
+            self.current_dt, amount, portfolio_id
+        )
 
     def withdraw_funds_from_portfolio(self, portfolio_id, amount):
         """
@@ -419,12 +463,10 @@ class SimulatedBroker(Broker):
             self.current_dt, amount
         )
         self.cash_balances[self.base_currency] += amount
-        if settings.PRINT_EVENTS:
-            print(
-                '(%s) - withdrawal: %0.2f withdrawn from portfolio "%s"' % (
-                    self.current_dt, amount, portfolio_id
-                )
-            )
+        self.tracer.info(
+            '(%s) - withdrawal: %0.2f withdrawn from portfolio "%s"',
+            self.current_dt, amount, portfolio_id
+        )
 
     def get_portfolio_cash_balance(self, portfolio_id):
         """
@@ -524,61 +566,124 @@ class SimulatedBroker(Broker):
         order : `Order`
             The Order instance to create the Transaction for.
         """
-        # Obtain a price for the asset, if no price then
-        # raise a ValueError
-        price_err_msg = (
-            "Could not obtain a latest market price for "
-            "Asset with ticker symbol '%s'. Order with ID '%s' was "
-            "not executed." % (
-                order.asset, order.order_id
+        txns = self.execute_orders(dt, portfolio_id, [order])
+        if len(txns) == 0:
+            raise ValueError(
+                "Could not obtain a latest market price for "
+                "Asset with ticker symbol '%s'. Order with ID '%s' was "
+                "not executed." % (
+                    order.asset, order.order_id
+                )
             )
-        )
-        bid_ask = self.data_handler.get_asset_latest_bid_ask_price(
-            dt, order.asset
-        )
-        if bid_ask == (np.NaN, np.NaN):
-            raise ValueError(price_err_msg)
+        return txns[0]
+
+    def execute_orders(self, dt, portfolio_id, orders):
+        """
+        For a given portfolio ID string, execute many Orders at once.
+        All orders are priced with one bid/ask lookup (buys at the ask,
+        sells at the bid), moved against the orders by the slippage and
+        market impact models if any, their fees are calculated as an array by the
+        fee model and the resulting Transactions are applied to the
+        portfolio's position book in one step.
+        Sell orders are executed before buy orders, as in update().
+        Orders of assets without a bid or ask price are not executed,
+        with a warning, and do not hold up the rest of the batch.
+        Parameters
+        ----------
+        dt : `pd.Timestamp`
+            The current timestamp.
+        portfolio_id : `str`
+            The portfolio ID string.
+        orders : `list[Order]`
+            The Order instances to create the Transactions for.
+        Returns
+        -------
+        `list[Transaction]`
+            The executed transactions, sells first.
+        """
+        orders = sorted(orders, key=lambda order: order.direction) # sell first then buy (neg to pos)
+        if len(orders) == 0:
+            return []
 
-        # Calculate the consideration and total commission
-        # based on the commission model
-        if order.direction > 0:
-            price = bid_ask[1]
-        else:
-            price = bid_ask[0]
-        consideration = round(price * order.quantity)
-        total_commission = self.fee_model.calc_total_cost(
-            order.asset, order.quantity, consideration, self
+        # Obtain a price for every asset, orders of assets
+        # without a price are dropped from the batch
+        bids, asks = self.data_handler.get_assets_latest_bid_ask(
+            dt, [order.asset for order in orders]
         )
-
-        # Check that sufficient cash exists to carry out the
-        # order, else scale it down
-        est_total_cost = consideration + total_commission
-        total_cash = self.portfolios[portfolio_id].cash
-
-        scaled_quantity = order.quantity
-        if est_total_cost > total_cash:
-            if settings.PRINT_EVENTS:
-                print(
-                    "WARNING: Estimated transaction size of %0.2f exceeds "
-                    "available cash of %0.2f. Transaction will still occur "
-                    "with a negative cash balance." % (est_total_cost, total_cash)
+        no_price = np.isnan(bids) & np.isnan(asks)
+        if no_price.any():
+            for order in [order for order, missing in zip(orders, no_price) if missing]:
+                self.tracer.warning(
+                    "WARNING: Could not obtain a latest market price for "
+                    "Asset with ticker symbol '%s'. Order with ID '%s' was "
+                    "not executed.", order.asset, order.order_id
                 )
-
-        # Create a transaction entity and update the portfolio
-        txn = Transaction(
-            order.asset, scaled_quantity, self.current_dt,
-            price, order.order_id, commission=total_commission
+            orders = [order for order, missing in zip(orders, no_price) if not missing]
+            bids, asks = bids[~no_price], asks[~no_price]
+            if len(orders) == 0:
+                return []
+        assets = [order.asset for order in orders]
+        quantities = np.array([order.quantity for order in orders], dtype=np.float64)
+
+        # Calculate the considerations and total commissions
+        # based on the commission model
+        directions = np.array([order.direction for order in orders], dtype=np.float64)
+        prices = np.where(directions > 0, asks, bids)
+
+        # Move the fill prices against the orders by the per unit
+        # slippage and market impact of the whole batch
+        adverse = np.zeros(len(orders), dtype=np.float64)
+        if self.slippage_model is not None:
+            adverse += self.slippage_model.calc_slippages(
+                assets, quantities, prices, bids, asks, self
+            )
+        if self.market_impact_model is not None:
+            adverse += self.market_impact_model.calc_market_impacts(
+                dt, assets, quantities, prices, self
+            )
+        prices = prices + directions * adverse
+        considerations = np.round(prices * quantities)
+        total_commissions = self.fee_model.calc_total_costs(
+            assets, quantities, considerations, self
         )
-        self.portfolios[portfolio_id].transact_asset(txn)
-        if settings.PRINT_EVENTS:
-            print(
-                "(%s) - executed order: %s, qty: %s, price: %0.2f, "
-                "consideration: %0.2f, commission: %0.2f, total: %0.2f" % (
-                    self.current_dt, order.asset, scaled_quantity, price,
-                    consideration, total_commission,
-                    consideration + total_commission
-                )
+
+        # Create the transaction entities
+        txns = [
+            Transaction(
+                order.asset, order.quantity, self.current_dt,
+                price, order.order_id, commission=total_commission
+            )
+            for order, price, total_commission in zip(
+                orders, prices.tolist(), total_commissions.tolist()
             )
+        ]
+
+        # Warn when the cash left by the transactions booked before
+        # it cannot cover one, it still occurs with a negative cash balance
+        if self.tracer.enabled_for(WARNING):
+            total_cash = self.portfolios[portfolio_id].cash
+            for txn in txns:
+                est_total_cost = round(txn.price * txn.quantity) + txn.commission
+                if est_total_cost > total_cash:
+                    self.tracer.warning(
+                        "WARNING: Estimated transaction size of %0.2f exceeds "
+                        "available cash of %0.2f. Transaction will still occur "
+                        "with a negative cash balance.", est_total_cost, total_cash
+                    )
+                total_cash -= txn.cost_with_commission
+
+        # Update the portfolio
+        self.portfolios[portfolio_id].transact_assets(txns)
+        if self.tracer.enabled_for(INFO):
+            for txn, consideration in zip(txns, considerations.tolist()):
+                self.tracer.info(
+                    "(%s) - executed order: %s, qty: %s, price: %0.2f, "
+                    "consideration: %0.2f, commission: %0.2f, total: %0.2f",
+                    self.current_dt, txn.asset, txn.quantity, txn.price,
+                    consideration, txn.commission,
+                    consideration + txn.commission
+                )
+        return txns
 
     def submit_order(self, portfolio_id, order):
         """
@@ -607,12 +712,10 @@ class SimulatedBroker(Broker):
                 )
             )
         self.open_orders[portfolio_id].put(order)
-        if settings.PRINT_EVENTS:
-            print(
-                "(%s) - submitted order: %s, qty: %s" % (
-                    self.current_dt, order.asset, order.quantity
-                )
-            )
+        self.tracer.info(
+            "(%s) - submitted order: %s, qty: %s",
+            self.current_dt, order.asset, order.quantity
+        )
 
     def update(self, dt):
         """
@@ -624,14 +727,21 @@ class SimulatedBroker(Broker):
         """
         self.current_dt = dt
 
-        # Update portfolio asset values
+        # Update portfolio asset values, all held assets priced in one lookup
+        held_assets = {}
         for portfolio in self.portfolios:
-            for asset in self.portfolios[portfolio].pos_handler.positions:
-                mid_price = self.data_handler.get_asset_latest_mid_price(
-                    dt, asset
-                )
-                self.portfolios[portfolio].update_market_value_of_asset(
-                    asset, mid_price, self.current_dt
+            for asset in self.portfolios[portfolio].pos_handler.assets:
+                held_assets[asset] = None
+        if len(held_assets) > 0:
+            held_assets = list(held_assets)
+            mid_prices = dict(zip(
+                held_assets,
+                self.data_handler.get_assets_latest_mid_prices(dt, held_assets)
+            ))
+            for portfolio in self.portfolios:
+                assets = self.portfolios[portfolio].pos_handler.assets
+                self.portfolios[portfolio].update_market_value_of_assets(
+                    assets, [mid_prices[a] for a in assets], self.current_dt
                 )
 
         # Try to execute orders
@@ -643,6 +753,7 @@ class SimulatedBroker(Broker):
                         (portfolio, self.open_orders[portfolio].get())
                     )
 
-            sorted_orders = sorted(orders, key=lambda x: x[1].direction) # sell first then buy (neg to pos)
-            for portfolio, order in sorted_orders:
-                self._execute_order(dt, portfolio, order)
+            for portfolio in self.portfolios:
+                portfolio_orders = [order for p, order in orders if p == portfolio]
+                if len(portfolio_orders) > 0:
+                    self.execute_orders(dt, portfolio, portfolio_orders)
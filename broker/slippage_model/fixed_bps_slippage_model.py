@@ -0,0 +1,54 @@
+import numpy as np
+
+from qfengine.broker.slippage_model.slippage_model import SlippageModel
+
+
+class FixedBPSSlippageModel(SlippageModel):
+    """
+    A SlippageModel subclass that fills every order a fixed
+    number of basis points away from the quoted price.
+    Parameters
+    ----------
+    bps : `float`, optional
+        The slippage in basis points of the quoted price.
+        Hence, e.g. 5bps is 5.0 (0.05%)
+    """
+
+    def __init__(self, bps=0.0):
+        super().__init__()
+        if bps < 0.0:
+            raise ValueError(
+                "Slippage of %s bps is negative. Could not create "
+                "the FixedBPSSlippageModel." % bps
+            )
+        self.bps = bps
+
+    def calc_slippage(self, asset, quantity, price, bid, ask, broker=None):
+        """
+        Returns the fixed basis point slippage of the price.
+        Parameters
+        ----------
+        asset : `str`
+            The asset symbol string.
+        quantity : `int`
+            The quantity of assets.
+        price : `float`
+            The quoted fill price.
+        bid : `float`
+            The latest bid price.
+        ask : `float`
+            The latest ask price.
+        broker : `Broker`, optional
+            An optional Broker reference.
+        Returns
+        -------
+        `float`
+            The per unit slippage.
+        """
+        return self.bps * 1e-4 * price
+
+    def calc_slippages(self, assets, quantities, prices, bids, asks, broker=None):
+        """
+        Returns the fixed basis point slippage of many prices at once.
+        """
+        return self.bps * 1e-4 * np.asarray(prices, dtype=np.float64)
@@ -0,0 +1,50 @@
+from abc import ABCMeta, abstractmethod
+
+import numpy as np
+
+
+class SlippageModel(object):
+    """
+    Abstract class to handle the calculation of the slippage
+    of an order's fill price away from the quoted price.
+    Slippage is returned per unit of the asset as a non-negative
+    amount, which the broker adds to the price of buys and
+    subtracts from the price of sells.
+    """
+
+    __metaclass__ = ABCMeta
+
+    @abstractmethod
+    def calc_slippage(self, asset, quantity, price, bid, ask, broker=None):
+        raise NotImplementedError(
+            "Should implement calc_slippage()"
+        )
+
+    def calc_slippages(self, assets, quantities, prices, bids, asks, broker=None):
+        """
+        Calculate the slippage of many orders at once.
+        Subclasses whose slippage is array arithmetic should override
+        this; by default it calls calc_slippage() per order.
+        Parameters
+        ----------
+        assets : `list[str]`
+            The asset symbol strings.
+        quantities : `np.ndarray`
+            The quantities of assets, aligned with assets.
+        prices : `np.ndarray`
+            The quoted fill prices (ask for buys, bid for sells).
+        bids : `np.ndarray`
+            The latest bid prices.
+        asks : `np.ndarray`
+            The latest ask prices.
+        broker : `Broker`, optional
+            An optional Broker reference.
+        Returns
+        -------
+        `np.ndarray`
+            The per unit slippage of each order.
+        """
+        return np.array([
+            self.calc_slippage(asset, quantity, price, bid, ask, broker)
+            for asset, quantity, price, bid, ask in zip(assets, quantities, prices, bids, asks)
+        ], dtype=np.float64)
@@ -0,0 +1,66 @@
+import numpy as np
+
+from qfengine.broker.slippage_model.slippage_model import SlippageModel
+
+
+class SpreadSlippageModel(SlippageModel):
+    """
+    A SlippageModel subclass where orders walk a fraction of the
+    bid/ask spread past the touch.
+    Daily OHLCV sources quote bid == ask, so the spread used is at
+    least min_spread_bps of the mid price.
+    Parameters
+    ----------
+    spread_fraction : `float`, optional
+        The fraction of the spread paid as slippage.
+    min_spread_bps : `float`, optional
+        The minimum spread, in basis points of the mid price.
+    """
+
+    def __init__(self, spread_fraction=0.5, min_spread_bps=0.0):
+        super().__init__()
+        if spread_fraction < 0.0 or min_spread_bps < 0.0:
+            raise ValueError(
+                "Spread fraction of %s and minimum spread of %s bps must "
+                "not be negative. Could not create the "
+                "SpreadSlippageModel." % (spread_fraction, min_spread_bps)
+            )
+        self.spread_fraction = spread_fraction
+        self.min_spread_bps = min_spread_bps
+
+    def calc_slippage(self, asset, quantity, price, bid, ask, broker=None):
+        """
+        Returns a fraction of the (minimum) spread as slippage.
+        Parameters
+        ----------
+        asset : `str`
+            The asset symbol string.
+        quantity : `int`
+            The quantity of assets.
+        price : `float`
+            The quoted fill price.
+        bid : `float`
+            The latest bid price.
+        ask : `float`
+            The latest ask price.
+        broker : `Broker`, optional
+            An optional Broker reference.
+        Returns
+        -------
+        `float`
+            The per unit slippage.
+        """
+        return float(self.calc_slippages([asset], [quantity], [price], [bid], [ask], broker)[0])
+
+    def calc_slippages(self, assets, quantities, prices, bids, asks, broker=None):
+        """
+        Returns a fraction of the (minimum) spread of many orders at once.
+        """
+        prices = np.asarray(prices, dtype=np.float64)
+        bids = np.asarray(bids, dtype=np.float64)
+        asks = np.asarray(asks, dtype=np.float64)
+        #---| one sided quotes have no spread, the minimum spread still applies
+        spreads = np.nan_to_num(asks - bids, nan=0.0)
+        mids = np.where(np.isnan(bids) | np.isnan(asks), prices, (bids + asks) / 2.0)
+        spreads = np.maximum(spreads, self.min_spread_bps * 1e-4 * mids)
+        return self.spread_fraction * spreads
@@ -2,7 +2,9 @@ import pandas as pd
 import numpy as np
 import logging
 from qfengine.data.price.backtest_price_handler import BacktestPriceHandler
+from qfengine.data.price.daily_price.daily_price_panel import DailyPricePanel
 from qfengine import settings
+from typing import List
 
 logger = logging.getLogger(__name__)
 
@@ -29,7 +31,69 @@ class BacktestDataHandler(BacktestPriceHandler):
             price_data_sources = [d.create_price_source_copy() for d in self.price_data_sources],
                 preload_bid_ask_data = False,
                                  )
-        handler._assets_bid_ask_frames = self._assets_bid_ask_frames.copy()
+        handler._bid_ask_index = self._bid_ask_index #---| immutable, shared by all copies
         # TODO: Add more renewals once more types of data sources are available
         return handler
+
+    def share_price_panel(self,
+                          panel_dir:str,
+                          asset_symbols:List[str] = None,
+                          start_dt = None,
+                          end_dt = None,
+    ):
+        '''
+            Writes the daily prices of asset_symbols (defaults to assetsList())
+            once to a memory-mapped DailyPricePanel at panel_dir and re-points
+            this handler at it. Every copy() made afterwards attaches to the
+            same mapping instead of rebuilding private price frames.
+        '''
+        symbols = list(asset_symbols or self.assetsList())
+        price_dfs = []
+        for ds in self.price_data_sources:
+            available = set(ds.assetsList())
+            ds_symbols = [s for s in symbols if s in available]
+            if len(ds_symbols) > 0:
+                price_dfs.append(
+                    ds.get_assets_historical_price_dfs(
+                                        *ds_symbols,
+                                        start_dt = start_dt,
+                                        end_dt = end_dt,
+                    )
+                )
+                symbols = [s for s in symbols if s not in available]
+            if len(symbols) == 0:
+                break
+        if len(symbols) > 0:
+            logger.warning("No price data source has %s symbols, not included in panel: %s" %(len(symbols), symbols))
+        assert len(price_dfs) > 0, "None of the requested symbols are available in price_data_sources"
+
+        panel = DailyPricePanel.create_panel(
+                                pd.concat(price_dfs, axis = 1),
+                                panel_dir,
+                                asset_type = getattr(self.price_data_sources[0], 'asset_type', None),
+        )
+        return self.attach_price_panel(panel)
+
+    def attach_price_panel(self, panel):
+        '''
+            Attaches (zero-copy) to an existing DailyPricePanel, or to the panel
+            stored at panel directory path, as this handler's only price source.
+        '''
+        if not isinstance(panel, DailyPricePanel):
+            panel = DailyPricePanel(panel)
+        self.price_data_sources = [panel]
+        self._reset_cached_frames()
+        return panel
+
+    @classmethod
+    def from_price_panel(cls,
+                         panel_dir:str,
+                         universe = None,
+                         **kwargs
+    ):
+        return cls(
+                price_data_sources = [DailyPricePanel(panel_dir)],
+                universe = universe,
+                **kwargs
+        )
     
\ No newline at end of file
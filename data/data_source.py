@@ -1,7 +1,11 @@
 from abc import ABCMeta, abstractmethod
 from typing import List, Union
 import MySQLdb as mdb
+import contextlib
+import threading
 import logging
+import queue
+import time
 import os
 import numpy as np
 import pandas as pd
@@ -38,8 +42,192 @@ class CSVDataSource(CSVDataDirectory):
 
 
 
+#!----| Parquet Data Source(s) ~ Hive-partitioned dataset (one directory per partition value)
+class ParquetDataDirectory(object):
+
+    __metaclass__ = ABCMeta
+
+    def __init__(self, parquet_dir:str, partition_key:str):
+        if not os.path.exists(parquet_dir):
+            try:
+                os.makedirs(parquet_dir)
+            except:
+                raise
+        self.parquet_dir = parquet_dir
+        self.partition_key = partition_key
+
+    @property
+    def _partition_values_in_dir(self):
+        prefix = '%s=' %self.partition_key
+        return [
+                d.replace(prefix, '', 1) for d in os.listdir(self.parquet_dir)
+                    if d.startswith(prefix) and os.path.isdir(os.path.join(self.parquet_dir, d))
+                ]
+
+    def _partition_dir_from_value(self, value:str):
+        return os.path.join(self.parquet_dir, '%s=%s' %(self.partition_key, value))
+
+class ParquetDataSource(ParquetDataDirectory):
+
+    __metaclass__ = ABCMeta
+
+    def __init__(self, parquet_dir:str, partition_key:str):
+        super().__init__(parquet_dir, partition_key)
+
+
+
+
 
 #!----| MySQL Data Source(s) ~ MySQL Table (within a relational database)
+class MySQLConnectionPool(object):
+    '''
+        Bounded, thread-safe pool of connections to one database.
+
+        Connections are created lazily up to max_size and handed out LIFO, so a
+        burst of work reuses the few most recently used (warm) connections.
+        Once every connection is checked out, acquire() blocks until one is
+        released. A connection idle for longer than health_check_interval
+        seconds is pinged before being handed out and replaced if it is dead.
+
+        One pool is shared by every MySQLConnection (tables, price source
+        copies, threads) using the same credentials in the same process, see
+        for_credentials().
+    '''
+
+    default_max_size = 8
+    health_check_interval = 60.0  #---| seconds
+
+    _pools = {}
+    _pools_lock = threading.Lock()
+
+    def __init__(self,
+                 credentials:dict,
+                 max_size:int = None,
+    ):
+        self._credentials = credentials.copy()
+        self.max_size = max_size or MySQLConnectionPool.default_max_size
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._size = 0          #---| connections open, idle or checked out
+        self._generation = 0    #---| bumped by refresh(), older connections are discarded
+        self._conn_generation = {}
+        self._last_used = {}
+        self._pid = os.getpid()
+
+    @classmethod
+    def for_credentials(cls, credentials:dict, max_size:int = None):
+        '''
+            Process-wide pool for credentials, created on first use. Pools
+            inherited through fork() are never reused, their sockets belong to
+            the parent process.
+        '''
+        key = tuple(sorted(credentials.items()))
+        with cls._pools_lock:
+            pool = cls._pools.get(key)
+            if (pool is None) or (pool._pid != os.getpid()):
+                pool = cls(credentials, max_size = max_size)
+                cls._pools[key] = pool
+            return pool
+
+    @property
+    def size(self):
+        return self._size
+
+    @property
+    def idle_count(self):
+        return self._idle.qsize()
+
+    def acquire(self, timeout:float = None):
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                conn = self._new_connection_if_below_max_size()
+                if conn is None:
+                    try:
+                        conn = self._idle.get(timeout = timeout)
+                    except queue.Empty:
+                        raise Exception("Timed out waiting for a MySQL connection (pool max_size = %s)." %self.max_size)
+                else:
+                    return conn
+            if self._is_healthy(conn):
+                return conn
+            self._discard(conn)
+
+    def release(self, conn, discard:bool = False):
+        if discard or (self._conn_generation.get(id(conn)) != self._generation):
+            self._discard(conn)
+        else:
+            self._last_used[id(conn)] = time.monotonic()
+            self._idle.put(conn)
+
+    @contextlib.contextmanager
+    def connection(self, timeout:float = None):
+        '''
+            with pool.connection() as conn: ...
+            A connection that raised is discarded rather than returned, its
+            session state being unknown.
+        '''
+        conn = self.acquire(timeout = timeout)
+        try:
+            yield conn
+        except:
+            self.release(conn, discard = True)
+            raise
+        else:
+            self.release(conn)
+
+    def refresh(self):
+        '''
+            Closes all idle connections now and every checked out one when it is
+            released; later acquisitions open fresh connections.
+        '''
+        with self._lock:
+            self._generation += 1
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(conn)
+
+    def _new_connection_if_below_max_size(self):
+        with self._lock:
+            if self._size >= self.max_size:
+                return None
+            self._size += 1
+            generation = self._generation
+        try:
+            conn = MySQLConnection._new_connection(**self._credentials)
+        except:
+            with self._lock:
+                self._size -= 1
+            raise
+        self._conn_generation[id(conn)] = generation
+        self._last_used[id(conn)] = time.monotonic()
+        return conn
+
+    def _is_healthy(self, conn):
+        if time.monotonic() - self._last_used.get(id(conn), 0.0) < self.health_check_interval:
+            return True
+        try:
+            conn.ping()
+        except Exception:
+            logger.warning("Dropping dead MySQL connection from pool.")
+            return False
+        return True
+
+    def _discard(self, conn):
+        self._conn_generation.pop(id(conn), None)
+        self._last_used.pop(id(conn), None)
+        with self._lock:
+            self._size -= 1
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+
 class MySQLConnection(object):
 
     __metaclass__ = ABCMeta
@@ -57,17 +245,32 @@ class MySQLConnection(object):
                             'host':host,
                             'db':db,
                             }
+        #---| an explicitly given connection is used as is, otherwise borrow from the pool
         self._conn = None
         for v in kwargs.values():
             if isinstance(v, mdb.connections.Connection):
                 self._conn = v
                 break
-        if self._conn is None:
-            self._conn = MySQLConnection._new_connection(**self._credentials)
+        self._pool = MySQLConnectionPool.for_credentials(self._credentials)
         self._db_name = self._credentials['db']
     
     def _refresh_connection(self):
-        self._conn = MySQLConnection._new_connection(**self._credentials)
+        self._conn = None
+        self._pool.refresh()
+
+    def close_connections(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+        self._pool.refresh()
+
+    @contextlib.contextmanager
+    def connection(self):
+        if self._conn is not None:
+            yield self._conn
+        else:
+            with self._pool.connection() as conn:
+                yield conn
 
     def executeSQL(self,
                     query:str,
@@ -77,7 +280,8 @@ class MySQLConnection(object):
                     **kwargs
     ):
         if conn is None:
-            conn = self._conn
+            with self.connection() as conn:
+                return self.executeSQL(query, query_args, return_rows_affected, conn = conn)
         if '%s' in query:
             assert query_args is not None
             return MySQLConnection._executemany(conn, query, query_args, return_rows_affected)
@@ -116,6 +320,27 @@ class MySQLConnection(object):
         con.commit()
         return resp if not return_rows_affected else exc
 
+    @staticmethod
+    def _execute_streaming(con,
+                           cmd:str,
+                           batch_size:int = 10000,
+    ):
+        '''
+            Yields the rows of a SELECT in batches from a server-side (unbuffered)
+            cursor, so large result sets are never held client-side all at once.
+            The generator must be exhausted before con is used again.
+        '''
+        cur = con.cursor(mdb.cursors.SSCursor)
+        try:
+            cur.execute(cmd)
+            while True:
+                rows = cur.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield rows
+        finally:
+            cur.close()
+
     @staticmethod
     def _new_connection(user:str,
                         passwd:str,
@@ -240,11 +465,14 @@ class MySQLDataSource(MySQLConnection):
         except AssertionError: # raise message in warning
             return False
         
-    def _prepare_insertDF(self,data_to_insert:pd.DataFrame):
+    def _prepare_insertDF(self,
+                          data_to_insert:pd.DataFrame,
+                          table_name:str = None,
+    ):
         insert_cols = list(data_to_insert.columns)
         column_str = str(insert_cols)[1:-1].replace("'","")
 
-        insert_str = "INSERT INTO %s (%s) VALUES (%s)" %(self._name,
+        insert_str = "INSERT INTO %s (%s) VALUES (%s)" %(table_name or self._name,
                                                             column_str,
                                                             ("%s, " * len(insert_cols))[:-2]
                                                             )
@@ -256,7 +484,7 @@ class MySQLDataSource(MySQLConnection):
 
     def _prepare_updateDF(self,data_to_update:pd.DataFrame):
         assert "id" in data_to_update.columns
-        update_cols = list(data_to_update.set_index("id").columns)
+        update_cols = [c for c in data_to_update.columns if c != "id"]
         update_str = (
             '''
             UPDATE %s
@@ -268,80 +496,157 @@ class MySQLDataSource(MySQLConnection):
                     "id = %s",
                 )
                     )
-        update_data = []
-        for _id in data_to_update.set_index("id").index:
-            dat = data_to_update.set_index("id").loc[_id].values
-            update_data.append(tuple(list(dat) + [_id]))
+        update_data = list(zip(*[data_to_update[c].tolist() for c in update_cols + ["id"]]))
         return update_str, update_data
-        
-    def _upsert_filter(self,
-                        input_data:pd.DataFrame,
-                        by_columns:list = None,
-        ):
-        if by_columns is None:
-            by_columns = list(input_data.columns)
-        assert set(by_columns).issubset(set(input_data.columns))
-        df_to_filter = input_data[by_columns]
-
-
-        new = []
-        existed = []
-        existed_id = []
-        for i in df_to_filter.index:
-            dat = df_to_filter.loc[i].values
-            cond = " AND ".join(
-                                    [
-                                    ("%s = '%s'" %(str(c), str(v))) if v is not None
-                                            else ('%s IS NULL' %str(c))
-                                        for c,v in zip(by_columns,dat)
-                                    ]
-                                    )
-            resp = self.executeSQL(
-                '''
-                SELECT id FROM %s
-                WHERE %s
-                '''% (self._name,cond)
-                            )
-            if len(resp) == 0:
-                new.append(i)
-            else:
-                all_dat = input_data.loc[i].values
-                for j in resp:
-                    existed.append([j[0]] + list(all_dat))
 
-        new = input_data.reindex(new).reset_index(drop=True)
-        existed = pd.DataFrame(existed, columns= (['id'] + list(input_data.columns)))
+    #---| Set-based upsert: stage the rows in a temporary table, then merge with one statement
+    @property
+    def unique_keys(self)->List[List[str]]:
+        '''
+            Columns of every UNIQUE index of the table (PRIMARY KEY included).
+        '''
+        if getattr(self, '_unique_keys', None) is None:
+            keys = {}
+            for row in self.executeSQL("SHOW INDEX FROM %s" %self._name):
+                non_unique, key_name, column = row[1], row[2], row[4]
+                if int(non_unique) == 0:
+                    keys.setdefault(key_name, []).append(column)
+            self._unique_keys = list(keys.values())
+        return self._unique_keys
+
+    def ensure_unique_key(self,
+                          by_columns:List[str],
+                          key_name:str = None,
+    ):
+        '''
+            Adds a UNIQUE index on by_columns if the table has none yet, deleting
+            duplicate rows first, so that upsertDF() can merge with a single
+            INSERT ... ON DUPLICATE KEY UPDATE.
+        '''
+        assert set(by_columns).issubset(self.all_accepted_columns)
+        if any(set(k) == set(by_columns) for k in self.unique_keys):
+            return False
+        deleted = self.delete_duplicates(by_columns)
+        if deleted:
+            logger.warning("Deleted %s duplicated rows of %s before adding unique key." %(str(deleted), self._name))
+        self.executeSQL(
+            "ALTER TABLE %s ADD UNIQUE KEY %s (%s)" %(
+                                self._name,
+                                key_name or "_".join(["uq"] + list(by_columns)),
+                                ", ".join(by_columns),
+                            )
+        )
+        self._unique_keys = None
+        return True
 
-        return {'insert':new, 'update':existed}
+    def _set_based_upsert(self,
+                          input_data:pd.DataFrame,
+                          by_columns:List[str],
+    ):
+        '''
+            Bulk loads input_data into a temporary staging table, then merges it
+            into the table in one statement per step, all on one connection:
+              - with a UNIQUE index on by_columns: INSERT ... SELECT ...
+                ON DUPLICATE KEY UPDATE, with counts derived from a JOIN COUNT
+                of the staged rows already present,
+              - otherwise: UPDATE ... JOIN on by_columns, then INSERT ... SELECT
+                of the staged rows without a (NULL-safe) match.
+            Updated counts only rows whose values actually changed, as before.
+        '''
+        input_data = input_data.drop_duplicates(subset = by_columns, keep = 'last')
+        columns = list(input_data.columns)
+        value_cols = [c for c in columns if c not in by_columns]
+        stage = "_stage_%s" %self._name
+        cols_str = ", ".join(columns)
+        src_cols_str = ", ".join(["S.%s" %c for c in columns])
+        has_unique_key = any(set(k) == set(by_columns) for k in self.unique_keys)
+        join_op = "=" if has_unique_key else "<=>"
+        join_str = " AND ".join(["T.%s %s S.%s" %(c, join_op, c) for c in by_columns])
+
+        with self.connection() as conn:
+            self.executeSQL("DROP TEMPORARY TABLE IF EXISTS %s" %stage, conn = conn)
+            self.executeSQL(
+                "CREATE TEMPORARY TABLE %s SELECT %s FROM %s LIMIT 0" %(stage, cols_str, self._name),
+                conn = conn,
+            )
+            try:
+                insert_str, insert_data = self._prepare_insertDF(input_data, table_name = stage)
+                self.executeSQL(insert_str, insert_data, conn = conn)
+
+                if has_unique_key:
+                    existing = int(self.executeSQL(
+                        "SELECT COUNT(*) FROM %s S INNER JOIN %s T ON %s" %(stage, self._name, join_str),
+                        conn = conn,
+                    )[0][0])
+                    affected = self.executeSQL(
+                        '''
+                        INSERT INTO %s (%s)
+                        SELECT %s FROM %s S
+                        ON DUPLICATE KEY UPDATE %s
+                        ''' %(
+                            self._name, cols_str,
+                            src_cols_str, stage,
+                            ", ".join(["%s = S.%s" %(c, c) for c in (value_cols or by_columns)]),
+                        ),
+                        return_rows_affected = True,
+                        conn = conn,
+                    )
+                    #--| MySQL counts 1 per inserted row, 2 per changed row, 0 per unchanged row
+                    inserted = len(input_data) - existing
+                    updated = (affected - inserted) // 2
+                else:
+                    updated = 0
+                    if value_cols:
+                        updated = self.executeSQL(
+                            "UPDATE %s T INNER JOIN %s S ON %s SET %s" %(
+                                self._name, stage, join_str,
+                                ", ".join(["T.%s = S.%s" %(c, c) for c in value_cols]),
+                            ),
+                            return_rows_affected = True,
+                            conn = conn,
+                        )
+                    inserted = self.executeSQL(
+                        '''
+                        INSERT INTO %s (%s)
+                        SELECT %s FROM %s S
+                        LEFT JOIN %s T ON %s
+                        WHERE T.id IS NULL
+                        ''' %(
+                            self._name, cols_str,
+                            src_cols_str, stage,
+                            self._name, join_str,
+                        ),
+                        return_rows_affected = True,
+                        conn = conn,
+                    )
+            finally:
+                self.executeSQL("DROP TEMPORARY TABLE IF EXISTS %s" %stage, conn = conn)
+        return {'inserted': int(inserted), 'updated': int(updated)}
 
     def upsertDF(self,
                     df:pd.DataFrame,
                     filter_by_columns:List[str]=None,
                     no_filter:bool=False,
         ):
+        '''
+            Inserts rows of df that have no match on filter_by_columns (all
+            columns of df by default) and updates those that do. no_filter=True
+            inserts every row as is.
+        '''
         if df.empty:
             return {'inserted': 0, 'updated': 0}
         if not self.insertableDF(df):
             raise Exception("df to be upserted did not pass table upsert check.")
         
-        inserted = 0
-        updated = 0
         if no_filter:
-            upsert_data = {'insert':df, 'update':pd.DataFrame()}
-        else:
-            upsert_data = self._upsert_filter(df,filter_by_columns)
-
-        
-        if not upsert_data['insert'].empty:
-            insert_str, insert_data = self._prepare_insertDF(upsert_data['insert'])
+            insert_str, insert_data = self._prepare_insertDF(df)
             rows_affected = self.executeSQL(insert_str,insert_data, return_rows_affected=True)
-            inserted += rows_affected
-        if not upsert_data['update'].empty:
-            update_str, update_data = self._prepare_updateDF(upsert_data['update'])
-            rows_affected = self.executeSQL(update_str, update_data, return_rows_affected=True)
-            updated += rows_affected
-        
-        return {'inserted': inserted, 'updated': updated}
+            return {'inserted': rows_affected, 'updated': 0}
+
+        if filter_by_columns is None:
+            filter_by_columns = list(df.columns)
+        assert set(filter_by_columns).issubset(set(df.columns))
+        return self._set_based_upsert(df, filter_by_columns)
     
     def delete_duplicates(self,
                             by_columns:List[str] =None,
@@ -1,6 +1,6 @@
 from qfengine.data.price.price_handler import PriceHandler
+from qfengine.data.price.bid_ask_index import BidAskLookupIndex
 from qfengine.asset.universe.static import StaticUniverse
-import functools
 from qfengine import settings
 import numpy as np
 import pandas as pd
@@ -20,7 +20,7 @@ class BacktestPriceHandler(PriceHandler):
                          universe = universe,
                          **kwargs
                          )
-        self._assets_bid_ask_frames = {}
+        self._bid_ask_index = BidAskLookupIndex.empty()
         if self.universe is None:
             self.universe = StaticUniverse(self.assetsList(**kwargs))
             if settings.PRINT_EVENTS:
@@ -32,7 +32,7 @@ class BacktestPriceHandler(PriceHandler):
             if kwargs['preload_bid_ask_data']:
                 if settings.PRINT_EVENTS:
                     print("Preloading bid_ask data of assets in universe")
-                (self._get_bid_ask_df(s) for s in universe.get_assets())
+                self._load_bid_ask_index(self.universe.get_assets())
 
     def assetsDF(self, **kwargs):
         df = pd.DataFrame()
@@ -62,41 +62,62 @@ class BacktestPriceHandler(PriceHandler):
 
 
     #!---| Bid & Ask Functions |---!#
-    @functools.lru_cache(maxsize = 1024 * 1024)
     def get_asset_latest_bid_price(self, dt, asset_symbol):
         # TODO: Check for asset in Universe
-        bid_ask_df = self._get_bid_ask_df(asset_symbol)
-        bid = np.NaN
-        try:
-            bid = bid_ask_df.iloc[bid_ask_df.index.get_loc(dt, method='pad')]['bid']
-        except KeyError:  # Before start date
-            pass
-        return bid
+        return self._latest_bid_ask(dt, asset_symbol)[0]
 
-    @functools.lru_cache(maxsize = 1024 * 1024)
     def get_asset_latest_ask_price(self, dt, asset_symbol):
         """
         """
         # TODO: Check for asset in Universe
-        bid_ask_df = self._get_bid_ask_df(asset_symbol)
-        ask = np.NaN
-        try:
-            ask = bid_ask_df.iloc[bid_ask_df.index.get_loc(dt, method='pad')]['ask']
-        except KeyError:  # Before start date
-            pass
-        return ask
+        return self._latest_bid_ask(dt, asset_symbol)[1]
 
     def get_asset_latest_bid_ask_price(self, dt, asset_symbol):
         """
         """
-        # TODO: For the moment this is sufficient for OHLCV
-        # data, which only usually provides mid prices
-        # This will need to be revisited when handling intraday
-        # bid/ask time series.
-        # It has been added as an optimisation mechanism for
-        # interday backtests.
-        bid = self.get_asset_latest_bid_price(dt, asset_symbol)
-        return (bid, bid)
+        # Daily OHLCV sources quote bid == ask, intraday sources
+        # with bid/ask columns quote the real spread.
+        return self._latest_bid_ask(dt, asset_symbol)
+
+    def get_assets_latest_bid_ask(self, dt, asset_symbols:List[str]):
+        """
+        Latest bid and ask prices of many assets at once.
+        Parameters
+        ----------
+        dt : `pd.Timestamp`
+            The timestamp to look prices up at (or the latest before it).
+        asset_symbols : `list[str]`
+            The asset symbols.
+        Returns
+        -------
+        `tuple(np.ndarray, np.ndarray)`
+            Bid and ask prices aligned with asset_symbols, NaN before
+            an asset's first available price.
+        """
+        index = self._get_bid_ask_index(asset_symbols, dt)
+        return index.latest_bids_asks(self._dt_value(dt), asset_symbols)
+
+    def get_assets_latest_bid_ask_matrix(self, dts, asset_symbols:List[str]):
+        """
+        Latest bid and ask prices of many assets at many timestamps at once.
+        Parameters
+        ----------
+        dts : `list[pd.Timestamp]`
+            The timestamps to look prices up at (or the latest before each).
+        asset_symbols : `list[str]`
+            The asset symbols.
+        Returns
+        -------
+        `tuple(np.ndarray, np.ndarray)`
+            Bid and ask prices shaped (len(dts), len(asset_symbols)),
+            NaN before an asset's first available price.
+        """
+        dts = list(dts)
+        index = self._get_bid_ask_index(asset_symbols, dts[0] if len(dts) else None)
+        return index.latest_bids_asks_matrix(
+                        np.array([self._dt_value(dt) for dt in dts], dtype = np.int64),
+                        asset_symbols
+        )
 
     def get_asset_latest_mid_price(self, dt, asset_symbol):
         """
@@ -109,6 +130,26 @@ class BacktestPriceHandler(PriceHandler):
             mid = np.NaN
         return mid
 
+    def get_assets_latest_mid_prices(self, dt, asset_symbols:List[str]):
+        """
+        Latest mid prices of many assets at once, in a single lookup.
+        Parameters
+        ----------
+        dt : `pd.Timestamp`
+            The timestamp to look prices up at (or the latest before it).
+        asset_symbols : `list[str]`
+            The asset symbols.
+        Returns
+        -------
+        `np.ndarray`
+            Mid prices aligned with asset_symbols, NaN before an
+            asset's first available price.
+        """
+        if len(asset_symbols) == 0:
+            return np.empty(0, dtype = np.float64)
+        bids, asks = self.get_assets_latest_bid_ask(dt, asset_symbols)
+        return (bids + asks) / 2.0
+
     #!---| Daily Price (OHLCV) Functions |---!#
     def get_assets_historical_closes(self,
                                      asset_symbols:List[str],
@@ -291,7 +332,7 @@ class BacktestPriceHandler(PriceHandler):
 
     #!---| BACKEND FUNCS
     def _reset_cached_frames(self):
-        self._assets_bid_ask_frames = {}
+        self._bid_ask_index = BidAskLookupIndex.empty()
 
     def _convert_dt_to_date(self, dt):
         return pd.Timestamp(
@@ -309,19 +350,67 @@ class BacktestPriceHandler(PriceHandler):
           raise
 
     def _get_bid_ask_df(self, asset_symbol):
-        if asset_symbol not in self._assets_bid_ask_frames:
-            for ds in self.price_data_sources:
-                try:
-                    self._assets_bid_ask_frames[
-                                        asset_symbol
-                                               ] = ds.get_assets_bid_ask_dfs(
-                                                                    asset_symbol
-                                                                            )[asset_symbol]
-                    break
-                except:
-                    pass
-            assert asset_symbol in self._assets_bid_ask_frames
-        return self._assets_bid_ask_frames[asset_symbol]
+        return self._get_bid_ask_index(
+                            [asset_symbol]
+                        ).to_bid_ask_df(asset_symbol, tz = settings.TIMEZONE)
+
+    def _latest_bid_ask(self, dt, asset_symbol):
+        index = self._bid_ask_index
+        if asset_symbol not in index:
+            index = self._get_bid_ask_index([asset_symbol], dt)
+        return index.latest_bid_ask(self._dt_value(dt), asset_symbol)
+
+    def _dt_value(self, dt)->int:
+        #--| int64 ns since epoch (UTC), as stored in the bid/ask index
+        if isinstance(dt, pd.Timestamp) and dt.tzinfo is not None:
+            return dt.value
+        return self._format_dt(dt).value
+
+    def _get_bid_ask_index(self, asset_symbols:List[str], dt = None)->BidAskLookupIndex:
+        index = self._bid_ask_index
+        missing = [s for s in asset_symbols if s not in index]
+        if len(missing) > 0:
+            #--| compile the rest of the universe in the same pass, not one symbol at a time
+            try:
+                universe_assets = self.universe.get_assets(dt)
+            except Exception:
+                universe_assets = []
+            missing = missing + [s for s in universe_assets if (s not in index) and (s not in missing)]
+            index = self._load_bid_ask_index(missing)
+            not_found = [s for s in asset_symbols if s not in index]
+            assert len(not_found) == 0, "No bid/ask data available in price_data_sources for: %s" %not_found
+        return index
+
+    def _load_bid_ask_index(self, asset_symbols:List[str])->BidAskLookupIndex:
+        symbols = [s for s in asset_symbols if s not in self._bid_ask_index]
+        for ds in self.price_data_sources:
+            if len(symbols) == 0:
+                break
+            if hasattr(ds, 'get_assets_bid_ask_index'):
+                #--| array-backed sources compile the index without building frames
+                self._bid_ask_index = self._bid_ask_index.merge(
+                                                ds.get_assets_bid_ask_index(*symbols)
+                                        )
+                symbols = [s for s in symbols if s not in self._bid_ask_index]
+                continue
+            try:
+                bid_ask_df = ds.get_assets_bid_ask_dfs(*symbols)
+            except Exception:
+                #--| source rejects the batch (e.g. unknown symbols), fall back to one at a time
+                frames = []
+                for s in symbols:
+                    try:
+                        frames.append(ds.get_assets_bid_ask_dfs(s)[[s]])
+                    except Exception:
+                        pass
+                if len(frames) == 0:
+                    continue
+                bid_ask_df = pd.concat(frames, axis = 1)
+            self._bid_ask_index = self._bid_ask_index.merge(
+                                            BidAskLookupIndex.from_bid_ask_df(bid_ask_df)
+                                    )
+            symbols = [s for s in symbols if s not in self._bid_ask_index]
+        return self._bid_ask_index
 
     def _get_dt_range_df(self, asset_symbols:List[str]):
         symbols = asset_symbols
@@ -0,0 +1,169 @@
+from typing import List
+import numpy as np
+import pandas as pd
+
+
+class BidAskLookupIndex(object):
+    '''
+        Compiled, immutable "as of" bid/ask lookup over many symbols.
+
+        Every symbol's (timestamp, bid, ask) series is stored in flat NumPy arrays,
+        one contiguous time-sorted segment per symbol:
+            _ts  : int64 ns (UTC) timestamps
+            _bid : float64 bids
+            _ask : float64 asks
+        Each entry is also given an int64 key = slot * n_stamps + rank, where rank
+        is the position of its timestamp on the union timeline of all symbols.
+        Keys are therefore globally sorted, and the latest quote at or before dt
+        for a whole batch of symbols is one np.searchsorted call.
+
+        Instances are never mutated (merge() returns a new index), so a single
+        index can be shared by every copy of a price handler.
+    '''
+
+    def __init__(self,
+                 symbols:List[str],
+                 ts:np.ndarray,
+                 bid:np.ndarray,
+                 ask:np.ndarray,
+                 starts:np.ndarray,
+    ):
+        self.symbols = list(symbols)
+        self._slot = {s:i for i,s in enumerate(self.symbols)}
+        self._ts = ts
+        self._bid = bid
+        self._ask = ask
+        self._starts = starts  #---| segment bounds, len(symbols) + 1
+        self._timeline = np.unique(ts)
+        n_stamps = max(len(self._timeline), 1)
+        slots = np.repeat(np.arange(len(self.symbols), dtype = np.int64), np.diff(starts))
+        self._n_stamps = n_stamps
+        self._keys = slots * n_stamps + np.searchsorted(self._timeline, ts)
+
+    @classmethod
+    def empty(cls):
+        return cls(
+                [],
+                np.empty(0, dtype = np.int64),
+                np.empty(0, dtype = np.float64),
+                np.empty(0, dtype = np.float64),
+                np.zeros(1, dtype = np.int64),
+        )
+
+    @classmethod
+    def from_bid_ask_df(cls, bid_ask_df:pd.DataFrame):
+        '''
+            bid_ask_df : columns MultiIndex (symbols, ['bid','ask']) as returned by
+            PriceDataSource.get_assets_bid_ask_dfs(). Rows where a symbol has no
+            quote (NaN, from the union index of several symbols) are dropped.
+        '''
+        index = pd.DatetimeIndex(bid_ask_df.index)
+        order = np.argsort(index.asi8, kind = 'stable')
+        all_ts = index.asi8[order]
+        symbols, ts, bid, ask, starts = [], [], [], [], [0]
+        for symbol in bid_ask_df.columns.get_level_values('symbols').unique():
+            b = bid_ask_df[symbol]['bid'].values.astype(np.float64)[order]
+            a = bid_ask_df[symbol]['ask'].values.astype(np.float64)[order]
+            has_quote = ~(np.isnan(b) & np.isnan(a))
+            symbols.append(symbol)
+            ts.append(all_ts[has_quote])
+            bid.append(b[has_quote])
+            ask.append(a[has_quote])
+            starts.append(starts[-1] + int(has_quote.sum()))
+        if len(symbols) == 0:
+            return cls.empty()
+        return cls(
+                symbols,
+                np.concatenate(ts),
+                np.concatenate(bid),
+                np.concatenate(ask),
+                np.array(starts, dtype = np.int64),
+        )
+
+    def merge(self, other):
+        '''
+            New index holding the symbols of both; symbols of other win on overlap.
+        '''
+        keep = [s for s in self.symbols if s not in other._slot]
+        symbols, ts, bid, ask, starts = [], [], [], [], [0]
+        for source, source_symbols in ((self, keep), (other, other.symbols)):
+            for s in source_symbols:
+                i = source._slot[s]
+                seg = slice(source._starts[i], source._starts[i+1])
+                symbols.append(s)
+                ts.append(source._ts[seg])
+                bid.append(source._bid[seg])
+                ask.append(source._ask[seg])
+                starts.append(starts[-1] + (seg.stop - seg.start))
+        if len(symbols) == 0:
+            return BidAskLookupIndex.empty()
+        return BidAskLookupIndex(
+                symbols,
+                np.concatenate(ts),
+                np.concatenate(bid),
+                np.concatenate(ask),
+                np.array(starts, dtype = np.int64),
+        )
+
+    def __contains__(self, symbol):
+        return symbol in self._slot
+
+    def __len__(self):
+        return len(self.symbols)
+
+    def latest_bid_ask(self, dt_value:int, symbol:str):
+        '''
+            Latest (bid, ask) at or before dt_value (int64 ns, UTC) for one symbol,
+            (NaN, NaN) before its first quote.
+        '''
+        i = self._slot[symbol]
+        start, end = self._starts[i], self._starts[i+1]
+        pos = start + np.searchsorted(self._ts[start:end], dt_value, side = 'right') - 1
+        if pos < start:
+            return (np.NaN, np.NaN)
+        return (self._bid[pos], self._ask[pos])
+
+    def latest_bids_asks(self, dt_value:int, symbols:List[str]):
+        '''
+            Batched latest_bid_ask(): arrays of bids and asks aligned with symbols.
+        '''
+        slots = np.fromiter((self._slot[s] for s in symbols), dtype = np.int64, count = len(symbols))
+        rank = np.searchsorted(self._timeline, dt_value, side = 'right') - 1
+        if rank < 0:
+            nan = np.full(len(symbols), np.NaN)
+            return nan, nan.copy()
+        pos = np.searchsorted(self._keys, slots * self._n_stamps + rank, side = 'right') - 1
+        found = pos >= self._starts[slots]
+        pos = np.where(found, pos, 0)
+        bids = np.where(found, self._bid[pos] if len(self._bid) else np.NaN, np.NaN)
+        asks = np.where(found, self._ask[pos] if len(self._ask) else np.NaN, np.NaN)
+        return bids, asks
+
+    def latest_bids_asks_matrix(self, dt_values:np.ndarray, symbols:List[str]):
+        '''
+            latest_bids_asks() at many timestamps at once: (len(dt_values),
+            len(symbols)) arrays of bids and asks, from one np.searchsorted call.
+        '''
+        dt_values = np.asarray(dt_values, dtype = np.int64)
+        shape = (len(dt_values), len(symbols))
+        if len(self._bid) == 0 or 0 in shape:
+            nan = np.full(shape, np.NaN)
+            return nan, nan.copy()
+        slots = np.fromiter((self._slot[s] for s in symbols), dtype = np.int64, count = len(symbols))
+        rank = np.searchsorted(self._timeline, dt_values, side = 'right') - 1
+        pos = np.searchsorted(self._keys, slots[None, :] * self._n_stamps + rank[:, None], side = 'right') - 1
+        found = (rank[:, None] >= 0) & (pos >= self._starts[slots][None, :])
+        pos = np.where(found, pos, 0)
+        return (
+                np.where(found, self._bid[pos], np.NaN),
+                np.where(found, self._ask[pos], np.NaN),
+        )
+
+    def to_bid_ask_df(self, symbol:str, tz = None)->pd.DataFrame:
+        i = self._slot[symbol]
+        seg = slice(self._starts[i], self._starts[i+1])
+        index = pd.DatetimeIndex(self._ts[seg]).tz_localize('UTC')
+        if tz is not None:
+            index = index.tz_convert(tz)
+        index.name = 'datetime'
+        return pd.DataFrame({'bid': self._bid[seg], 'ask': self._ask[seg]}, index = index)
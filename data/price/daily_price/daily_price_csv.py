@@ -217,49 +217,6 @@ class DailyPriceCSV(CSVPriceDataSource):
         except:
           raise
 
-    def _price_dfs_to_bid_ask_dfs(self, 
-                                  price_df:pd.DataFrame
-    ):
-        def _symbol_price_to_bid_ask(bar_df, symbol):
-          cols = [
-                np.array([symbol, symbol]),
-                np.array(['bid', 'ask'])
-                ]
-          if bar_df.dropna().empty:
-            return pd.DataFrame(columns = cols)
-          bar_df = bar_df.sort_index()
-          oc_df = bar_df.loc[:, ['open', 'close']]
-          oc_df['pre_market'] = oc_df['close'].shift(1)
-          oc_df['post_market'] = oc_df['close']
-          oc_df = oc_df.dropna()
-          # Convert bars into separate rows for open/close prices
-          # appropriately timestamped
-          seq_oc_df = oc_df.T.unstack(level=0).reset_index()
-          seq_oc_df.columns = ['datetime', 'market', 'price']
-
-          seq_oc_df.loc[seq_oc_df['market'] == 'open', 'datetime'] += pd.Timedelta(hours=9, minutes=30)
-          seq_oc_df.loc[seq_oc_df['market'] == 'close', 'datetime'] += pd.Timedelta(hours=16, minutes=00)
-          seq_oc_df.loc[seq_oc_df['market'] == 'pre_market', 'datetime'] += pd.Timedelta(hours=0, minutes=00)
-          seq_oc_df.loc[seq_oc_df['market'] == 'post_market', 'datetime'] += pd.Timedelta(hours=23, minutes=59)
-
-          # TODO: Unable to distinguish between Bid/Ask, implement later
-          dp_df = seq_oc_df[['datetime', 'price']]
-          dp_df['bid'] = dp_df['price']
-          dp_df['ask'] = dp_df['price']
-          dp_df = dp_df.loc[:, ['datetime', 'bid', 'ask']].fillna(method='ffill').set_index('datetime').sort_index()
-          dp_df.columns = cols
-          return dp_df 
-        
-        bid_ask_df = pd.concat(
-                      [
-                        _symbol_price_to_bid_ask(price_df[symbol], symbol) 
-                          for symbol in price_df.columns.get_level_values('symbols').unique()
-                      ], axis = 1
-                    )
-        bid_ask_df.columns.names = ('symbols', 'columns') 
-
-        return bid_ask_df
-
     def _asset_symbol_min_price_date(self, symbol):
         df = self._csv_to_df(self._csv_file_from_symbol(symbol))
         return df.dropna().sort_index().index[1]
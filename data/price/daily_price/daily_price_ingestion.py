@@ -0,0 +1,133 @@
+from qfengine.data.price.daily_price.daily_price_mysql import DailyPriceMySQL, DailyPriceWatermarkMySQL
+from qfengine import settings
+from typing import List
+import pandas as pd
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class DailyPriceIngestionPipeline(object):
+    '''
+        Incremental daily price ingestion from one vendor into DailyPriceMySQL.
+
+        Keeps a (symbol, vendor) high-water mark table (DailyPriceWatermarkMySQL)
+        and for every run:
+            1) reads the marks of the vendor in one query, seeding missing ones
+               from the daily price table with one GROUP BY query,
+            2) groups symbols by their next missing date and asks the vendor for
+               batch_size symbols per get_barset() request, from that date on,
+            3) keeps only bars strictly after each symbol's mark and appends
+               them without any per-row upsert filtering,
+            4) advances the marks of the batch.
+
+        vendor_client is anything with the vendor APIs'
+            get_barset(symbols, timeframe, start_date, end_date) -> DataFrame
+        returning MultiIndex ('symbols','columns') columns of daily bars, so the
+        pipeline runs just as well against a local fake client.
+    '''
+
+    def __init__(self,
+                 daily_price:DailyPriceMySQL,
+                 vendor:str,
+                 vendor_client = None,
+                 watermarks:DailyPriceWatermarkMySQL = None,
+                 batch_size:int = 100,
+    ):
+        assert vendor in daily_price.vendors.List
+        self.daily_price = daily_price
+        self.vendor = vendor
+        self.vendor_id = int(daily_price.vendors.DF.id[vendor])
+        self.vendor_client = vendor_client or daily_price.vendors.get_vendor_API(vendor)
+        self.watermarks = watermarks or DailyPriceWatermarkMySQL(
+                                            daily_price._db_credentials.copy(),
+                                            name = "%s_watermark" %daily_price._name,
+                                        )
+        self.batch_size = batch_size
+
+    def run(self,
+            symbols:List[str] = None,
+            end_date = None,
+    ):
+        t0 = pd.Timestamp.now()
+        symbols_id = self.daily_price.symbols.DF['id']
+        if symbols is not None:
+            omitted = [s for s in symbols if s not in symbols_id.index]
+            if len(omitted) > 0:
+                logger.warning("Omitting %s given symbols that are not in database universe" %str(len(omitted)))
+            symbols_id = symbols_id.reindex([s for s in symbols if s not in omitted])
+        symbols_id = symbols_id.astype(int)
+        assert len(symbols_id) != 0, "No symbols to ingest daily prices for."
+
+        marks = self._current_watermarks(symbols_id)
+        inserted_count = 0
+        batch_number = 0
+        #---| symbols sharing a mark share the vendor requests (NaT = no history yet)
+        for mark, group in symbols_id.groupby(marks.reindex(symbols_id.values).values, dropna = False):
+          start_date = None if pd.isnull(mark) else (pd.Timestamp(mark) + pd.Timedelta(days = 1))
+          if (start_date is not None) and (end_date is not None) and (start_date > pd.Timestamp(end_date)):
+            continue
+          group_symbols = list(group.index)
+          for i in range(0, len(group_symbols), self.batch_size):
+            batch_number += 1
+            batch = group_symbols[i:i+self.batch_size]
+            barset = self.vendor_client.get_barset(batch, "1D", start_date, end_date)
+            rows = self._new_rows(barset, symbols_id, marks)
+            if rows.empty:
+              continue
+            inserted = self.daily_price.upsertDF(rows, no_filter = True)['inserted']
+            inserted_count += inserted
+            self.watermarks.set_watermarks(
+                          self.vendor_id,
+                          pd.to_datetime(rows['price_date']).groupby(rows['symbol_id'].values).max(),
+            )
+            if settings.PRINT_EVENTS:
+              print("  Batch #%s : %s New Data Points Inserted for %s symbols" %(str(batch_number), inserted, len(batch)))
+
+        if settings.PRINT_EVENTS:
+          print("Incremental Update Completed (%s):" %self.vendor)
+          print("--Total Data Points Inserted: %s" %(str(inserted_count)))
+          print("--Total Time Elapsed: %s" %(str(pd.Timestamp.now() - t0)))
+        return {'inserted': inserted_count, 'updated': 0}
+
+    def _current_watermarks(self, symbols_id:pd.Series)->pd.Series:
+        marks = self.watermarks.get_watermarks(self.vendor_id)
+        unmarked = [i for i in symbols_id.values if i not in marks.index]
+        if len(unmarked) > 0:
+          seeded = self.daily_price._query_max_price_dates_by_vendor_id(self.vendor_id)
+          seeded = seeded.reindex([i for i in unmarked if i in seeded.index])
+          if len(seeded) > 0:
+            self.watermarks.set_watermarks(self.vendor_id, seeded)
+            marks = pd.concat([marks, seeded])
+        return marks
+
+    def _new_rows(self,
+                  barset:pd.DataFrame,
+                  symbols_id:pd.Series,
+                  marks:pd.Series,
+    )->pd.DataFrame:
+        '''
+            Daily price table rows of every bar in barset after its symbol's mark.
+        '''
+        if (barset is None) or barset.empty:
+          return pd.DataFrame()
+        barset = barset.copy()
+        dates = pd.DatetimeIndex(barset.index)
+        if dates.tz is not None:
+          dates = dates.tz_convert(settings.TIMEZONE).tz_localize(None)
+        barset.index = dates.normalize()
+        barset.index.name = 'price_date'
+        barset.columns.names = ('symbols','columns')
+        rows = barset.stack(level = 'symbols').reset_index()
+        rows = rows[rows['symbols'].isin(symbols_id.index)]
+        rows['symbol_id'] = symbols_id.reindex(rows['symbols'].values).values.astype(int)
+        price_columns = [c for c in self.daily_price.price_columns if c in rows.columns]
+        rows = rows.dropna(subset = price_columns, how = 'all')
+
+        last = marks.reindex(rows['symbol_id'].values).values
+        rows = rows[pd.isnull(last) | (rows['price_date'].values > last)]
+        rows = rows[['symbol_id', 'price_date'] + price_columns]
+        rows['data_vendor_id'] = self.vendor_id
+        rows['price_date'] = [d.date() for d in rows['price_date']]
+        rows = rows.astype(object)
+        return rows.where(pd.notnull(rows), None).reset_index(drop = True)
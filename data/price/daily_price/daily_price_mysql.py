@@ -220,6 +220,75 @@ class SecurityMySQL(SQLTable):
 
 
 
+class DailyPriceWatermarkMySQL(SQLTable):
+    '''
+        High-water mark of the daily price table: latest price_date already
+        ingested for every (symbol, vendor), so incremental updates only ask
+        vendors for the bars after it.
+    '''
+    create_schema = (
+      '''
+      CREATE TABLE `%s` (
+        `id` int NOT NULL AUTO_INCREMENT,
+        `symbol_id` int NOT NULL,
+        `data_vendor_id` int NOT NULL,
+        `last_price_date` date NOT NULL,
+        `created_date` datetime NULL DEFAULT CURRENT_TIMESTAMP(),
+        `last_updated_date` datetime NULL DEFAULT CURRENT_TIMESTAMP() ON UPDATE CURRENT_TIMESTAMP(),
+        PRIMARY KEY (`id`),
+        UNIQUE KEY `symbol_vendor` (`symbol_id`, `data_vendor_id`)
+      ) ENGINE=InnoDB AUTO_INCREMENT=1 DEFAULT CHARSET=utf8
+      '''
+    )
+    unique_key_columns = ['symbol_id', 'data_vendor_id']
+
+    def __init__(
+                 self,
+                 db_credentials:Dict = None,
+                 name:str = 'daily_price_watermark',
+                 **kwargs
+    ):
+      super().__init__(
+              (db_credentials if db_credentials is not None
+              else settings.MYSQL_CREDENTIALS),
+              name,
+              (DailyPriceWatermarkMySQL.create_schema %name),
+              **kwargs
+                       )
+
+    def get_watermarks(self, vendor_id:int)->pd.Series:
+      '''
+          last_price_date (naive pd.Timestamp) indexed by symbol_id.
+      '''
+      dat = self.executeSQL(
+        "SELECT symbol_id, last_price_date FROM %s WHERE data_vendor_id = %s" %(self._name, int(vendor_id))
+      )
+      return pd.Series(
+                  pd.to_datetime([d[1] for d in dat]),
+                  index = pd.Index([int(d[0]) for d in dat], name = 'symbol_id'),
+                  dtype = 'datetime64[ns]',
+                  name = 'last_price_date',
+      )
+
+    def set_watermarks(self, vendor_id:int, watermarks:pd.Series):
+      '''
+          watermarks: last_price_date indexed by symbol_id.
+      '''
+      if len(watermarks) == 0:
+        return {'inserted': 0, 'updated': 0}
+      return self.upsertDF(
+                pd.DataFrame(
+                  {
+                    'symbol_id': [int(i) for i in watermarks.index],
+                    'data_vendor_id': int(vendor_id),
+                    'last_price_date': [pd.Timestamp(d).date() for d in watermarks.values],
+                  }
+                ),
+                self.unique_key_columns,
+      )
+
+
+
 class DailyPriceMySQL(SQLTable):
     create_schema = (
       '''
@@ -236,6 +305,7 @@ class DailyPriceMySQL(SQLTable):
         `created_date` datetime NULL DEFAULT CURRENT_TIMESTAMP(),
         `last_updated_date` datetime NULL DEFAULT CURRENT_TIMESTAMP() ON UPDATE CURRENT_TIMESTAMP(),
         PRIMARY KEY (`id`),
+        UNIQUE KEY `price_date_symbol_vendor` (`price_date`, `symbol_id`, `data_vendor_id`),
         KEY `price_date` (`price_date` ASC),
         KEY `data_vendor_id` (`data_vendor_id`),
         KEY `symbol_id` (`symbol_id`),
@@ -252,6 +322,9 @@ class DailyPriceMySQL(SQLTable):
       ) ENGINE=InnoDB AUTO_INCREMENT=1 DEFAULT CHARSET=utf8
       '''
                     )
+    price_columns = ["open", "high", "low", "close", "volume"]
+    unique_key_columns = ['price_date', 'symbol_id', 'data_vendor_id']  #---| upsert key
+    bulk_query_chunk_size = 500  #---| symbols per IN (...) query when loading prices
     
     def __init__(
                  self,
@@ -283,24 +356,22 @@ class DailyPriceMySQL(SQLTable):
         self.symbols_list = self._query_available_symbols_in_database_by_vendor(self.by_vendor)
         if settings.PRINT_EVENTS:
           print("Initialized DailyPriceMySQL DataSource From Vendor '%s' | Available Symbols Count = %s" %(str(self.by_vendor), str(len(self.symbols_list))))
-      self._cached_copies = []
 
 
    #!----------| ABSTRACTED METHODS OF A PRICE DATA SOURCE |------------#
     #---| Self-Copy
-    def create_price_source_copy(self,
-                                 cache_copy:bool = False,
-    ):
+    def create_price_source_copy(self):
+      #--| copies borrow from the same connection pool (same credentials)
       copy = DailyPriceMySQL(
                         asset_type = self.asset_type,
                         db_credentials = self._db_credentials.copy(),
                         name = self._full_credentials['table_name'],
+                        symbols = self.symbols,
+                        vendors = self.vendors,
                         by_vendor = None,
                             )
       copy.by_vendor = self.by_vendor #--| skip SQL vetting
       copy.symbols_list = (self.symbols_list.copy() if self.symbols_list else self.symbols_list)
-      if cache_copy:
-        self._cached_copies.append(copy)
       return copy
     #---------------------------|
 
@@ -357,11 +428,8 @@ class DailyPriceMySQL(SQLTable):
                                               **kwargs
     )->pd.DataFrame:
         if price:
-            assert price in [
-                  "open", "high", "low",
-                  "close","volume"
-                          ]
-        #--| parallelizing queries for performance
+            assert price in self.price_columns
+        #--| all symbols loaded by bulk queries on one connection
         symbols = [asset] + [s for s in assets]
         result = self._assets_daily_price_DF(*symbols)
         if price:
@@ -391,29 +459,19 @@ class DailyPriceMySQL(SQLTable):
         if self.symbols_list:
           assert set(symbols).issubset(self.symbols_list)
         
-        def _get_result(source, symbol, vendor):
+        def _get_result(symbol, vendor):
           return {
               'symbol': symbol,
-              'start_dt': self._format_dt(source._asset_symbol_min_price_date_by_vendor(symbol, vendor)),
-              'end_dt': self._format_dt(source._asset_symbol_max_price_date_by_vendor(symbol,vendor)),
+              'start_dt': self._format_dt(self._asset_symbol_min_price_date_by_vendor(symbol, vendor)),
+              'end_dt': self._format_dt(self._asset_symbol_max_price_date_by_vendor(symbol,vendor)),
                 }
         final_df = pd.DataFrame()
         for vendor in self.vendorsList:
-          result = pd.DataFrame.from_dict(
-                                list(
-                                  concurrent.futures.ThreadPoolExecutor().map(
-                                                                          _get_result, 
-                                                                          *zip(*(
-                                                                            (
-                                                                              self.create_price_source_copy(cache_copy = True),
-                                                                              symbol,
-                                                                              vendor,
-                                                                            ) for symbol in symbols
-                                                                                ))
-                                                                              )
-                                    )
-                                          ).set_index('symbol').dropna()
-          self._close_cached_copies()
+          #--| each thread borrows a pooled connection per query, at most pool max_size at once
+          with concurrent.futures.ThreadPoolExecutor(max_workers = self._pool.max_size) as executor:
+            result = pd.DataFrame.from_dict(
+                                  list(executor.map(_get_result, symbols, [vendor] * len(symbols)))
+                                            ).set_index('symbol').dropna()
           final_df = final_df.append(result)
           symbols = [s for s in symbols if s not in final_df.index]
           if len(symbols) == 0:
@@ -459,7 +517,7 @@ class DailyPriceMySQL(SQLTable):
       t0 = pd.Timestamp.now()
 
       if DF is not None: #---| UPSERT ONCE WITH GIVEN DATAFRAME (NO API CALLS WILL BE MADE)
-        self._upsert_daily_price_DF(DF,['price_date', 'symbol_id', 'data_vendor_id'])
+        self._upsert_daily_price_DF(DF, self.unique_key_columns)
 
       else: #---| PERFORM UPSERT IN BATCHES OF SYMBOLS BY MAKING API CALLS
         if symbols_to_update is not None:
@@ -527,6 +585,25 @@ class DailyPriceMySQL(SQLTable):
       print("--Total Data Points Updated: %s" %(str(updated_count)))
       print("--Total Time Elapsed: %s" %(str(pd.Timestamp.now() - t0)))
 
+    def update_assets_daily_price_incremental(self,
+              vendor:str,
+              batch_size:int = 100,
+              symbols_to_update:List[str] = None,
+              end_date = None,
+              vendor_client = None,
+    ):
+      '''
+          Appends only the bars after each (symbol, vendor) high-water mark,
+          see DailyPriceIngestionPipeline.
+      '''
+      from qfengine.data.price.daily_price.daily_price_ingestion import DailyPriceIngestionPipeline
+      return DailyPriceIngestionPipeline(
+                    self,
+                    vendor,
+                    vendor_client = vendor_client,
+                    batch_size = batch_size,
+              ).run(symbols = symbols_to_update, end_date = end_date)
+
     @property
     def vendorsDF(self,)->pd.DataFrame:
       return self.vendors.DF.reindex(self.vendorsList)
@@ -629,30 +706,16 @@ class DailyPriceMySQL(SQLTable):
         symbols = [asset] + [s for s in assets]
         if self.symbols_list:
           assert set(symbols).issubset(self.symbols_list)
-        result = pd.DataFrame()
+        vendor_dfs = []
         for vendor in self.vendorsList:
-          all_dfs = concurrent.futures.ThreadPoolExecutor().map(
-                                          self.__class__._query_asset_symbol_daily_price_DF, 
-                                          *zip(*(
-                                            (
-                                              self.create_price_source_copy(cache_copy = True),
-                                              symbol,
-                                              vendor,
-                                            ) for symbol in symbols
-                                                ))
-                                                          )
-          final_df = pd.concat([
-                  d.where(pd.notna(d), np.nan) for d in all_dfs if (
-                                                  not d.where(pd.notna(d), np.nan).dropna().empty
-                                                                  )
-                                ], axis=1)
-          self._close_cached_copies()
-          final_df.columns.names = ('symbols','columns')
-          final_df = final_df.set_index(final_df.index.tz_localize(settings.TIMEZONE))
-          result = pd.concat([result,final_df], axis=1)
-          symbols = [s for s in symbols if s not in result.columns.get_level_values('symbols')]
+          final_df = self._query_assets_daily_price_DF(symbols, vendor)
+          vendor_dfs.append(final_df)
+          found = set(final_df.columns.get_level_values('symbols'))
+          symbols = [s for s in symbols if s not in found]
           if len(symbols) == 0:
             break 
+        result = pd.concat(vendor_dfs, axis=1)
+        result.columns.names = ('symbols','columns')
         
         if len(symbols) > 0:
           if settings.PRINT_EVENTS:
@@ -719,6 +782,32 @@ class DailyPriceMySQL(SQLTable):
       )
       return None if len(dat) == 0 else dat[0][0]
 
+    def _query_max_price_dates_by_vendor_id(self, vendor_id:int)->pd.Series:
+      '''
+          Latest complete bar date (naive pd.Timestamp) of every symbol_id of the
+          vendor, in one GROUP BY query.
+      '''
+      dat = self.executeSQL(
+        '''
+        SELECT symbol_id, max(price_date)
+        FROM %s
+        WHERE
+          data_vendor_id = %s AND
+          close IS NOT NULL AND
+          open IS NOT NULL
+        GROUP BY symbol_id
+        ''' %(
+              self._name,
+              int(vendor_id),
+            )
+      )
+      return pd.Series(
+                  pd.to_datetime([d[1] for d in dat]),
+                  index = pd.Index([int(d[0]) for d in dat], name = 'symbol_id'),
+                  dtype = 'datetime64[ns]',
+                  name = 'last_price_date',
+      )
+
     @functools.lru_cache(maxsize = 1024 * 1024)
     def _query_available_symbols_in_database_by_vendor(self, vendor:str):
       assert vendor in self.vendors.List
@@ -752,107 +841,98 @@ class DailyPriceMySQL(SQLTable):
         except:
           raise
 
-    def _close_cached_copies(self):
-      for source in self._cached_copies:
-        source._conn.close()
-      self._cached_copies = []
- 
-    def _query_asset_symbol_daily_price_DF(self,
-                                      asset:str,
-                                      vendor:str,
+    def _query_assets_daily_price_DF(self,
+                                     symbols:List[str],
+                                     vendor:str,
     )->pd.DataFrame:
-      df_cols = [
-        "open", "high", "low",
-                "close","volume"
-                          ]
-      select_str = "dp.price_date, " + str(
-                                    [
-                                      ".".join(["dp",p]) for p in df_cols
-                                    ]
-                                          )[1:-1].replace("'","") 
-      
-      cond_str = "vendor.name = '%s' AND sym.symbol = '%s'" %(vendor, asset)
-      sql = (
-            '''
-            SELECT %s
-            FROM %s as sym
-            INNER JOIN %s AS dp
-            INNER JOIN %s AS vendor
-            ON
-                dp.symbol_id = sym.id AND
-                dp.data_vendor_id = vendor.id
-            WHERE
-                %s
-            ORDER BY
-                dp.price_date ASC
-            '''%(
-                select_str,
-                self.symbols._name,
-                self._name,
-                self.vendors._name,
-                cond_str
-                )
-              )
-      dat = np.array(self.executeSQL(sql))
-
-      cols = [
-              np.array([asset for _ in df_cols]),
-              np.array(df_cols)
-             ]
-
-      if len(dat) == 0:
-        return pd.DataFrame(columns = cols)
-      else:
-        df = pd.DataFrame(
-                      data = dat[:,1:],
-                      index = pd.DatetimeIndex(dat[:,0]),
-                      columns = cols
-                        )
-        for c in df.columns:
-          df[c] = pd.to_numeric(df[c])
-        return df
+      '''
+          Daily prices of all symbols from one vendor, pivoted ONCE into the
+          (symbols, columns) MultiIndex frame. Symbols without a single complete
+          bar are left out, as are dates on which none of the kept symbols has
+          a row.
+      '''
+      codes, dates, values = self._query_assets_daily_price_arrays(symbols, vendor)
+      columns = pd.MultiIndex.from_product([[], self.price_columns], names = ('symbols','columns'))
+      if len(codes) == 0:
+        return pd.DataFrame(columns = columns, index = pd.DatetimeIndex([], tz = settings.TIMEZONE))
+
+      unique_dates, date_rows = np.unique(dates, return_inverse = True)
+      block = np.full((len(unique_dates), len(symbols), len(self.price_columns)), np.nan)
+      block[date_rows, codes] = values
+      has_row = np.zeros((len(unique_dates), len(symbols)), dtype = bool)
+      has_row[date_rows, codes] = True
+
+      kept = (~np.isnan(block).any(axis = 2)).any(axis = 0)
+      rows = has_row[:, kept].any(axis = 1)
+      kept_symbols = [s for s,k in zip(symbols, kept) if k]
+      index = pd.DatetimeIndex(unique_dates[rows].astype('datetime64[ns]')).tz_localize(settings.TIMEZONE)
+      index.name = 'datetime'
+      return pd.DataFrame(
+                    block[rows][:, kept].reshape(int(rows.sum()), len(kept_symbols) * len(self.price_columns)),
+                    index = index,
+                    columns = pd.MultiIndex.from_product(
+                                        [kept_symbols, self.price_columns], names = ('symbols','columns')
+                                ),
+      )
 
-    def _price_dfs_to_bid_ask_dfs(self, 
-                                  price_df:pd.DataFrame
+    def _query_assets_daily_price_arrays(self,
+                                         symbols:List[str],
+                                         vendor:str,
     ):
-        def _symbol_price_to_bid_ask(bar_df, symbol):
-          cols = [
-                np.array([symbol, symbol]),
-                np.array(['bid', 'ask'])
-                ]
-          if bar_df.dropna().empty:
-            return pd.DataFrame(columns = cols)
-          bar_df = bar_df.sort_index()
-          oc_df = bar_df.loc[:, ['open', 'close']]
-          oc_df['pre_market'] = oc_df['close'].shift(1)
-          oc_df['post_market'] = oc_df['close']
-          oc_df = oc_df.dropna()
-          # Convert bars into separate rows for open/close prices
-          # appropriately timestamped
-          seq_oc_df = oc_df.T.unstack(level=0).reset_index()
-          seq_oc_df.columns = ['datetime', 'market', 'price']
-
-          seq_oc_df.loc[seq_oc_df['market'] == 'open', 'datetime'] += pd.Timedelta(hours=9, minutes=30)
-          seq_oc_df.loc[seq_oc_df['market'] == 'close', 'datetime'] += pd.Timedelta(hours=16, minutes=00)
-          seq_oc_df.loc[seq_oc_df['market'] == 'pre_market', 'datetime'] += pd.Timedelta(hours=0, minutes=00)
-          seq_oc_df.loc[seq_oc_df['market'] == 'post_market', 'datetime'] += pd.Timedelta(hours=23, minutes=59)
-
-          # TODO: Unable to distinguish between Bid/Ask, implement later
-          dp_df = seq_oc_df[['datetime', 'price']]
-          dp_df['bid'] = dp_df['price']
-          dp_df['ask'] = dp_df['price']
-          dp_df = dp_df.loc[:, ['datetime', 'bid', 'ask']].fillna(method='ffill').set_index('datetime').sort_index()
-          dp_df.columns = cols
-          return dp_df 
-        
-        bid_ask_df = pd.concat(
-                      [
-                        _symbol_price_to_bid_ask(price_df[symbol], symbol) 
-                          for symbol in price_df.columns.get_level_values('symbols').unique()
-                      ], axis = 1
+      '''
+          Streams the rows of all symbols (bulk_query_chunk_size per IN (...)
+          query) through a server-side cursor into arrays preallocated from a
+          COUNT(*) of each chunk, all on one pooled connection:
+              codes  : int64 position of the row's symbol in symbols
+              dates  : datetime64[D] price_date
+              values : float64 (rows, price_columns)
+      '''
+      symbol_code = {s:i for i,s in enumerate(symbols)}
+      select_str = "sym.symbol, dp.price_date, " + ", ".join(["dp.%s" %p for p in self.price_columns])
+      chunks = []
+      with self.connection() as conn:
+        for i in range(0, len(symbols), self.bulk_query_chunk_size):
+          chunk = symbols[i:i+self.bulk_query_chunk_size]
+          from_where_str = (
+                '''
+                FROM %s AS sym
+                INNER JOIN %s AS dp
+                INNER JOIN %s AS vendor
+                ON
+                    dp.symbol_id = sym.id AND
+                    dp.data_vendor_id = vendor.id
+                WHERE
+                    vendor.name = '%s' AND
+                    sym.symbol IN (%s)
+                '''%(
+                    self.symbols._name,
+                    self._name,
+                    self.vendors._name,
+                    vendor,
+                    ", ".join(["'%s'" %s for s in chunk]),
                     )
-        bid_ask_df.columns.names = ('symbols', 'columns') 
+                  )
+          n_rows = int(self.executeSQL("SELECT COUNT(*) %s" %from_where_str, conn = conn)[0][0])
+          if n_rows == 0:
+            continue
+          codes = np.empty(n_rows, dtype = np.int64)
+          dates = np.empty(n_rows, dtype = 'datetime64[D]')
+          values = np.empty((n_rows, len(self.price_columns)), dtype = np.float64)
+          filled = 0
+          for rows in self._execute_streaming(conn, "SELECT %s %s" %(select_str, from_where_str)):
+            end = min(filled + len(rows), n_rows) #---| rows inserted since the COUNT(*) are dropped
+            rows = rows[:end - filled]
+            codes[filled:end] = [symbol_code[r[0]] for r in rows]
+            dates[filled:end] = [r[1] for r in rows]
+            values[filled:end] = [r[2:] for r in rows] #---| Decimal -> float, NULL -> NaN
+            filled = end
+          chunks.append((codes[:filled], dates[:filled], values[:filled]))
+
+      if len(chunks) == 0:
+        return (
+              np.empty(0, dtype = np.int64),
+              np.empty(0, dtype = 'datetime64[D]'),
+              np.empty((0, len(self.price_columns)), dtype = np.float64),
+        )
+      return tuple(np.concatenate(arrays) for arrays in zip(*chunks))
 
-        return bid_ask_df
-
-    
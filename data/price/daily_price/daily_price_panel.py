@@ -0,0 +1,263 @@
+from qfengine.data.price.price_source import PriceDataSource
+from qfengine.asset import assetClasses
+from qfengine import settings
+from typing import List
+
+import pandas as pd
+import numpy as np
+import json
+import os
+
+
+class DailyPricePanel(PriceDataSource):
+    '''
+        Dense, read-only daily OHLCV panel backed by a memory-mapped .npy file.
+
+        Layout on disk (panel_dir):
+            values.npy  -> float64 array shaped (fields, dates, symbols)
+            dates.npy   -> int64 wall-clock (TIMEZONE) midnight of every row, ns
+            meta.json   -> {'symbols': [...], 'fields': [...]}
+
+        The panel is written ONCE (create_panel / from_price_source) and then
+        attached with np.load(mmap_mode='r'). Every attachment - copies handed
+        out by create_price_source_copy(), BacktestDataHandler.copy() of each
+        grid session, or instances unpickled in other processes - maps the same
+        file, so the operating system page cache holds a single physical copy of
+        the prices no matter how many sessions read from it.
+    '''
+
+    fields = ['open', 'high', 'low', 'close', 'volume']
+
+    def __init__(self,
+                 panel_dir:str,
+                 asset_type:assetClasses = None,
+    ):
+        self.panel_dir = panel_dir
+        self.asset_type = asset_type
+        self._attach()
+
+    def _attach(self):
+        with open(os.path.join(self.panel_dir, 'meta.json'), 'r') as f:
+            meta = json.load(f)
+        self.symbols_list = list(meta['symbols'])
+        self.fields = list(meta['fields'])
+        self._symbol_loc = {s:i for i,s in enumerate(self.symbols_list)}
+        self._field_loc = {c:i for i,c in enumerate(self.fields)}
+        self._values = np.load(os.path.join(self.panel_dir, 'values.npy'), mmap_mode = 'r')
+        self._dates = np.load(os.path.join(self.panel_dir, 'dates.npy'))
+        self._date_index = pd.DatetimeIndex(self._dates).tz_localize(settings.TIMEZONE)
+        self._date_index.name = 'datetime'
+        self._date_ranges_df = None
+
+    #---| Pickling re-attaches to the same file instead of shipping the array
+    def __getstate__(self):
+        return {'panel_dir': self.panel_dir, 'asset_type': self.asset_type}
+
+    def __setstate__(self, state):
+        self.panel_dir = state['panel_dir']
+        self.asset_type = state['asset_type']
+        self._attach()
+
+    def create_price_source_copy(self):
+        copy = DailyPricePanel.__new__(DailyPricePanel)
+        copy.__dict__.update(self.__dict__) #---| zero-copy: shares the same memory map
+        return copy
+
+
+    #!---| Panel Writing
+    @classmethod
+    def create_panel(cls,
+                     price_df:pd.DataFrame,
+                     panel_dir:str,
+                     asset_type:assetClasses = None,
+    ):
+        '''
+            Writes price_df - MultiIndex columns ('symbols','columns') as returned by
+            PriceDataSource.get_assets_historical_price_dfs() - as a dense panel and
+            returns a DailyPricePanel attached to it.
+        '''
+        if not os.path.exists(panel_dir):
+            os.makedirs(panel_dir)
+        symbols = list(price_df.columns.get_level_values('symbols').unique())
+        fields = [c for c in cls.fields if c in price_df.columns.get_level_values('columns')]
+        price_df = price_df.sort_index()
+        dates = pd.DatetimeIndex(price_df.index)
+        if dates.tz is not None:
+            dates = dates.tz_convert(settings.TIMEZONE).tz_localize(None)
+
+        values = np.lib.format.open_memmap(
+                            os.path.join(panel_dir, 'values.npy'),
+                            mode = 'w+',
+                            dtype = np.float64,
+                            shape = (len(fields), len(dates), len(symbols)),
+        )
+        for f,field in enumerate(fields):
+            values[f] = price_df.xs(
+                                field, level = 'columns', axis = 1
+                        ).reindex(columns = symbols).apply(pd.to_numeric).values
+        values.flush()
+        del values
+
+        np.save(os.path.join(panel_dir, 'dates.npy'), dates.values.astype('datetime64[ns]').view(np.int64))
+        with open(os.path.join(panel_dir, 'meta.json'), 'w') as f:
+            json.dump({'symbols': symbols, 'fields': fields}, f)
+        if settings.PRINT_EVENTS:
+            print("Price Panel: written %s dates x %s symbols x %s fields to %s" %(
+                                        len(dates), len(symbols), len(fields), panel_dir
+                                    ))
+        return cls(panel_dir, asset_type = asset_type)
+
+    @classmethod
+    def from_price_source(cls,
+                          price_source:PriceDataSource,
+                          panel_dir:str,
+                          symbols:List[str] = None,
+                          start_dt = None,
+                          end_dt = None,
+    ):
+        symbols = symbols or price_source.assetsList()
+        return cls.create_panel(
+                    price_source.get_assets_historical_price_dfs(
+                                                *symbols,
+                                                start_dt = start_dt,
+                                                end_dt = end_dt,
+                    ),
+                    panel_dir,
+                    asset_type = getattr(price_source, 'asset_type', None),
+        )
+
+
+    #!--| MAIN FUNCS (ABSTRACT)
+    def assetsDF(self,**kwargs):
+        return pd.DataFrame(
+          {
+            'symbol':pd.Series(data=self.symbols_list)
+          }
+                  ).set_index('symbol')
+
+    def assetsList(self,**kwargs):
+        return self.symbols_list.copy()
+
+    @property
+    def sectorsList(self):
+        return []
+
+    def get_assets_bid_ask_dfs(self,
+                               asset:str,
+                               *assets:str,
+                                  start_dt=None,
+                                  end_dt=None,
+                                  **kwargs
+    )->pd.DataFrame:
+        return self._price_dfs_to_bid_ask_dfs(
+                      self.get_assets_historical_price_dfs(asset,
+                                                            *assets,
+                                                            start_dt = start_dt,
+                                                            end_dt = end_dt
+                                                        )
+        )
+
+    def get_assets_historical_price_dfs(self,
+                                        asset:str,
+                                        *assets:str,
+                                            price:str = None,
+                                            start_dt = None,
+                                            end_dt = None,
+                                              adjusted = None,
+                                              **kwargs
+    )->pd.DataFrame:
+        if price:
+            assert price in self.fields
+        symbols = [asset] + [s for s in assets]
+        missing_symbols = [s for s in symbols if s not in self._symbol_loc]
+        if len(missing_symbols) > 0:
+            if settings.PRINT_EVENTS:
+                print("Warning: Queried Daily Prices Panel is missing %s symbols:" %len(missing_symbols))
+                print(missing_symbols)
+            symbols = [s for s in symbols if s in self._symbol_loc]
+
+        d0, d1 = self._date_slice(start_dt, end_dt)
+        cols = [self._symbol_loc[s] for s in symbols]
+        if cols == list(range(len(self.symbols_list))):
+            cols = slice(None) #---| whole universe: basic slicing keeps it a view
+
+        block = self._values[:, d0:d1][:, :, cols]
+        has_bar = ~np.isnan(block).all(axis = (0, 2))
+        index = self._date_index[d0:d1][has_bar]
+
+        if price:
+            return pd.DataFrame(
+                        block[self._field_loc[price]][has_bar],
+                        index = index,
+                        columns = pd.Index(symbols),
+            )
+        #---| (fields, dates, symbols) -> (dates, symbols * fields)
+        data = block[:, has_bar].transpose(1, 2, 0).reshape(int(has_bar.sum()), len(symbols) * len(self.fields))
+        return pd.DataFrame(
+                    data,
+                    index = index,
+                    columns = pd.MultiIndex.from_product(
+                                        [symbols, self.fields], names = ('symbols','columns')
+                                ),
+        )
+
+
+    #----| Price Date Ranges
+    def get_assets_minimum_start_dt(self,
+                                        asset:str,
+                                        *assets:str,
+    )->pd.Timestamp:
+        return max(self.get_assets_price_date_ranges_df(asset, *assets).start_dt)
+
+    def get_assets_maximum_end_dt(self,
+                                      asset:str,
+                                      *assets:str,
+    )->pd.Timestamp:
+        return min(self.get_assets_price_date_ranges_df(asset, *assets).end_dt)
+
+    def get_assets_price_date_ranges_df(self,
+                                        asset:str,
+                                        *assets:str,
+    )->pd.DataFrame:
+        if self._date_ranges_df is None:
+            self._date_ranges_df = self._compute_date_ranges_df()
+        symbols = [asset] + [s for s in assets]
+        return self._date_ranges_df.loc[[s for s in symbols if s in self._date_ranges_df.index]]
+
+
+    #!----| BACKEND FUNCTIONS
+    def _compute_date_ranges_df(self):
+        valid = (
+                ~np.isnan(self._values[self._field_loc['open']]) &
+                ~np.isnan(self._values[self._field_loc['close']])
+        )
+        has_any = valid.any(axis = 0)
+        first = valid.argmax(axis = 0)
+        last = len(self._dates) - 1 - valid[::-1].argmax(axis = 0)
+        return pd.DataFrame(
+                    {
+                        'symbol': np.array(self.symbols_list)[has_any],
+                        'start_dt': self._date_index[first[has_any]],
+                        'end_dt': self._date_index[last[has_any]],
+                    }
+                ).set_index('symbol')
+
+    def _date_slice(self, start_dt, end_dt):
+        d0, d1 = 0, len(self._dates)
+        if start_dt is not None:
+            d0 = int(np.searchsorted(self._dates, self._naive_dt_value(start_dt), side = 'left'))
+        if end_dt is not None:
+            d1 = int(np.searchsorted(self._dates, self._naive_dt_value(end_dt), side = 'right'))
+        return d0, max(d0, d1)
+
+    def _naive_dt_value(self, dt):
+        return self._format_dt(dt).tz_localize(None).value
+
+    def _format_dt(self, dt):
+        try:
+            return pd.Timestamp(dt).tz_convert(settings.TIMEZONE)
+        except TypeError:
+            try:
+                return pd.Timestamp(dt).tz_localize(settings.TIMEZONE)
+            except:
+                raise
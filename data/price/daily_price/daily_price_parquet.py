@@ -0,0 +1,311 @@
+from qfengine.data.price.price_source import ParquetPriceDataSource, PriceDataSource
+from qfengine.asset import assetClasses
+from qfengine import settings
+from typing import List
+
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+import pandas as pd
+import numpy as np
+import os
+import functools
+
+
+class DailyPriceParquet(ParquetPriceDataSource):
+    '''
+        Daily OHLCV prices for a whole universe, stored as ONE Hive-partitioned
+        Parquet dataset (parquet_dir/symbol=XXX/part-0.parquet).
+
+        Queries are pushed down to the Arrow scanner so that only the requested
+        symbol partitions (partition pruning), only the requested columns
+        (column pruning) and only the row groups overlapping the requested dates
+        (row-group statistics pruning) are ever read from disk. No text parsing
+        takes place, which is what dominates DailyPriceCSV/DailyPriceMySQL loading.
+
+        Store can be (re)built from any other PriceDataSource through
+        import_from_price_source(), e.g. a DailyPriceCSV or DailyPriceMySQL.
+    '''
+
+    price_columns = ['open', 'high', 'low', 'close', 'volume']
+    date_column = 'price_date'
+    row_group_size = 252  #---| ~1 trading year per row group, for date pruning
+
+    def __init__(
+                 self,
+                 asset_type:assetClasses,
+                 parquet_dir:str = None,
+                 symbols_list:List[str] = None,
+                    create_if_missing:bool = False,
+    ):
+        parquet_dir = parquet_dir or settings.PARQUET_DIRECTORIES['PRICE']['DAILY']
+        super().__init__(parquet_dir, symbols_list, must_exist = (not create_if_missing))
+        self.asset_type = asset_type
+        self._dataset = None
+
+    def create_price_source_copy(self):
+        copy = DailyPriceParquet(
+                        asset_type = self.asset_type,
+                        parquet_dir = self.parquet_dir,
+                        create_if_missing = True,
+        )
+        copy.symbols_list = self.symbols_list #---| skip symbols vetting, same as CSV
+        copy._dataset = self._dataset #---| Arrow datasets are immutable, safe to share
+        return copy
+
+   #!--| MAIN FUNCS (ABSTRACT)
+    def assetsDF(self,**kwargs):
+        return pd.DataFrame(
+          {
+            'symbol':pd.Series(data=self.symbols_list)
+          }
+                  ).set_index('symbol')
+
+    def assetsList(self,**kwargs):
+        return self.symbols_list.copy()
+
+    @property
+    def sectorsList(self):
+      return []
+
+
+    def get_assets_bid_ask_dfs(self,
+                               asset:str,
+                               *assets:str,
+                                  start_dt=None,
+                                  end_dt=None,
+                                  **kwargs
+    )->pd.DataFrame:
+      return self._price_dfs_to_bid_ask_dfs(
+                      self.get_assets_historical_price_dfs(asset,
+                                                            *assets,
+                                                            start_dt = start_dt,
+                                                            end_dt = end_dt
+                                                        )
+      )
+
+    def get_assets_historical_price_dfs(self,
+                                        asset:str,
+                                        *assets:str,
+                                            price:str = None,
+                                            start_dt = None,
+                                            end_dt = None,
+                                              adjusted = None,
+                                              **kwargs
+    )->pd.DataFrame:
+        if price:
+            assert price in self.price_columns
+        symbols = [asset] + [s for s in assets]
+        result = self._assets_daily_price_DF(
+                                *symbols,
+                                start_dt = self._naive_date_bound(start_dt),
+                                end_dt = self._naive_date_bound(end_dt),
+                                price = price,
+        )
+        if price:
+          result = result.copy()
+          result.columns = result.columns.get_level_values('symbols')
+        return result
+
+
+
+    #----| Price Date Ranges
+    def get_assets_minimum_start_dt(self,
+                                        asset:str,
+                                        *assets:str,
+    )->pd.Timestamp:
+        return self._format_dt(max(
+          self.get_assets_price_date_ranges_df(
+                            asset, *assets
+                                            ).start_dt.values
+                 ))
+
+    def get_assets_maximum_end_dt(self,
+                                      asset:str,
+                                      *assets:str,
+    )->pd.Timestamp:
+        return self._format_dt(min(
+          self.get_assets_price_date_ranges_df(
+                            asset, *assets
+                                            ).end_dt.values
+                 ))
+
+    @functools.lru_cache(maxsize = 1024 * 1024)
+    def get_assets_price_date_ranges_df(self,
+                                        asset:str,
+                                        *assets:str,
+    )->pd.DataFrame:
+        symbols = [asset] + [s for s in assets]
+        if self.symbols_list:
+          assert set(symbols).issubset(self.symbols_list)
+        #--| only the date column (+ partition key) is read, and only for non-empty bars
+        table = self.dataset.to_table(
+                        columns = ['symbol', self.date_column],
+                        filter = (
+                            ds.field('symbol').isin(symbols) &
+                            ds.field('open').is_valid() &
+                            ds.field('close').is_valid()
+                        ),
+        )
+        ranges = table.group_by('symbol').aggregate([
+                                    (self.date_column, 'min'),
+                                    (self.date_column, 'max'),
+                  ]).to_pandas()
+        final_df = pd.DataFrame(
+                      {
+                        'symbol': ranges['symbol'].astype(str).values,
+                        'start_dt': [self._format_dt(d) for d in ranges['%s_min' %self.date_column]],
+                        'end_dt': [self._format_dt(d) for d in ranges['%s_max' %self.date_column]],
+                      }
+                    ).set_index('symbol').dropna()
+        return final_df.loc[[s for s in symbols if s in final_df.index]]
+    #---------------------------|
+
+
+    #----| Store Writing
+    def write_assets_daily_price_DF(self,
+                                    price_df:pd.DataFrame,
+    ):
+        '''
+            Writes (overwrites) the partition of every symbol in price_df, a
+            DataFrame with MultiIndex columns ('symbols','columns') as returned by
+            any PriceDataSource.get_assets_historical_price_dfs().
+        '''
+        written = []
+        for symbol in price_df.columns.get_level_values('symbols').unique():
+          bar_df = price_df[symbol].dropna(how = 'all').sort_index()
+          if bar_df.empty:
+            continue
+          dates = pd.DatetimeIndex(bar_df.index)
+          if dates.tz is not None:
+            dates = dates.tz_convert(settings.TIMEZONE).tz_localize(None)
+          table = pa.table(
+                    dict(
+                      [(self.date_column, pa.array(dates.values, type = pa.timestamp('ns')))] +
+                      [
+                        (c, pa.array(
+                                pd.to_numeric(bar_df[c]).values.astype(np.float64) if c in bar_df.columns
+                                else np.full(len(bar_df), np.nan),
+                                type = pa.float64()
+                              )) for c in self.price_columns
+                      ]
+                    )
+          )
+          partition_dir = self._partition_dir_from_value(symbol)
+          if not os.path.exists(partition_dir):
+            os.makedirs(partition_dir)
+          pq.write_table(
+                    table,
+                    os.path.join(partition_dir, 'part-0.parquet'),
+                    row_group_size = self.row_group_size,
+          )
+          written.append(symbol)
+        self._reset_cached_dataset()
+        self.symbols_list = sorted(set(self.symbols_list).union(written))
+        return written
+
+    def import_from_price_source(self,
+                                 price_source:PriceDataSource,
+                                 symbols:List[str] = None,
+                                 batch_size:int = 100,
+    ):
+        '''
+            (Re)builds the store from another PriceDataSource, batch_size symbols
+            at a time so that memory stays bounded on large universes.
+        '''
+        symbols = symbols or price_source.assetsList()
+        written = []
+        for i in range(0, len(symbols), batch_size):
+          batch = symbols[i:i+batch_size]
+          price_df = price_source.get_assets_historical_price_dfs(*batch)
+          written += self.write_assets_daily_price_DF(price_df)
+          if settings.PRINT_EVENTS:
+            print("Parquet Store: written %s/%s symbols to %s" %(
+                                        min(i+batch_size, len(symbols)), len(symbols), self.parquet_dir
+                                    ))
+        return written
+    #---------------------------|
+
+
+   #!---------------------------------|
+
+
+
+   #!----| BACKEND FUNCTIONS
+    @property
+    def dataset(self):
+        if self._dataset is None:
+          self._dataset = ds.dataset(
+                            self.parquet_dir,
+                            format = 'parquet',
+                            partitioning = ds.partitioning(
+                                                pa.schema([('symbol', pa.string())]),
+                                                flavor = 'hive'
+                                            ),
+          )
+        return self._dataset
+
+    def _reset_cached_dataset(self):
+        self._dataset = None
+        self._assets_daily_price_DF.cache_clear()
+        self.get_assets_price_date_ranges_df.cache_clear()
+
+    @functools.lru_cache(maxsize = 1024 * 1024)
+    def _assets_daily_price_DF(self,
+                                asset:str,
+                                *assets:str,
+                                start_dt:pd.Timestamp = None,
+                                end_dt:pd.Timestamp = None,
+                                price:str = None,
+    ):
+        symbols = [asset] + [s for s in assets]
+        if self.symbols_list:
+          assert set(symbols).issubset(self.symbols_list)
+        columns = [price] if price else self.price_columns
+
+        #--| predicate pushdown: partitions by symbol, row groups by price_date
+        row_filter = ds.field('symbol').isin(symbols)
+        if start_dt is not None:
+          row_filter = row_filter & (ds.field(self.date_column) >= pa.scalar(start_dt, type = pa.timestamp('ns')))
+        if end_dt is not None:
+          row_filter = row_filter & (ds.field(self.date_column) <= pa.scalar(end_dt, type = pa.timestamp('ns')))
+        long_df = self.dataset.to_table(
+                                columns = ['symbol', self.date_column] + columns,
+                                filter = row_filter,
+                  ).to_pandas()
+        long_df['symbol'] = long_df['symbol'].astype(str)
+
+        available = [s for s in symbols if s in set(long_df['symbol'].unique())]
+        final_df = long_df.pivot(index = self.date_column, columns = 'symbol', values = columns)
+        final_df.columns.names = ('columns','symbols')
+        final_df = final_df.swaplevel(axis = 1).reindex(
+                          columns = pd.MultiIndex.from_product(
+                                            [available, columns], names = ('symbols','columns')
+                                        )
+                    )
+        final_df = final_df.loc[:, [s for s in available if not final_df[s].dropna().empty]]
+        final_df.index = pd.DatetimeIndex(final_df.index).tz_localize(settings.TIMEZONE)
+        final_df.index.name = 'datetime'
+        final_df = final_df.sort_index()
+
+        missing_symbols = [s for s in symbols if s not in final_df.columns.get_level_values('symbols')]
+        if len(missing_symbols) > 0:
+          if settings.PRINT_EVENTS:
+            print("Warning: Queried Daily Prices DataFrame is missing %s symbols:" %len(missing_symbols))
+            print(missing_symbols)
+        return final_df
+
+    def _naive_date_bound(self, dt):
+        #--| stored price_date is wall-clock (TIMEZONE) midnight, tz-naive
+        if dt is None:
+          return None
+        return self._format_dt(dt).tz_localize(None)
+
+    def _format_dt(self, dt):
+      try:
+        return pd.Timestamp(dt).tz_convert(settings.TIMEZONE)
+      except TypeError:
+        try:
+          return pd.Timestamp(dt).tz_localize(settings.TIMEZONE)
+        except:
+          raise
@@ -0,0 +1,284 @@
+from qfengine.data.price.price_source import PriceDataSource
+from qfengine.data.price.bid_ask_index import BidAskLookupIndex
+from qfengine.asset import assetClasses
+from qfengine import settings
+from typing import List
+
+import pandas as pd
+import numpy as np
+import json
+import os
+
+
+class IntradayBarPanel(PriceDataSource):
+    '''
+        Read-only intraday (e.g. minute) bar store backed by memory-mapped .npy files.
+
+        Layout on disk (panel_dir):
+            ts.npy      -> int64 ns (UTC) bar CLOSE times, one contiguous
+                           time-sorted segment per symbol
+            values.npy  -> float32 array shaped (fields, bars), aligned with ts
+            meta.json   -> {'symbols': [...], 'fields': [...],
+                            'starts': [...], 'bar_length': '1min'}
+        starts holds the segment bounds (len(symbols) + 1), so a symbol's bars
+        are ts[starts[i]:starts[i+1]] and nothing is stored for missing bars.
+
+        Quotes are the bars' bid/ask columns when the vendor provides them,
+        and the bar close otherwise. They are stamped at the bar close, so the
+        latest quote at dt never comes from a bar that has not finished yet.
+        get_assets_bid_ask_index() hands BacktestPriceHandler a compiled
+        BidAskLookupIndex straight from the arrays, without building frames.
+    '''
+
+    fields = ['open', 'high', 'low', 'close', 'volume', 'bid', 'ask']
+
+    def __init__(self,
+                 panel_dir:str,
+                 asset_type:assetClasses = None,
+    ):
+        self.panel_dir = panel_dir
+        self.asset_type = asset_type
+        self._attach()
+
+    def _attach(self):
+        with open(os.path.join(self.panel_dir, 'meta.json'), 'r') as f:
+            meta = json.load(f)
+        self.symbols_list = list(meta['symbols'])
+        self.fields = list(meta['fields'])
+        self.bar_length = pd.Timedelta(meta['bar_length'])
+        self._starts = np.array(meta['starts'], dtype = np.int64)
+        self._symbol_loc = {s:i for i,s in enumerate(self.symbols_list)}
+        self._field_loc = {c:i for i,c in enumerate(self.fields)}
+        self._ts = np.load(os.path.join(self.panel_dir, 'ts.npy'), mmap_mode = 'r')
+        self._values = np.load(os.path.join(self.panel_dir, 'values.npy'), mmap_mode = 'r')
+
+    #---| Pickling re-attaches to the same files instead of shipping the arrays
+    def __getstate__(self):
+        return {'panel_dir': self.panel_dir, 'asset_type': self.asset_type}
+
+    def __setstate__(self, state):
+        self.panel_dir = state['panel_dir']
+        self.asset_type = state['asset_type']
+        self._attach()
+
+    def create_price_source_copy(self):
+        copy = IntradayBarPanel.__new__(IntradayBarPanel)
+        copy.__dict__.update(self.__dict__) #---| zero-copy: shares the same memory maps
+        return copy
+
+
+    #!---| Panel Writing
+    @classmethod
+    def create_panel(cls,
+                     bars_df:pd.DataFrame,
+                     panel_dir:str,
+                     bar_length:str = '1min',
+                     label:str = 'left',
+                     asset_type:assetClasses = None,
+    ):
+        '''
+            Writes bars_df - MultiIndex columns ('symbols','columns') of intraday
+            bars as returned by Alpaca.get_barset(symbols, '1Min') - and returns
+            an IntradayBarPanel attached to it.
+            label is the side of the bar interval the index stamps ('left' for
+            vendors stamping bars at their start, 'right' at their end).
+        '''
+        assert label in ('left', 'right')
+        if not os.path.exists(panel_dir):
+            os.makedirs(panel_dir)
+        bar_length = pd.Timedelta(bar_length)
+        symbols = list(bars_df.columns.get_level_values('symbols').unique())
+        stamps = pd.DatetimeIndex(bars_df.index)
+        if stamps.tz is None:
+            stamps = stamps.tz_localize(settings.TIMEZONE)
+        stamps = stamps.asi8 + (bar_length.value if label == 'left' else 0)
+        order = np.argsort(stamps, kind = 'stable')
+        stamps = stamps[order]
+
+        #---| rows of each symbol that hold a bar
+        rows = {}
+        for symbol in symbols:
+            closes = pd.to_numeric(bars_df[symbol]['close']).values[order]
+            rows[symbol] = np.flatnonzero(~np.isnan(closes))
+        starts = np.concatenate([[0], np.cumsum([len(rows[s]) for s in symbols])]).astype(np.int64)
+
+        ts = np.lib.format.open_memmap(
+                            os.path.join(panel_dir, 'ts.npy'),
+                            mode = 'w+', dtype = np.int64, shape = (int(starts[-1]),),
+        )
+        values = np.lib.format.open_memmap(
+                            os.path.join(panel_dir, 'values.npy'),
+                            mode = 'w+', dtype = np.float32, shape = (len(cls.fields), int(starts[-1])),
+        )
+        for i,symbol in enumerate(symbols):
+            seg = slice(starts[i], starts[i+1])
+            ts[seg] = stamps[rows[symbol]]
+            bars = bars_df[symbol]
+            for f,field in enumerate(cls.fields):
+                if field not in bars.columns and field in ('bid', 'ask'):
+                    field = 'close' #---| bar data only: bid == ask == close
+                if field not in bars.columns:
+                    values[f, seg] = np.nan
+                    continue
+                values[f, seg] = pd.to_numeric(bars[field]).values[order][rows[symbol]]
+        ts.flush()
+        values.flush()
+        del ts, values
+
+        with open(os.path.join(panel_dir, 'meta.json'), 'w') as f:
+            json.dump({
+                        'symbols': symbols,
+                        'fields': cls.fields,
+                        'starts': starts.tolist(),
+                        'bar_length': str(bar_length),
+                    }, f)
+        if settings.PRINT_EVENTS:
+            print("Intraday Bar Panel: written %s bars of %s symbols to %s" %(
+                                        int(starts[-1]), len(symbols), panel_dir
+                                    ))
+        return cls(panel_dir, asset_type = asset_type)
+
+
+    #!--| MAIN FUNCS (ABSTRACT)
+    def assetsDF(self,**kwargs):
+        return pd.DataFrame(
+          {
+            'symbol':pd.Series(data=self.symbols_list)
+          }
+                  ).set_index('symbol')
+
+    def assetsList(self,**kwargs):
+        return self.symbols_list.copy()
+
+    @property
+    def sectorsList(self):
+        return []
+
+    def get_assets_bid_ask_index(self,
+                                 asset:str,
+                                 *assets:str,
+                                    start_dt = None,
+                                    end_dt = None,
+    )->BidAskLookupIndex:
+        '''
+            Compiled bid/ask lookup of the given symbols, built from the arrays.
+        '''
+        symbols = self._available_symbols([asset] + [s for s in assets])
+        segments = [self._segment(s, start_dt, end_dt) for s in symbols]
+        if len(symbols) == 0:
+            return BidAskLookupIndex.empty()
+        bid, ask = self._field_loc['bid'], self._field_loc['ask']
+        return BidAskLookupIndex(
+                symbols,
+                np.concatenate([self._ts[seg] for seg in segments]),
+                np.concatenate([self._values[bid, seg] for seg in segments]).astype(np.float64),
+                np.concatenate([self._values[ask, seg] for seg in segments]).astype(np.float64),
+                np.concatenate([[0], np.cumsum([seg.stop - seg.start for seg in segments])]).astype(np.int64),
+        )
+
+    def get_assets_bid_ask_dfs(self,
+                               asset:str,
+                               *assets:str,
+                                  start_dt=None,
+                                  end_dt=None,
+                                  **kwargs
+    )->pd.DataFrame:
+        index = self.get_assets_bid_ask_index(asset, *assets, start_dt = start_dt, end_dt = end_dt)
+        return pd.concat(
+                    [index.to_bid_ask_df(s, tz = settings.TIMEZONE) for s in index.symbols],
+                    axis = 1,
+                    keys = index.symbols,
+                    names = ('symbols', 'columns'),
+        )
+
+    def get_assets_historical_price_dfs(self,
+                                        asset:str,
+                                        *assets:str,
+                                            price:str = None,
+                                            start_dt = None,
+                                            end_dt = None,
+                                              adjusted = None,
+                                              **kwargs
+    )->pd.DataFrame:
+        '''
+            Bars of the given symbols on the union of their bar close times.
+        '''
+        if price:
+            assert price in self.fields
+        symbols = self._available_symbols([asset] + [s for s in assets])
+        fields = [price] if price else self.fields
+        frames = []
+        for s in symbols:
+            seg = self._segment(s, start_dt, end_dt)
+            index = pd.DatetimeIndex(self._ts[seg]).tz_localize('UTC').tz_convert(settings.TIMEZONE)
+            frames.append(pd.DataFrame(
+                        self._values[[self._field_loc[f] for f in fields], seg].T,
+                        index = index,
+                        columns = fields,
+            ))
+        df = pd.concat(frames, axis = 1, keys = symbols, names = ('symbols', 'columns'))
+        df.index.name = 'datetime'
+        if price:
+            return df.xs(price, level = 'columns', axis = 1)
+        return df
+
+
+    #----| Price Date Ranges
+    def get_assets_minimum_start_dt(self,
+                                        asset:str,
+                                        *assets:str,
+    )->pd.Timestamp:
+        return max(self.get_assets_price_date_ranges_df(asset, *assets).start_dt)
+
+    def get_assets_maximum_end_dt(self,
+                                      asset:str,
+                                      *assets:str,
+    )->pd.Timestamp:
+        return min(self.get_assets_price_date_ranges_df(asset, *assets).end_dt)
+
+    def get_assets_price_date_ranges_df(self,
+                                        asset:str,
+                                        *assets:str,
+    )->pd.DataFrame:
+        symbols = [
+            s for s in self._available_symbols([asset] + [s for s in assets])
+            if self._starts[self._symbol_loc[s]+1] > self._starts[self._symbol_loc[s]]
+        ]
+        first = np.array([self._ts[self._starts[self._symbol_loc[s]]] for s in symbols], dtype = np.int64)
+        last = np.array([self._ts[self._starts[self._symbol_loc[s]+1] - 1] for s in symbols], dtype = np.int64)
+        return pd.DataFrame(
+                    {
+                        'symbol': symbols,
+                        'start_dt': pd.DatetimeIndex(first).tz_localize('UTC').tz_convert(settings.TIMEZONE),
+                        'end_dt': pd.DatetimeIndex(last).tz_localize('UTC').tz_convert(settings.TIMEZONE),
+                    }
+                ).set_index('symbol')
+
+
+    #!----| BACKEND FUNCTIONS
+    def _available_symbols(self, symbols:List[str])->List[str]:
+        missing_symbols = [s for s in symbols if s not in self._symbol_loc]
+        if len(missing_symbols) > 0:
+            if settings.PRINT_EVENTS:
+                print("Warning: Queried Intraday Bar Panel is missing %s symbols:" %len(missing_symbols))
+                print(missing_symbols)
+        return [s for s in symbols if s in self._symbol_loc]
+
+    def _segment(self, symbol:str, start_dt = None, end_dt = None)->slice:
+        i = self._symbol_loc[symbol]
+        start, end = int(self._starts[i]), int(self._starts[i+1])
+        ts = self._ts[start:end]
+        if start_dt is not None:
+            start = start + int(np.searchsorted(ts, self._format_dt(start_dt).value, side = 'left'))
+        if end_dt is not None:
+            end = int(self._starts[i]) + int(np.searchsorted(ts, self._format_dt(end_dt).value, side = 'right'))
+        return slice(start, max(start, end))
+
+    def _format_dt(self, dt):
+        try:
+            return pd.Timestamp(dt).tz_convert(settings.TIMEZONE)
+        except TypeError:
+            try:
+                return pd.Timestamp(dt).tz_localize(settings.TIMEZONE)
+            except:
+                raise
@@ -51,6 +51,18 @@ class PriceHandler(DataHandler):
     def get_asset_latest_mid_price(self, dt, asset_symbol)->float:
         raise NotImplementedError("Implement get_asset_latest_mid_price()")
 
+    @abstractmethod
+    def get_assets_latest_bid_ask(self, dt, asset_symbols)->tuple:
+        raise NotImplementedError("Implement get_assets_latest_bid_ask()")
+
+    @abstractmethod
+    def get_assets_latest_mid_prices(self, dt, asset_symbols):
+        raise NotImplementedError("Implement get_assets_latest_mid_prices()")
+
+    @abstractmethod
+    def get_assets_latest_bid_ask_matrix(self, dts, asset_symbols)->tuple:
+        raise NotImplementedError("Implement get_assets_latest_bid_ask_matrix()")
+
 
 
     #!---| Daily Price (OHLCV) Functions |---!#
@@ -1,7 +1,8 @@
 from abc import ABCMeta, abstractmethod
-from qfengine.data.data_source import CSVDataSource, MySQLDataSource
+from qfengine.data.data_source import CSVDataSource, ParquetDataSource, MySQLDataSource
 from qfengine import settings
 from typing import List,Dict
+import numpy as np
 import pandas as pd
 import os
 
@@ -30,6 +31,67 @@ class PriceDataSource(object):
     def create_price_source_copy(self):
         raise NotImplementedError("Should implement create_price_source_copy()")
 
+    #---| Daily bars -> sequence of bid/ask quotes (shared by all daily price sources)
+    bid_ask_offsets = pd.to_timedelta(['0h', '9h30m', '16h', '23h59m']).values.astype(np.int64)
+
+    def _price_dfs_to_bid_ask_dfs(self,
+                                  price_df:pd.DataFrame
+    )->pd.DataFrame:
+        '''
+            Converts daily OHLCV bars of all symbols at once into bid/ask quotes,
+            each bar becoming 4 timestamped rows:
+                pre_market  (00:00) -> previous close of the symbol
+                open        (09:30) -> open
+                close       (16:00) -> close
+                post_market (23:59) -> close
+            The previous close is the symbol's latest close before the bar, so
+            dates on which only other symbols of the batch trade make no gap.
+            Bars missing an open, a close or a previous close are skipped, and
+            symbols without a single complete bar are all-NaN, as before.
+            The (dates, 4, symbols) price block is built with array ops and
+            flattened to the interleaved timeline in one reshape.
+        '''
+        # TODO: Unable to distinguish between Bid/Ask, implement later
+        price_df = price_df.sort_index()
+        symbols = list(price_df.columns.get_level_values('symbols').unique())
+        columns = pd.MultiIndex.from_product([symbols, ['bid', 'ask']], names = ('symbols', 'columns'))
+        if len(symbols) == 0 or len(price_df) == 0:
+            return pd.DataFrame(columns = columns)
+
+        def _field_values(field):
+            return price_df.xs(
+                        field, level = 'columns', axis = 1
+                    ).reindex(columns = symbols).values.astype(np.float64)
+        opens = _field_values('open')
+        closes = _field_values('close')
+        #---| previous close of each symbol's own last bar, not of the batch's last date
+        pre_market = np.empty_like(closes)
+        pre_market[0] = np.nan
+        pre_market[1:] = pd.DataFrame(closes).ffill().values[:-1]
+
+        incomplete_bars = price_df.isna().T.groupby(level = 'symbols', sort = False).any().T
+        has_complete_bar = (~incomplete_bars.reindex(columns = symbols).values).any(axis = 0)
+        valid = ~(np.isnan(opens) | np.isnan(closes) | np.isnan(pre_market)) & has_complete_bar
+
+        prices = np.stack([pre_market, opens, closes, closes], axis = 1) #---| (dates, 4, symbols)
+        prices = np.where(valid[:, None, :], prices, np.nan).reshape(-1, len(symbols))
+        dates = pd.DatetimeIndex(price_df.index)
+        stamps = (dates.asi8[:, None] + self.bid_ask_offsets[None, :]).reshape(-1)
+
+        keep = ~np.isnan(prices).all(axis = 1)
+        stamps, prices = stamps[keep], prices[keep]
+        order = np.argsort(stamps, kind = 'stable')
+        stamps, prices = stamps[order], prices[order]
+
+        index = pd.DatetimeIndex(stamps)
+        index = index.tz_localize('UTC').tz_convert(dates.tz) if dates.tz is not None else index
+        index.name = 'datetime'
+        return pd.DataFrame(
+                    np.repeat(prices, 2, axis = 1), #---| bid == ask for bar data
+                    index = index,
+                    columns = columns,
+        )
+
 
 
 
@@ -59,6 +121,26 @@ class CSVPriceDataSource(CSVDataSource,PriceDataSource):
         assert not symbol.endswith('.csv')
         return symbol +'.csv'  
 
+class ParquetPriceDataSource(ParquetDataSource,PriceDataSource):
+
+    __metaclass__ = ABCMeta
+
+    def __init__(self,
+                 parquet_dir:str,
+                 parquet_symbols:List[str] = None,
+                 must_exist:bool = True,
+    ):
+        super().__init__(parquet_dir, partition_key = 'symbol')
+        available_symbols = self._partition_values_in_dir
+        if parquet_symbols is not None:
+            available_symbols = [s for s in available_symbols if s in parquet_symbols]
+            if len(parquet_symbols) > len(available_symbols) > 0:
+                print("Omitting following symbols that do not exist in parquet_dir:")
+                print([s for s in parquet_symbols if s not in available_symbols])
+        if must_exist:
+            assert len(available_symbols) > 0, "No symbols (assigned or not) is available in parquet_dir: %s" %self.parquet_dir
+        self.symbols_list = available_symbols
+
 class MySQLPriceDataSource(MySQLDataSource, PriceDataSource):
 
     __metaclass__ = ABCMeta
@@ -48,7 +48,8 @@ class Alpaca(object):
             end_ = None
 
         df = self._REST.get_barset(symbols,timeframe,start=start_,end=end_).df
-        df.index = pd.DatetimeIndex(df.index.date)
+        if timeframe == '1D':
+            df.index = pd.DatetimeIndex(df.index.date)
         df.columns.names = ('symbols','columns')
         
         return df
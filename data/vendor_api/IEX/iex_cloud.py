@@ -91,7 +91,7 @@ class IEX(object):
         assert start_ is not None
         range_ = None
         if start_ is not None:
-            for r in ['30d','90d','180d','1y','2y','5y']:
+            for r in ['5d','30d','90d','180d','1y','2y','5y']:
                 if (pd.Timestamp.now() - pd.Timestamp(start_)) < pd.Timedelta(r):
                     range_ = r
                     break
@@ -122,6 +122,10 @@ class IEX(object):
             columns = multi_cols
         )
         final_df.columns.names = ('symbols','columns')
+        #---| range buckets overshoot, only return bars within [start_date, end_date]
+        final_df = final_df[final_df.index >= pd.Timestamp(start_)]
+        if end_ is not None:
+            final_df = final_df[final_df.index <= pd.Timestamp(end_)]
         return final_df
         
 #----------------------------------| static functions (parallelizable)
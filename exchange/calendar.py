@@ -0,0 +1,314 @@
+from abc import ABCMeta, abstractmethod
+import datetime
+import functools
+
+import numpy as np
+import pandas as pd
+from pandas.tseries.offsets import DateOffset
+from pandas.tseries.holiday import (
+    AbstractHolidayCalendar,
+    Holiday,
+    GoodFriday,
+    MO,
+    USLaborDay,
+    USMemorialDay,
+    USPresidentsDay,
+    USThanksgivingDay,
+    nearest_workday,
+    sunday_to_monday,
+)
+from qfengine import settings
+
+
+class TradingCalendar(object):
+    """
+    Interface to the trading sessions of an exchange.
+    Subclasses provide the regular market hours, the holidays and
+    the early closes of the exchange. All sessions between the
+    first and last supported years are precomputed into sorted
+    arrays of session dates, open times and close times (UTC
+    nanoseconds), so every lookup is a binary search.
+    Parameters
+    ----------
+    start_year : `int`, optional
+        The first year of precomputed sessions.
+    end_year : `int`, optional
+        The last year of precomputed sessions.
+    """
+
+    __metaclass__ = ABCMeta
+
+    tz = settings.TIMEZONE
+    open_time = datetime.time(9, 30)
+    close_time = datetime.time(16, 00)
+
+    def __init__(self, start_year=1990, end_year=2040):
+        self.start_year = start_year
+        self.end_year = end_year
+        start = pd.Timestamp(datetime.date(start_year, 1, 1))
+        end = pd.Timestamp(datetime.date(end_year, 12, 31))
+
+        holidays = pd.DatetimeIndex(self.holidays(start, end))
+        weekdays = pd.bdate_range(start, end)
+        self.sessions = weekdays[~weekdays.isin(holidays)]
+
+        early_closes = pd.DatetimeIndex(self.early_closes(start, end))
+        close_times = np.full(len(self.sessions), self._time_offset(self.close_time))
+        close_times[self.sessions.isin(early_closes)] = self._time_offset(self.early_close_time)
+
+        self._session_values = self.sessions.asi8
+        self._opens = self._localize(self._session_values + self._time_offset(self.open_time))
+        self._closes = self._localize(self._session_values + close_times)
+
+    @abstractmethod
+    def holidays(self, start, end):
+        raise NotImplementedError("Should implement holidays()")
+
+    @abstractmethod
+    def early_closes(self, start, end):
+        raise NotImplementedError("Should implement early_closes()")
+
+    @staticmethod
+    def _time_offset(time):
+        return pd.Timedelta(hours=time.hour, minutes=time.minute).value
+
+    def _localize(self, wall_values):
+        return pd.DatetimeIndex(wall_values).tz_localize(self.tz).asi8
+
+    def _date_value(self, dt):
+        """
+        Nanosecond value of the (naive, local) date of dt.
+        """
+        dt = pd.Timestamp(dt)
+        if dt.tz is not None:
+            dt = dt.tz_convert(self.tz).tz_localize(None)
+        return dt.normalize().value
+
+    def _check_in_range(self, value):
+        if not (self._session_values[0] <= value <= self._session_values[-1]):
+            raise ValueError(
+                "Date %s is outside of the sessions precomputed by %s (%s-%s)." % (
+                    pd.Timestamp(value).date(), self.__class__.__name__,
+                    self.start_year, self.end_year
+                )
+            )
+
+    def is_session(self, dt):
+        """
+        Whether the exchange has a trading session on the date of dt.
+        Parameters
+        ----------
+        dt : `pd.Timestamp`
+            The date (or datetime) to check.
+        Returns
+        -------
+        `Boolean`
+            Whether the date is a trading session.
+        """
+        value = self._date_value(dt)
+        self._check_in_range(value)
+        i = np.searchsorted(self._session_values, value)
+        return bool(i < len(self._session_values) and self._session_values[i] == value)
+
+    def is_open_at_datetime(self, dt):
+        """
+        Whether the exchange is open at dt, i.e. dt falls in
+        [open, close) of a trading session.
+        Parameters
+        ----------
+        dt : `pd.Timestamp`
+            The timezone aware timestamp to check.
+        Returns
+        -------
+        `Boolean`
+            Whether the exchange is open at this timestamp.
+        """
+        dt = pd.Timestamp(dt)
+        if dt.tz is None:
+            dt = dt.tz_localize(self.tz)
+        self._check_in_range(self._date_value(dt))
+        i = np.searchsorted(self._opens, dt.value, side='right') - 1
+        return bool(i >= 0 and dt.value < self._closes[i])
+
+    def sessions_in_range(self, start_dt, end_dt):
+        """
+        The trading session dates between two dates (inclusive).
+        Parameters
+        ----------
+        start_dt : `pd.Timestamp`
+            The first date of the range.
+        end_dt : `pd.Timestamp`
+            The last date of the range.
+        Returns
+        -------
+        `pd.DatetimeIndex`
+            The (naive, midnight) session dates.
+        """
+        return self.sessions[self._session_slice(start_dt, end_dt)]
+
+    def session_bounds_in_range(self, start_dt, end_dt):
+        """
+        The open and close times of the trading sessions between
+        two dates (inclusive).
+        Returns
+        -------
+        `tuple(np.ndarray, np.ndarray)`
+            int64 ns (UTC) session open and close times.
+        """
+        sessions = self._session_slice(start_dt, end_dt)
+        return self._opens[sessions], self._closes[sessions]
+
+    def _session_slice(self, start_dt, end_dt):
+        start, end = self._date_value(start_dt), self._date_value(end_dt)
+        self._check_in_range(start)
+        self._check_in_range(end)
+        i = np.searchsorted(self._session_values, start, side='left')
+        j = np.searchsorted(self._session_values, end, side='right')
+        return slice(i, j)
+
+    def next_session(self, dt):
+        """
+        The first trading session date on or after the date of dt.
+        """
+        value = self._date_value(dt)
+        self._check_in_range(value)
+        i = np.searchsorted(self._session_values, value, side='left')
+        return self.sessions[i]
+
+    def next_sessions(self, dts):
+        """
+        The first trading session date on or after the date of
+        each of dts, with one binary search over all of them.
+        Parameters
+        ----------
+        dts : `pd.DatetimeIndex`
+            The dates (or datetimes) to roll forward.
+        Returns
+        -------
+        `pd.DatetimeIndex`
+            The (naive, midnight) session dates, aligned with dts.
+        """
+        dts = pd.DatetimeIndex(dts)
+        if dts.tz is not None:
+            dts = dts.tz_convert(self.tz).tz_localize(None)
+        values = dts.normalize().asi8
+        if len(values) > 0:
+            self._check_in_range(values.min())
+            self._check_in_range(values.max())
+        return self.sessions[np.searchsorted(self._session_values, values, side='left')]
+
+    def session_open(self, dt):
+        """
+        The opening time of the trading session on the date of dt.
+        """
+        return self._session_time(dt, self._opens)
+
+    def session_close(self, dt):
+        """
+        The closing time of the trading session on the date of dt,
+        taking early closes into account.
+        """
+        return self._session_time(dt, self._closes)
+
+    def _session_time(self, dt, times):
+        value = self._date_value(dt)
+        self._check_in_range(value)
+        i = np.searchsorted(self._session_values, value)
+        if i == len(self._session_values) or self._session_values[i] != value:
+            raise ValueError("%s is not a trading session." % pd.Timestamp(value).date())
+        return pd.Timestamp(times[i], tz='UTC').tz_convert(self.tz)
+
+
+class NYSEHolidayCalendar(AbstractHolidayCalendar):
+    """
+    Rule-based full day NYSE holidays.
+    """
+    rules = [
+        Holiday('New Years Day', month=1, day=1, observance=sunday_to_monday),
+        Holiday('Martin Luther King Jr. Day', month=1, day=1, start_date='1998-01-01',
+                offset=DateOffset(weekday=MO(3))),
+        USPresidentsDay,
+        GoodFriday,
+        USMemorialDay,
+        Holiday('Juneteenth', month=6, day=19, start_date='2022-06-19', observance=nearest_workday),
+        Holiday('Independence Day', month=7, day=4, observance=nearest_workday),
+        USLaborDay,
+        USThanksgivingDay,
+        Holiday('Christmas Day', month=12, day=25, observance=nearest_workday),
+    ]
+
+
+class NYSETradingCalendar(TradingCalendar):
+    """
+    The New York Stock Exchange calendar: 9:30-16:00 sessions,
+    rule-based holidays plus the unscheduled closures since 2001,
+    and 13:00 early closes on the day before Independence Day,
+    the day after Thanksgiving and Christmas Eve.
+    """
+
+    early_close_time = datetime.time(13, 00)
+
+    #---| Unscheduled full day closures (national mourning, weather, 9/11)
+    adhoc_holidays = [
+        '2001-09-11', '2001-09-12', '2001-09-13', '2001-09-14',
+        '2004-06-11', '2007-01-02', '2012-10-29', '2012-10-30',
+        '2018-12-05', '2025-01-09',
+    ]
+
+    def holidays(self, start, end):
+        return NYSEHolidayCalendar().holidays(start, end).union(
+            pd.DatetimeIndex(self.adhoc_holidays)
+        )
+
+    def early_closes(self, start, end):
+        rules = [
+            #---| July 3rd, unless it is itself the observed holiday or a weekend
+            Holiday('Day Before Independence Day', month=7, day=3, days_of_week=(0, 1, 2, 3)),
+            Holiday('Christmas Eve', month=12, day=24, days_of_week=(0, 1, 2, 3)),
+        ]
+        early = USThanksgivingDay.dates(start, end) + pd.Timedelta(days=1)
+        for rule in rules:
+            early = early.union(rule.dates(start, end))
+        return early
+
+
+TRADING_CALENDARS = {
+    'NYSE': NYSETradingCalendar,
+}
+
+
+@functools.lru_cache(maxsize = 16)
+def _build_trading_calendar(name):
+    return TRADING_CALENDARS[name]()
+
+
+def get_trading_calendar(name=None):
+    """
+    The shared (precomputed once per process) trading calendar
+    instance registered under name, defaulting to
+    settings.TRADING_CALENDAR.
+    Parameters
+    ----------
+    name : `str`, optional
+        The calendar name, e.g. 'NYSE'.
+    Returns
+    -------
+    `TradingCalendar`
+        The trading calendar.
+    """
+    name = settings.TRADING_CALENDAR if name is None else name
+    if name not in TRADING_CALENDARS:
+        raise ValueError(
+            'Unknown trading calendar "%s". Choose one of %s.' % (name, list(TRADING_CALENDARS))
+        )
+    return _build_trading_calendar(name)
+
+
+def as_trading_calendar(calendar=None):
+    """
+    A TradingCalendar instance from a calendar instance, a
+    registered calendar name or None (the default calendar).
+    """
+    if isinstance(calendar, TradingCalendar):
+        return calendar
+    return get_trading_calendar(calendar)
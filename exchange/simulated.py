@@ -1,5 +1,5 @@
 from qfengine.exchange.exchange import Exchange
-import datetime
+from qfengine.exchange.calendar import as_trading_calendar
 
 
 
@@ -14,24 +14,23 @@ class SimulatedExchange(Exchange):
     ----------
     start_dt : `pd.Timestamp`
         The starting time of the simulated exchange.
+    trading_calendar : `TradingCalendar` or `str`, optional
+        The trading calendar (or its name) of the exchange,
+        defaulting to settings.TRADING_CALENDAR.
     """
 
-    def __init__(self, start_dt):
+    def __init__(self, start_dt, trading_calendar=None):
         self.start_dt = start_dt
-
-        # TODO: Eliminate hardcoding of NYSE
-        # TODO: Make these timezone-aware
-        self.open_dt = datetime.time(9, 30)
-        self.close_dt = datetime.time(16, 00)
+        self.calendar = as_trading_calendar(trading_calendar)
+        self.open_dt = self.calendar.open_time
+        self.close_dt = self.calendar.close_time
 
     def is_open_at_datetime(self, dt):
         """
         Check if the SimulatedExchange is open at a particular
         provided pandas Timestamp.
-        This logic is simplistic in that it only checks whether
-        the provided time is between market hours on a weekday.
-        There is no historical calendar handling or concept of
-        exchange holidays.
+        Holidays and early closes are taken from the trading
+        calendar of the exchange.
         Parameters
         ----------
         dt : `pd.Timestamp`
@@ -41,10 +40,4 @@ class SimulatedExchange(Exchange):
         `Boolean`
             Whether the exchange is open at this timestamp.
         """
-        if dt.weekday() > 4: # NOT OPEN ON WEEKEND
-            return False
-        return (
-            (self.open_dt <= dt.time())
-                    and
-            (dt.time() < self.close_dt)
-                )
\ No newline at end of file
+        return self.calendar.is_open_at_datetime(dt)
\ No newline at end of file
@@ -1,4 +1,4 @@
-from qfengine import settings
+from qfengine.tracing import as_tracer
 from qfengine.execution.order import Order
 
 from qfengine.alpha.alpha_model import AlphaModel
@@ -32,6 +32,8 @@ class PortfolioConstructionModel(object):
         The optional transaction cost model for Assets in the Universe.
     data_handler : `DataHandler`, optional
         The optional data handler used within portfolio construction.
+    tracer : `Tracer`, optional
+        The tracer of the target weights.
     """
 
     def __init__(
@@ -45,6 +47,7 @@ class PortfolioConstructionModel(object):
         risk_model=None,
         cost_model=None,
         data_handler=None,
+        tracer=None,
     ):
         self.broker = broker
         self.broker_portfolio_id = broker_portfolio_id
@@ -55,6 +58,7 @@ class PortfolioConstructionModel(object):
         self.risk_model = risk_model
         self.cost_model = cost_model
         self.data_handler = data_handler
+        self.tracer = as_tracer(tracer)
 
     def _obtain_full_asset_list(self, dt):
         """
@@ -318,10 +322,7 @@ class PortfolioConstructionModel(object):
                                             full_zero_weights,
                                             weights
                                     )
-        if settings.PRINT_EVENTS:
-            print(
-                "(%s) - target weights: %s" % (dt, full_weights)
-            )
+        self.tracer.info("(%s) - target weights: %s", dt, full_weights)
 
         # TODO: Improve this with a full statistics logging handler
         if stats is not None:
@@ -1,3 +1,7 @@
+import numpy as np
+import pandas as pd
+
+
 class PortfolioEvent(object):
     """
     Stores an individual instance of a portfolio event used to create
@@ -80,4 +84,142 @@ class PortfolioEvent(object):
             'debit': self.debit,
             'credit': self.credit,
             'balance': self.balance
-        }
\ No newline at end of file
+        }
+
+class PortfolioEventLog(object):
+    """
+    Columnar event trail of a portfolio. Each event is a row of
+    growable NumPy arrays (timestamp, type code, debit, credit and
+    balance, plus asset, quantity and price for transactions), so
+    recording an event formats no strings and creates no objects.
+    The human-readable descriptions and PortfolioEvent instances
+    are only rendered when the history is read.
+    Parameters
+    ----------
+    capacity : `int`, optional
+        The initial number of event rows, grown as needed.
+    """
+
+    event_types = ('subscription', 'withdrawal', 'asset_transaction')
+    fields = ('debit', 'credit', 'balance', 'quantity', 'price')
+
+    def __init__(self, capacity=64):
+        self._size = 0
+        self._dt_values = np.zeros(capacity, dtype=np.int64)
+        self._type_codes = np.zeros(capacity, dtype=np.int8)
+        self._asset_codes = np.full(capacity, -1, dtype=np.int64)
+        self._values = np.zeros((len(self.fields), capacity), dtype=np.float64)
+        self._assets = []
+        self._asset_loc = {}
+        self._tz = None
+
+    def __len__(self):
+        return self._size
+
+    def _grow(self):
+        self._dt_values = np.concatenate([self._dt_values, np.zeros_like(self._dt_values)])
+        self._type_codes = np.concatenate([self._type_codes, np.zeros_like(self._type_codes)])
+        self._asset_codes = np.concatenate([self._asset_codes, np.full_like(self._asset_codes, -1)])
+        self._values = np.concatenate([self._values, np.zeros_like(self._values)], axis=1)
+
+    def append(self, dt, type, debit, credit, balance, asset=None, quantity=0.0, price=0.0):
+        """
+        Record a portfolio event.
+        Parameters
+        ----------
+        dt : `pd.Timestamp`
+            Datetime of the event.
+        type : `str`
+            One of event_types.
+        debit : `float`
+            A debit to the cash balance of the portfolio.
+        credit : `float`
+            A credit to the cash balance of the portfolio.
+        balance : `float`
+            The current cash balance of the portfolio.
+        asset : `str`, optional
+            The transacted asset of an asset transaction.
+        quantity : `float`, optional
+            The transacted quantity of an asset transaction.
+        price : `float`, optional
+            The transaction price of an asset transaction.
+        """
+        i = self._size
+        if i == len(self._dt_values):
+            self._grow()
+        dt = pd.Timestamp(dt)
+        self._tz = dt.tz
+        self._dt_values[i] = dt.value
+        self._type_codes[i] = self.event_types.index(type)
+        if asset is not None:
+            if asset not in self._asset_loc:
+                self._asset_loc[asset] = len(self._assets)
+                self._assets.append(asset)
+            self._asset_codes[i] = self._asset_loc[asset]
+        self._values[:, i] = (debit, credit, balance, quantity, price)
+        self._size = i + 1
+
+    def _dts(self):
+        index = pd.DatetimeIndex(self._dt_values[:self._size])
+        if self._tz is not None:
+            index = index.tz_localize('UTC').tz_convert(self._tz)
+        return index
+
+    def descriptions(self):
+        """
+        Render the human-readable description of every event.
+        Returns
+        -------
+        `list[str]`
+            The event descriptions, in event order.
+        """
+        n = self._size
+        quantities = self._values[3, :n].tolist()
+        prices = self._values[4, :n].tolist()
+        descriptions = []
+        for i, (code, dt) in enumerate(zip(self._type_codes[:n].tolist(), self._dts())):
+            if code == 2:
+                quantity = quantities[i]
+                descriptions.append("%s %s %s %0.2f %s" % (
+                    "LONG" if quantity > 0 else "SHORT",
+                    int(quantity) if quantity == int(quantity) else quantity,
+                    self._assets[self._asset_codes[i]].upper(),
+                    prices[i], dt.strftime("%d/%m/%Y")
+                ))
+            else:
+                descriptions.append(self.event_types[code].upper())
+        return descriptions
+
+    def to_events(self):
+        """
+        Render the events as a list of PortfolioEvent instances.
+        """
+        n = self._size
+        debits, credits, balances = self._values[:3, :n].tolist()
+        return [
+            PortfolioEvent(
+                dt=dt, type=self.event_types[code], description=description,
+                debit=debit, credit=credit, balance=balance
+            )
+            for dt, code, description, debit, credit, balance in zip(
+                self._dts(), self._type_codes[:n].tolist(), self.descriptions(),
+                debits, credits, balances
+            )
+        ]
+
+    def to_df(self):
+        """
+        Render the events as a DataFrame indexed by date.
+        """
+        n = self._size
+        return pd.DataFrame(
+            {
+                "date": self._dts(),
+                "type": np.array(self.event_types, dtype=object)[self._type_codes[:n]],
+                "description": self.descriptions(),
+                "debit": self._values[0, :n],
+                "credit": self._values[1, :n],
+                "balance": self._values[2, :n],
+            },
+            columns=["date", "type", "description", "debit", "credit", "balance"]
+        ).set_index(keys=["date"])
@@ -1,11 +1,11 @@
 import copy
-import datetime
 import logging
 
-import pandas as pd
+import numpy as np
 
 from qfengine import settings
-from qfengine.portfolio.event import PortfolioEvent
+from qfengine.tracing import WARNING, as_tracer
+from qfengine.portfolio.event import PortfolioEventLog
 from qfengine.portfolio.position_handler import PositionHandler
 
 
@@ -27,6 +27,8 @@ class Portfolio(object):
         An identifier for the portfolio.
     name: str, optional
         The human-readable name of the portfolio.
+    tracer: Tracer, optional
+        The tracer of the portfolio warnings.
     """
 
     def __init__(
@@ -35,7 +37,8 @@ class Portfolio(object):
         starting_cash=0.0,
         currency = "USD",
         portfolio_id=None,
-        name=None
+        name=None,
+        tracer=None
     ):
         """
         initalize the Portfolio object with a PositionHandler,
@@ -48,18 +51,19 @@ class Portfolio(object):
         self.currency = currency
         self.portfolio_id = portfolio_id
         self.name = name
+        self.tracer = as_tracer(tracer)
 
         self.pos_handler = PositionHandler()
-        self.history = []
+        self.event_log = PortfolioEventLog()
 
         self.logger = logging.getLogger('Portfolio')
         self.logger.setLevel(logging.DEBUG)
-        self.logger.info(
-            '(%s) Portfolio "%s" instance initalized' % (
+        if self._is_logging():
+            self.logger.info(
+                '(%s) Portfolio "%s" instance initalized',
                 self.current_dt.strftime(settings.LOGGING["DATE_FORMAT"]),
                 self.portfolio_id
             )
-        )
 
         self._initalize_portfolio_with_cash()
 
@@ -71,21 +75,36 @@ class Portfolio(object):
         self.cash = copy.copy(self.starting_cash)
 
         if self.starting_cash > 0.0:
-            self.history.append(
-                PortfolioEvent.create_subscription(
-                    self.current_dt, self.starting_cash, self.starting_cash
-                )
+            self.event_log.append(
+                self.current_dt, 'subscription',
+                debit=0.0, credit=round(self.starting_cash, 2),
+                balance=round(self.starting_cash, 2)
             )
 
-        self.logger.info(
-            '(%s) Funds subscribed to portfolio "%s" '
-            '- Credit: %0.2f, Balance: %0.2f' % (
+        if self._is_logging():
+            self.logger.info(
+                '(%s) Funds subscribed to portfolio "%s" '
+                '- Credit: %0.2f, Balance: %0.2f',
                 self.current_dt.strftime(settings.LOGGING["DATE_FORMAT"]),
                 self.portfolio_id,
                 round(self.starting_cash, 2),
                 round(self.starting_cash, 2)
             )
-        )
+
+    def _is_logging(self):
+        """
+        Whether INFO records of the portfolio logger reach a handler,
+        so that the hot paths only format log messages when needed.
+        """
+        return self.logger.isEnabledFor(logging.INFO) and self.logger.hasHandlers()
+
+    @property
+    def history(self):
+        """
+        The portfolio event trail as a list of PortfolioEvent
+        instances, rendered from the event log.
+        """
+        return self.event_log.to_events()
 
     @property
     def total_market_value(self):
@@ -142,18 +161,19 @@ class Portfolio(object):
 
         self.cash += amount
 
-        self.history.append(
-            PortfolioEvent.create_subscription(self.current_dt, amount, self.cash)
+        self.event_log.append(
+            self.current_dt, 'subscription',
+            debit=0.0, credit=round(amount, 2), balance=round(self.cash, 2)
         )
 
-        self.logger.info(
-            '(%s) Funds subscribed to portfolio "%s" '
-            '- Credit: %0.2f, Balance: %0.2f' % (
+        if self._is_logging():
+            self.logger.info(
+                '(%s) Funds subscribed to portfolio "%s" '
+                '- Credit: %0.2f, Balance: %0.2f',
                 self.current_dt.strftime(settings.LOGGING["DATE_FORMAT"]),
                 self.portfolio_id, round(amount, 2),
                 round(self.cash, 2)
             )
-        )
 
     def withdraw_funds(self, dt, amount):
         """
@@ -187,18 +207,19 @@ class Portfolio(object):
 
         self.cash -= amount
 
-        self.history.append(
-            PortfolioEvent.create_withdrawal(self.current_dt, amount, self.cash)
+        self.event_log.append(
+            self.current_dt, 'withdrawal',
+            debit=round(amount, 2), credit=0.0, balance=round(self.cash, 2)
         )
 
-        self.logger.info(
-            '(%s) Funds withdrawn from portfolio "%s" '
-            '- Debit: %0.2f, Balance: %0.2f' % (
+        if self._is_logging():
+            self.logger.info(
+                '(%s) Funds withdrawn from portfolio "%s" '
+                '- Debit: %0.2f, Balance: %0.2f',
                 self.current_dt.strftime(settings.LOGGING["DATE_FORMAT"]),
                 self.portfolio_id, round(amount, 2),
                 round(self.cash, 2)
             )
-        )
 
     def transact_asset(self, txn):
         """
@@ -211,62 +232,80 @@ class Portfolio(object):
                 'transact assets.' % (txn.dt, self.current_dt)
             )
         self.current_dt = txn.dt
+        self._warn_if_short_of_cash(txn)
+        self.pos_handler.transact_position(txn)
+        self._record_transaction(txn)
 
-        txn_share_cost = txn.price * txn.quantity
-        txn_total_cost = txn_share_cost + txn.commission
-
-        if txn_total_cost > self.cash:
-            if settings.PRINT_EVENTS:
-                print(
-                    'WARNING: Not enough cash in the portfolio to '
-                    'carry out transaction. Transaction cost of %s '
-                    'exceeds remaining cash of %s. Transaction '
-                    'will proceed with a negative cash balance.' % (
-                        txn_total_cost, self.cash
-                    )
+    def transact_assets(self, txns):
+        """
+        Adjusts positions to account for many transactions at
+        once, applying them to the position book in one step.
+        Cash and history are updated in transaction order, as
+        with repeated transact_asset() calls.
+        """
+        for txn in txns:
+            if txn.dt < self.current_dt:
+                raise ValueError(
+                    'Transaction datetime (%s) is earlier than '
+                    'current portfolio datetime (%s). Cannot '
+                    'transact assets.' % (txn.dt, self.current_dt)
                 )
+        if len(txns) == 0:
+            return
+        self.current_dt = max(txn.dt for txn in txns)
+        if self.tracer.enabled_for(WARNING):
+            cash = self.cash
+            for txn in txns:
+                self._warn_if_short_of_cash(txn, cash)
+                cash -= txn.price * txn.quantity + txn.commission
+        self.pos_handler.transact_positions(txns)
+        for txn in txns:
+            self._record_transaction(txn)
+
+    def _warn_if_short_of_cash(self, txn, cash=None):
+        cash = self.cash if cash is None else cash
+        txn_total_cost = txn.price * txn.quantity + txn.commission
+
+        if txn_total_cost > cash:
+            self.tracer.warning(
+                'WARNING: Not enough cash in the portfolio to '
+                'carry out transaction. Transaction cost of %s '
+                'exceeds remaining cash of %s. Transaction '
+                'will proceed with a negative cash balance.',
+                txn_total_cost, cash
+            )
 
-        self.pos_handler.transact_position(txn)
-
+    def _record_transaction(self, txn):
+        """
+        Debit the transaction cost from cash and add the
+        transaction to the portfolio history.
+        """
+        txn_share_cost = txn.price * txn.quantity
+        txn_total_cost = txn_share_cost + txn.commission
         self.cash -= txn_total_cost
 
-        # Form Portfolio history details
-        direction = "LONG" if txn.direction > 0 else "SHORT"
-        description = "%s %s %s %0.2f %s" % (
-            direction, txn.quantity, txn.asset.upper(),
-            txn.price, datetime.datetime.strftime(txn.dt, "%d/%m/%Y")
-        )
-        if direction == "LONG":
-            pe = PortfolioEvent(
-                dt=txn.dt, type='asset_transaction',
-                description=description,
-                debit=round(txn_total_cost, 2), credit=0.0,
-                balance=round(self.cash, 2)
-            )
-            self.logger.info(
-                '(%s) Asset "%s" transacted LONG in portfolio "%s" '
-                '- Debit: %0.2f, Balance: %0.2f' % (
-                    txn.dt.strftime(settings.LOGGING["DATE_FORMAT"]),
-                    txn.asset, self.portfolio_id,
-                    round(txn_total_cost, 2), round(self.cash, 2)
-                )
-            )
+        # Record the portfolio history details, descriptions
+        # are only rendered when the history is read
+        if txn.direction > 0:
+            debit, credit = round(txn_total_cost, 2), 0.0
         else:
-            pe = PortfolioEvent(
-                dt=txn.dt, type='asset_transaction',
-                description=description,
-                debit=0.0, credit=-1.0 * round(txn_total_cost, 2),
-                balance=round(self.cash, 2)
-            )
+            debit, credit = 0.0, -1.0 * round(txn_total_cost, 2)
+        self.event_log.append(
+            txn.dt, 'asset_transaction',
+            debit=debit, credit=credit, balance=round(self.cash, 2),
+            asset=txn.asset, quantity=txn.quantity, price=txn.price
+        )
+        if self._is_logging():
             self.logger.info(
-                '(%s) Asset "%s" transacted SHORT in portfolio "%s" '
-                '- Credit: %0.2f, Balance: %0.2f' % (
-                    txn.dt.strftime(settings.LOGGING["DATE_FORMAT"]),
-                    txn.asset, self.portfolio_id,
-                    -1.0 * round(txn_total_cost, 2), round(self.cash, 2)
-                )
+                '(%s) Asset "%s" transacted %s in portfolio "%s" '
+                '- %s: %0.2f, Balance: %0.2f',
+                txn.dt.strftime(settings.LOGGING["DATE_FORMAT"]),
+                txn.asset, "LONG" if txn.direction > 0 else "SHORT",
+                self.portfolio_id,
+                "Debit" if txn.direction > 0 else "Credit",
+                debit if txn.direction > 0 else credit,
+                round(self.cash, 2)
             )
-        self.history.append(pe)
 
     def portfolio_to_dict(self):
         """
@@ -296,37 +335,61 @@ class Portfolio(object):
         Update the market value of the asset to the current
         trade price and date.
         """
-        if asset not in self.pos_handler.positions:
+        self.update_market_value_of_assets(
+            [asset], [current_price], current_dt
+        )
+
+    def update_market_value_of_assets(
+        self, assets, current_prices, current_dt
+    ):
+        """
+        Update the market values of many assets at once to their
+        current trade prices and the current date.
+        Parameters
+        ----------
+        assets : `list[str]`
+            The assets to update, those not held are ignored.
+        current_prices : `list[float]` or `np.ndarray`
+            The current trade prices, aligned with assets.
+        current_dt : `pd.Timestamp`
+            The current date.
+        """
+        pos_handler = self.pos_handler
+        held = [
+            (asset, price) for asset, price in zip(assets, current_prices)
+            if asset in pos_handler
+        ]
+        if len(held) == 0:
             return
-        else:
-            if current_price < 0.0:
-                raise ValueError(
-                    'Current trade price of %s is negative for '
-                    'asset %s. Cannot update position.' % (
-                        current_price, asset
-                    )
-                )
 
-            if current_dt < self.current_dt:
-                raise ValueError(
-                    'Current trade date of %s is earlier than '
-                    'current date %s of asset %s. Cannot update '
-                    'position.' % (
-                        current_dt, self.current_dt, asset
-                    )
+        held_prices = np.fromiter(
+            (price for _, price in held), dtype=np.float64, count=len(held)
+        )
+        negative = held_prices < 0.0
+        if negative.any():
+            i = int(np.argmax(negative))
+            raise ValueError(
+                'Current trade price of %s is negative for '
+                'asset %s. Cannot update position.' % (
+                    held_prices[i], held[i][0]
                 )
+            )
 
-            self.pos_handler.positions[asset].update_current_price(
-                current_price, current_dt
+        if current_dt < self.current_dt:
+            raise ValueError(
+                'Current trade date of %s is earlier than '
+                'current date %s of asset %s. Cannot update '
+                'position.' % (
+                    current_dt, self.current_dt, held[0][0]
+                )
             )
 
+        pos_handler.update_current_prices(
+            [asset for asset, _ in held], held_prices, current_dt
+        )
+
     def history_to_df(self):
         """
         Creates a Pandas DataFrame of the Portfolio history.
         """
-        records = [pe.to_dict() for pe in self.history]
-        return pd.DataFrame.from_records(
-            records, columns=[
-                "date", "type", "description", "debit", "credit", "balance"
-            ]
-        ).set_index(keys=["date"])
\ No newline at end of file
+        return self.event_log.to_df()
\ No newline at end of file
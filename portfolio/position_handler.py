@@ -1,18 +1,124 @@
 from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
 from qfengine.portfolio.position import Position
 
+
 class PositionHandler(object):
     """
     A class that keeps track of, and updates, the current
-    list of Position instances stored in a Portfolio entity.
+    positions stored in a Portfolio entity.
+    Positions live in a position book of NumPy arrays, one slot
+    per held asset (an asset -> slot index plus per-slot buy/sell
+    quantities, average prices, commissions, last price and last
+    update time). Price updates write straight into the arrays and
+    the portfolio totals are vectorised reductions over them, so
+    their cost does not grow with Python objects per position.
+    Transactions are rare by comparison and are accounted for with
+    the usual Position logic on the slot of the asset.
+    Parameters
+    ----------
+    capacity : `int`, optional
+        The initial number of slots, grown as needed.
     """
 
-    def __init__(self):
+    leg_fields = (
+        'buy_quantity', 'sell_quantity', 'avg_bought', 'avg_sold',
+        'buy_commission', 'sell_commission', 'current_price'
+    )
+
+    def __init__(self, capacity=16):
         """
-        Initialise the PositionHandler object to generate
-        an ordered dictionary containing the current positions.
+        Initialise the PositionHandler object with an empty
+        position book.
         """
-        self.positions = OrderedDict()
+        self._slot = {}
+        self._assets = []
+        self._book = np.zeros((len(self.leg_fields), capacity), dtype=np.float64)
+        self._dt_values = np.zeros(capacity, dtype=np.int64)
+        self._tz = None
+        self._positions = None
+
+    def _field(self, name):
+        return self._book[self.leg_fields.index(name), :len(self._assets)]
+
+    @property
+    def assets(self):
+        """
+        The held assets, in the order their positions were opened.
+        """
+        return list(self._assets)
+
+    def __contains__(self, asset):
+        return asset in self._slot
+
+    def __len__(self):
+        return len(self._assets)
+
+    @property
+    def positions(self):
+        """
+        An ordered dictionary of read-only Position snapshots of the
+        position book, rebuilt only after the book has changed.
+        """
+        if self._positions is None:
+            self._positions = OrderedDict(
+                (asset, self._position_at(slot))
+                for slot, asset in enumerate(self._assets)
+            )
+        return self._positions
+
+    def _position_at(self, slot):
+        legs = self._book[:, slot].tolist()
+        return Position(
+            self._assets[slot],
+            legs[6],
+            self._dt_at(slot),
+            legs[0], legs[1], legs[2], legs[3], legs[4], legs[5]
+        )
+
+    def _dt_at(self, slot):
+        return pd.Timestamp(int(self._dt_values[slot]), tz='UTC').tz_convert(self._tz) \
+            if self._tz is not None else pd.Timestamp(int(self._dt_values[slot]))
+
+    def _store_position(self, slot, position):
+        self._book[:, slot] = [
+            position.buy_quantity, position.sell_quantity,
+            position.avg_bought, position.avg_sold,
+            position.buy_commission, position.sell_commission,
+            position.current_price
+        ]
+        self._set_dt_values([slot], position.current_dt)
+
+    def _set_dt_values(self, slots, dt):
+        dt = pd.Timestamp(dt)
+        self._tz = dt.tz
+        self._dt_values[slots] = dt.value
+
+    def _open_slot(self, asset):
+        slot = len(self._assets)
+        if slot == self._book.shape[1]:
+            self._book = np.concatenate([self._book, np.zeros_like(self._book)], axis=1)
+            self._dt_values = np.concatenate([self._dt_values, np.zeros_like(self._dt_values)])
+        self._slot[asset] = slot
+        self._assets.append(asset)
+        return slot
+
+    def _close_slots(self, assets):
+        """
+        Free the slots of assets, shifting the remaining positions
+        down so they keep the order they were opened in.
+        """
+        n = len(self._assets)
+        keep = np.ones(n, dtype=bool)
+        keep[[self._slot[a] for a in assets]] = False
+        kept = int(keep.sum())
+        self._book[:, :kept] = self._book[:, :n][:, keep]
+        self._dt_values[:kept] = self._dt_values[:n][keep]
+        self._assets = [a for a, k in zip(self._assets, keep) if k]
+        self._slot = {a: i for i, a in enumerate(self._assets)}
 
     def transact_position(self, transaction):
         """
@@ -20,48 +126,173 @@ class PositionHandler(object):
         position for the transaction's asset accordingly.
         """
         asset = transaction.asset
-        if asset in self.positions:
-            self.positions[asset].transact(transaction)
+        if asset in self._slot:
+            slot = self._slot[asset]
+            position = self._position_at(slot)
+            position.transact(transaction)
         else:
             position = Position.open_from_transaction(transaction)
-            self.positions[asset] = position
+            slot = self._open_slot(asset)
+        self._store_position(slot, position)
 
         # If the position has zero quantity remove it
-        if self.positions[asset].net_quantity == 0:
-            del self.positions[asset]
+        if position.net_quantity == 0:
+            self._close_slots([asset])
+        self._positions = None
+
+    def transact_positions(self, transactions):
+        """
+        Execute many transactions, in different assets, in one step
+        on the position book. The result is the same as calling
+        transact_position() on each of them in turn.
+        Parameters
+        ----------
+        transactions : `list[Transaction]`
+            The transactions to apply.
+        """
+        assets = [txn.asset for txn in transactions]
+        if len(set(assets)) != len(assets):
+            for txn in transactions:
+                self.transact_position(txn)
+            return
+        if len(assets) == 0:
+            return
+        quantities = np.array([txn.quantity for txn in transactions], dtype=np.float64)
+        prices = np.array([txn.price for txn in transactions], dtype=np.float64)
+        commissions = np.array([txn.commission for txn in transactions], dtype=np.float64)
+        dt = transactions[0].dt
+        if any(txn.dt != dt for txn in transactions):
+            for txn in transactions:
+                self.transact_position(txn)
+            return
+
+        is_held = np.array([a in self._slot for a in assets], dtype=bool)
+        #---| Position.transact ignores transactions of less than one unit
+        traded = is_held & (np.floor(quantities) != 0)
+        if traded.any():
+            held = np.flatnonzero(traded)
+            slots = np.array([self._slot[assets[i]] for i in held], dtype=np.int64)
+            self.update_current_prices([assets[i] for i in held], prices[held], dt)
+            book = self._book
+            for side, sign, qty_row, avg_row, comm_row in (
+                (quantities[held] > 0, 1.0, 0, 2, 4),
+                (quantities[held] < 0, -1.0, 1, 3, 5),
+            ):
+                s, i = slots[side], held[side]
+                q = sign * quantities[i]
+                book[avg_row, s] = (book[avg_row, s] * book[qty_row, s] + q * prices[i]) / (book[qty_row, s] + q)
+                book[qty_row, s] += q
+                book[comm_row, s] += commissions[i]
+
+        for i in np.flatnonzero(~is_held):
+            self._store_position(
+                self._open_slot(assets[i]),
+                Position.open_from_transaction(transactions[i])
+            )
+
+        net = self.net_quantities()
+        closed = [a for a in assets if net[self._slot[a]] == 0]
+        if len(closed) > 0:
+            self._close_slots(closed)
+        self._positions = None
+
+    def update_current_prices(self, assets, current_prices, dt=None):
+        """
+        Update the current market prices of many held assets at once.
+        Parameters
+        ----------
+        assets : `list[str]`
+            The held assets to update.
+        current_prices : `list[float]` or `np.ndarray`
+            The current market prices, aligned with assets.
+        dt : `pd.Timestamp`, optional
+            The optional timestamp of the current market prices.
+        """
+        if len(assets) == 0:
+            return
+        slots = np.fromiter((self._slot[a] for a in assets), dtype=np.int64, count=len(assets))
+        prices = np.asarray(current_prices, dtype=np.float64)
+        if dt is not None:
+            value = pd.Timestamp(dt).value
+            earlier = self._dt_values[slots] > value
+            if earlier.any():
+                raise ValueError(
+                    'Supplied update time of "%s" is earlier than '
+                    'the current time of "%s".' % (
+                        dt, self._dt_at(int(slots[np.argmax(earlier)]))
+                    )
+                )
+        not_positive = prices <= 0.0
+        if not_positive.any():
+            i = int(np.argmax(not_positive))
+            raise ValueError(
+                'Market price "%s" of asset "%s" must be positive to '
+                'update the position.' % (prices[i], assets[i])
+            )
+        self._book[self.leg_fields.index('current_price'), slots] = prices
+        if dt is not None:
+            self._set_dt_values(slots, dt)
+        self._positions = None
+
+    def net_quantities(self):
+        """
+        The net quantities of all held assets, aligned with assets.
+        """
+        return self._field('buy_quantity') - self._field('sell_quantity')
+
+    def market_values(self):
+        """
+        The market values of all held assets, aligned with assets.
+        """
+        return self._field('current_price') * self.net_quantities()
+
+    def _avg_prices(self):
+        net = self.net_quantities()
+        buy, sell = self._field('buy_quantity'), self._field('sell_quantity')
+        with np.errstate(divide='ignore', invalid='ignore'):
+            long_avg = (self._field('avg_bought') * buy + self._field('buy_commission')) / buy
+            short_avg = (self._field('avg_sold') * sell - self._field('sell_commission')) / sell
+        return np.where(net > 0, long_avg, np.where(net < 0, short_avg, 0.0))
+
+    def _realised_pnls(self):
+        net = self.net_quantities()
+        buy, sell = self._field('buy_quantity'), self._field('sell_quantity')
+        avg_bought, avg_sold = self._field('avg_bought'), self._field('avg_sold')
+        buy_comm, sell_comm = self._field('buy_commission'), self._field('sell_commission')
+        with np.errstate(divide='ignore', invalid='ignore'):
+            long_pnl = np.where(
+                sell == 0, 0.0,
+                (avg_sold - avg_bought) * sell - (sell / buy) * buy_comm - sell_comm
+            )
+            short_pnl = np.where(
+                buy == 0, 0.0,
+                (avg_sold - avg_bought) * buy - (buy / sell) * sell_comm - buy_comm
+            )
+        flat_pnl = (avg_sold * sell - avg_bought * buy) - (buy_comm + sell_comm)
+        return np.where(net > 0, long_pnl, np.where(net < 0, short_pnl, flat_pnl))
 
     def total_market_value(self):
         """
         Calculate the sum of all the positions' market values.
         """
-        return sum(
-            pos.market_value
-            for asset, pos in self.positions.items()
-        )
+        return float(self.market_values().sum())
 
     def total_unrealised_pnl(self):
         """
         Calculate the sum of all the positions' unrealised P&Ls.
         """
-        return sum(
-            pos.unrealised_pnl
-            for asset, pos in self.positions.items()
+        return float(
+            ((self._field('current_price') - self._avg_prices()) * self.net_quantities()).sum()
         )
 
     def total_realised_pnl(self):
         """
         Calculate the sum of all the positions' realised P&Ls.
         """
-        return sum(
-            pos.realised_pnl
-            for asset, pos in self.positions.items()
-        )
+        return float(self._realised_pnls().sum())
 
     def total_pnl(self):
         """
         Calculate the sum of all the positions' P&Ls.
         """
-        return sum(
-            pos.total_pnl
-            for asset, pos in self.positions.items()
-        )
\ No newline at end of file
+        return self.total_realised_pnl() + self.total_unrealised_pnl()
@@ -0,0 +1,296 @@
+import functools
+import json
+import os
+import threading
+import time
+
+import pandas as pd
+
+
+class _ProfiledCallable(object):
+    """
+    Stand-in for a callable component (alpha model, optimizer,
+    order sizer...) that times its calls and forwards everything
+    else to it.
+    """
+
+    def __init__(self, profiler, component, target):
+        self._profiler = profiler
+        self._component = component
+        self._target = target
+
+    def __call__(self, *args, **kwargs):
+        start = time.perf_counter_ns()
+        try:
+            return self._target(*args, **kwargs)
+        finally:
+            self._profiler.record(self._component, start, time.perf_counter_ns())
+
+    def __getattr__(self, name):
+        return getattr(self._target, name)
+
+    def __repr__(self):
+        return repr(self._target)
+
+    def __str__(self):
+        return str(self._target)
+
+
+class Profiler(object):
+    """
+    Opt-in instrumentation of a backtest run. Components are wrapped
+    in place when the run starts (instrument_method() for methods
+    such as broker.update, instrument_callable() for callable models
+    held by an owner) and restored when it ends, so a session without
+    a profiler runs the original code untouched.
+    Every call records its wall time under (component, event type),
+    the event type being the simulation event the session is at.
+    Cache hit rates are counted per event type for instrumented
+    lookups (instrument_cache()) and per run for the lru_cache
+    methods of the price sources (watch_lru_caches()).
+    At the end of a run a summary table and a Chrome trace timeline
+    (chrome://tracing or https://ui.perfetto.dev) can be written.
+    Parameters
+    ----------
+    output_dir : `str`, optional
+        Directory to write profile_summary.txt and profile_trace.json
+        to at the end of each run. Nothing is written without one.
+    timeline : `Boolean`, optional
+        Whether to record every call for the Chrome trace.
+    max_timeline_events : `int`, optional
+        The maximum number of calls kept for the Chrome trace,
+        timings are still aggregated beyond it.
+    """
+
+    def __init__(self, output_dir=None, timeline=True, max_timeline_events=1000000):
+        self.output_dir = output_dir
+        self.timeline = timeline
+        self.max_timeline_events = max_timeline_events
+        self.event_type = None
+        self.reset()
+
+    def reset(self):
+        """
+        Discard all recorded timings and cache counts.
+        """
+        self._stats = {}
+        self._caches = {}
+        self._events = []
+        self._patches = []
+        self._lru_caches = {}
+        self._t0 = time.perf_counter_ns()
+        self._wall_ns = 0
+
+    #!---| Recording
+    def record(self, component, start, end):
+        """
+        Record a call of component from start to end (perf_counter_ns).
+        """
+        key = (component, self.event_type)
+        stats = self._stats.get(key)
+        if stats is None:
+            stats = self._stats[key] = [0, 0, 0]
+        elapsed = end - start
+        stats[0] += 1
+        stats[1] += elapsed
+        if elapsed > stats[2]:
+            stats[2] = elapsed
+        if self.timeline and len(self._events) < self.max_timeline_events:
+            self._events.append(
+                (component, self.event_type, start, elapsed, threading.get_ident())
+            )
+
+    def count_cache(self, cache, hit, event_type=None):
+        """
+        Count a lookup of cache, and whether it was a hit.
+        """
+        key = (cache, self.event_type if event_type is None else event_type)
+        counts = self._caches.get(key)
+        if counts is None:
+            counts = self._caches[key] = [0, 0]
+        counts[0] += 1
+        counts[1] += bool(hit)
+
+    #!---| Instrumentation
+    def instrument_method(self, obj, name, component=None):
+        """
+        Time the calls of the method name of obj, by shadowing it
+        with a timed wrapper on the instance until restore().
+        """
+        method = getattr(obj, name, None)
+        if method is None:
+            return
+        component = component or name
+        record = self.record
+
+        @functools.wraps(method)
+        def timed(*args, **kwargs):
+            start = time.perf_counter_ns()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                record(component, start, time.perf_counter_ns())
+
+        self._patch(obj, name, timed)
+
+    def instrument_callable(self, owner, name, component=None):
+        """
+        Time the calls of the callable attribute name of owner, by
+        replacing it with a forwarding stand-in until restore().
+        """
+        target = getattr(owner, name, None)
+        if target is None or not callable(target):
+            return
+        self._patch(owner, name, _ProfiledCallable(self, component or name, target))
+
+    def instrument_cache(self, obj, lookup, miss, cache):
+        """
+        Count the calls of the method lookup of obj as lookups of
+        cache and the calls of its method miss as misses.
+        """
+        lookup_method = getattr(obj, lookup, None)
+        miss_method = getattr(obj, miss, None)
+        if lookup_method is None or miss_method is None:
+            return
+        profiler = self
+        #---| a lookup is a hit unless it calls miss before returning
+        misses = []
+
+        @functools.wraps(lookup_method)
+        def counted_lookup(*args, **kwargs):
+            misses.append(False)
+            try:
+                return lookup_method(*args, **kwargs)
+            finally:
+                profiler.count_cache(cache, not misses.pop())
+
+        @functools.wraps(miss_method)
+        def counted_miss(*args, **kwargs):
+            if misses:
+                misses[-1] = True
+            return miss_method(*args, **kwargs)
+
+        self._patch(obj, lookup, counted_lookup)
+        self._patch(obj, miss, counted_miss)
+
+    def watch_lru_caches(self, obj, prefix=None):
+        """
+        Count, over the run, the hits and misses of the lru_cache
+        methods of obj (e.g. of a price data source).
+        """
+        prefix = prefix or obj.__class__.__name__
+        for name in dir(obj.__class__):
+            method = getattr(obj.__class__, name, None)
+            if hasattr(method, 'cache_info'):
+                info = method.cache_info()
+                self._lru_caches["%s.%s" % (prefix, name)] = (method, info.hits, info.misses)
+
+    def _patch(self, obj, name, value):
+        self._patches.append((obj, name, name in getattr(obj, '__dict__', {}), getattr(obj, name)))
+        setattr(obj, name, value)
+
+    def restore(self):
+        """
+        Undo all the instrumentation, in reverse order, and close
+        the lru_cache counts.
+        """
+        while self._patches:
+            obj, name, was_instance_attr, value = self._patches.pop()
+            if was_instance_attr:
+                setattr(obj, name, value)
+            else:
+                delattr(obj, name)
+        for cache, (method, hits, misses) in self._lru_caches.items():
+            info = method.cache_info()
+            new_hits, new_misses = info.hits - hits, info.misses - misses
+            if new_hits + new_misses > 0:
+                self._caches[(cache, 'all')] = [new_hits + new_misses, new_hits]
+        self._lru_caches = {}
+        self.event_type = None
+
+    def start_run(self):
+        self._run_start = time.perf_counter_ns()
+
+    def end_run(self):
+        """
+        Restore the instrumented components and write the outputs,
+        if there is an output_dir.
+        """
+        self._wall_ns += time.perf_counter_ns() - self._run_start
+        self.restore()
+        if self.output_dir is not None:
+            if not os.path.exists(self.output_dir):
+                os.makedirs(self.output_dir)
+            with open(os.path.join(self.output_dir, 'profile_summary.txt'), 'w') as f:
+                f.write(self.summary())
+            self.write_chrome_trace(os.path.join(self.output_dir, 'profile_trace.json'))
+
+    #!---| Reporting
+    def timings_df(self):
+        """
+        Wall time and call counts per component and event type.
+        Returns
+        -------
+        `pd.DataFrame`
+            Indexed by (component, event_type) with calls, total_ms,
+            mean_us, max_us and pct_of_run (inclusive of nested
+            components) columns, slowest first.
+        """
+        rows = [
+            (component, event_type, calls, total / 1e6, total / calls / 1e3, peak / 1e3)
+            for (component, event_type), (calls, total, peak) in self._stats.items()
+        ]
+        df = pd.DataFrame(
+            rows, columns=['component', 'event_type', 'calls', 'total_ms', 'mean_us', 'max_us']
+        )
+        df['event_type'] = df['event_type'].fillna('-')
+        df['pct_of_run'] = 100.0 * df['total_ms'] * 1e6 / self._wall_ns if self._wall_ns else float('nan')
+        return df.sort_values('total_ms', ascending=False).set_index(['component', 'event_type'])
+
+    def caches_df(self):
+        """
+        Lookups, hits and hit rate per cache and event type.
+        """
+        rows = [
+            (cache, event_type if event_type is not None else '-', lookups, hits, hits / lookups)
+            for (cache, event_type), (lookups, hits) in self._caches.items()
+        ]
+        return pd.DataFrame(
+            rows, columns=['cache', 'event_type', 'lookups', 'hits', 'hit_rate']
+        ).sort_values(['cache', 'event_type']).set_index(['cache', 'event_type'])
+
+    def summary(self):
+        """
+        The timings and cache tables as text.
+        """
+        with pd.option_context('display.max_rows', None, 'display.max_columns', None,
+                               'display.width', 200,
+                               'display.float_format', '{:,.2f}'.format):
+            return "Run wall time: %0.2f ms\n\n%s\n\n%s\n" % (
+                self._wall_ns / 1e6, self.timings_df(), self.caches_df()
+            )
+
+    def chrome_trace(self):
+        """
+        The recorded calls in the Chrome trace event format.
+        """
+        pid = os.getpid()
+        return {
+            'traceEvents': [
+                {
+                    'name': component,
+                    'cat': event_type or '-',
+                    'ph': 'X',
+                    'ts': (start - self._t0) / 1e3,
+                    'dur': elapsed / 1e3,
+                    'pid': pid,
+                    'tid': tid,
+                }
+                for component, event_type, start, elapsed, tid in self._events
+            ],
+            'displayTimeUnit': 'ms',
+        }
+
+    def write_chrome_trace(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.chrome_trace(), f)
@@ -1,10 +1,22 @@
 from qfengine.risk.risk_model import RiskModel
+from qfengine.risk.covariance.rolling_covariance import RollingCovarianceEstimator
 from abc import ABCMeta
 import numpy as np
 import pandas as pd
 
 
 class CovarianceMatrixRiskModel(RiskModel):
+    '''
+    Covariance matrix of the daily returns of the universe assets up
+    to each call, from their historical closes.
+    With incremental = True the returns are kept by a
+    RollingCovarianceEstimator across calls: each call only fetches
+    the closes since the previous one and updates running sums,
+    with an exact recompute from the full history whenever the
+    universe changes. The window is expanding, or sliding over
+    rolling_window (as set by the tailing models), and arbitrary
+    ret_filter_op are not supported then.
+    '''
 
     __metaclass__ = ABCMeta
 
@@ -15,6 +27,8 @@ class CovarianceMatrixRiskModel(RiskModel):
                     ret_filter_op = None,
                     ret_std_op = None,
                     ret_corr_op = None,
+                    incremental:bool = False,
+                    rolling_window = None,
                         **kwargs
     ):
         self.universe = universe
@@ -25,6 +39,17 @@ class CovarianceMatrixRiskModel(RiskModel):
         self.ret_std_op = ret_std_op
         self.ret_corr_op = ret_corr_op
 
+        self.incremental = incremental
+        self.rolling_window = rolling_window
+        if incremental and (ret_filter_op is not None) and (rolling_window is None):
+            raise ValueError(
+                "Incremental covariance cannot apply an arbitrary 'ret_filter_op', "
+                "use 'rolling_window' instead."
+            )
+        self.estimator = RollingCovarianceEstimator(window = rolling_window)
+        self._last_close_dt = None
+        self._last_closes = None
+
 
     #---| Computing Returns TimeSeries Data
     def _closes_to_returns_df(self, closes_df:pd.DataFrame, **kwargs)->pd.DataFrame:
@@ -53,6 +78,41 @@ class CovarianceMatrixRiskModel(RiskModel):
                                             )
                                       )
 
+    #---| Incremental Returns
+    def _update_estimator(self, dt, **kwargs):
+        assets = self.universe.get_assets(dt)
+        if (self._last_close_dt is None) or (set(assets) != set(self.estimator.assets)):
+            #---| universe changed, exact recompute from the full history
+            closes_df = self._get_universe_historical_daily_close_df(dt, **kwargs)
+            self.estimator.reset(closes_df.columns)
+        else:
+            #---| only the closes since the last one seen (for its return)
+            closes_df = self.data_handler.get_assets_historical_closes(
+                                                    assets,
+                                                    start_dt = self._last_close_dt,
+                                                    end_dt = dt)
+            if not self.logarithmic_returns:
+                #---| pct_change() pads missing closes over the full history, pad from the last ones seen
+                closes_df = pd.concat([
+                                self._last_closes.to_frame().T,
+                                closes_df.loc[closes_df.index > self._last_close_dt],
+                            ]).ffill()
+        if len(closes_df) > 0:
+            self._last_close_dt = closes_df.index[-1]
+            self._last_closes = closes_df.ffill().iloc[-1]
+            self.estimator.update(self._closes_to_returns_df(closes_df, **kwargs))
+
+    def _incremental_covariance_matrix(self, dt, **kwargs):
+        self._update_estimator(dt, **kwargs)
+        if self.ret_std_op is None and self.ret_corr_op is None:
+            return self._compute_covariance_matrix(
+                                std = self.estimator.std(),
+                                corr = self.estimator.corr())
+        ret = self.estimator.returns_df()
+        std = self._returns_volatility(ret) if self.ret_std_op is not None else self.estimator.std()
+        corr = self._returns_correlation(ret) if self.ret_corr_op is not None else self.estimator.corr()
+        return self._compute_covariance_matrix(std = std, corr = corr)
+
     #---| Computing Covariance Matrix
     def _returns_volatility(self, ret):
         if self.ret_std_op is not None:
@@ -101,6 +161,8 @@ class CovarianceMatrixRiskModel(RiskModel):
 
     #---| __call__()
     def __call__(self, dt, **kwargs):
+        if self.incremental:
+            return self._incremental_covariance_matrix(dt, **kwargs)
         ret_df = self.get_returns_df(dt, **kwargs)
         return self.calculate_returns_covariance_matrix(ret_df)
     
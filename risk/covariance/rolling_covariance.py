@@ -0,0 +1,146 @@
+import numpy as np
+import pandas as pd
+
+
+class RollingCovarianceEstimator(object):
+    '''
+    Incremental sample covariance of asset returns over an expanding
+    window, or a sliding window of time (as the tailing risk models).
+    Keeps running sums of the returns and of their cross-products,
+    shifted by a reference row for numerical stability, so that an
+    update only costs the new returns (and those leaving the window)
+    rather than the whole history. The returns in the window are kept
+    for exact recomputation (every time as many returns have left the
+    window as it holds) and for custom std/corr operations.
+    As with DataFrame.dropna(), returns rows with any missing value
+    are left out.
+    Parameters
+    ----------
+    window : `str` or `pd.Timedelta`, optional
+        The sliding window, keeping the returns dated on or after the
+        latest one less window. Expanding when None.
+    '''
+
+    def __init__(self, window=None):
+        self.window = pd.Timedelta(window) if window is not None else None
+        self.reset([])
+
+    def reset(self, assets):
+        '''
+        Drop all returns and start over with assets as the columns.
+        '''
+        self.assets = list(assets)
+        n_assets = len(self.assets)
+        self._index = np.empty(0, dtype=np.int64)
+        self._returns = np.empty((0, n_assets), dtype=np.float64)
+        self._start = 0
+        self._tz = None
+        self._shift = None
+        self._count = 0
+        self._sum = np.zeros(n_assets, dtype=np.float64)
+        self._cross = np.zeros((n_assets, n_assets), dtype=np.float64)
+        self._evicted = 0
+
+    def __len__(self):
+        return self._count
+
+    #!---| Updating
+    def _accumulate(self, returns, sign):
+        centered = returns - self._shift
+        self._count += sign * len(returns)
+        self._sum += sign * centered.sum(axis=0)
+        self._cross += sign * np.dot(centered.T, centered)
+
+    def _recompute(self):
+        window = self._returns[self._start:]
+        self._shift = window[0] if len(window) else None
+        self._count = 0
+        self._sum[:] = 0.0
+        self._cross[:] = 0.0
+        if len(window):
+            self._accumulate(window, 1)
+        self._evicted = 0
+
+    def update(self, returns_df:pd.DataFrame):
+        '''
+        Add returns dated after those already held, and drop those
+        that have left the window.
+        Parameters
+        ----------
+        returns_df : `pd.DataFrame`
+            The new returns, with (at least) the assets as columns.
+        '''
+        if list(returns_df.columns) != self.assets:
+            returns_df = returns_df.reindex(columns=self.assets)
+        index = pd.DatetimeIndex(returns_df.index)
+        returns = returns_df.to_numpy(dtype=np.float64)
+        keep = ~np.isnan(returns).any(axis=1)
+        if len(self._index) > self._start:
+            keep &= index.asi8 > self._index[-1]
+        if not keep.any():
+            return
+        index, returns = index[keep], returns[keep]
+        self._tz = index.tz
+
+        #---| compact the held returns before appending the new ones
+        self._index = np.concatenate([self._index[self._start:], index.asi8])
+        self._returns = np.concatenate([self._returns[self._start:], returns])
+        self._start = 0
+        if self._shift is None:
+            self._shift = returns[0].copy()
+        self._accumulate(returns, 1)
+
+        if self.window is not None:
+            start = int(np.searchsorted(
+                self._index, self._index[-1] - self.window.value, side='left'
+            ))
+            if start > 0:
+                self._accumulate(self._returns[:start], -1)
+                self._evicted += start
+                self._start = start
+        if self._evicted >= len(self._index) - self._start:
+            self._recompute()
+
+    #!---| Estimates
+    def returns_df(self):
+        '''
+        The returns in the window.
+        '''
+        index = pd.DatetimeIndex(self._index[self._start:])
+        if self._tz is not None:
+            index = index.tz_localize('UTC').tz_convert(self._tz)
+        return pd.DataFrame(
+            self._returns[self._start:], index=index, columns=self.assets
+        )
+
+    def _cov_values(self):
+        n = self._count
+        if n < 2:
+            return np.full_like(self._cross, np.nan)
+        mean = self._sum / n
+        return (self._cross - n * np.outer(mean, mean)) / (n - 1)
+
+    def cov(self):
+        '''
+        The sample covariance matrix of the returns in the window.
+        '''
+        return pd.DataFrame(self._cov_values(), index=self.assets, columns=self.assets)
+
+    def std(self):
+        '''
+        The sample standard deviations of the returns in the window.
+        '''
+        return pd.Series(
+            np.sqrt(np.maximum(np.diag(self._cov_values()), 0.0)), index=self.assets
+        )
+
+    def corr(self):
+        '''
+        The correlation matrix of the returns in the window.
+        '''
+        cov = self._cov_values()
+        std = np.sqrt(np.maximum(np.diag(cov), 0.0))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            corr = np.clip(cov / np.outer(std, std), -1.0, 1.0)
+        corr[np.diag_indices_from(corr)] = np.where(std > 0, 1.0, np.nan)
+        return pd.DataFrame(corr, index=self.assets, columns=self.assets)
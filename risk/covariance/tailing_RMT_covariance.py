@@ -55,6 +55,7 @@ class TailingRMTCovarianceRiskModel(CovarianceMatrixRiskModel):
         super().__init__(universe = universe,
                          data_handler = data_handler,
                          ret_filter_op = _ret_filter,
+                         rolling_window = tailing_time_delta,
                          ret_corr_op= RMTFilteredCorrelation,
                          **kwargs
                          )
@@ -25,6 +25,7 @@ class TailingSampleCovarianceRiskModel(CovarianceMatrixRiskModel):
         super().__init__(universe = universe,
                          data_handler = data_handler,
                          ret_filter_op = _ret_filter,
+                         rolling_window = tailing_time_delta,
                          **kwargs
                         )
         self.tailing_time_delta = tailing_time_delta
@@ -5,6 +5,7 @@ import os
 
 
 TIMEZONE = pytz.timezone('America/New_York')
+TRADING_CALENDAR = 'NYSE'
 
 SUPPORTED = {
     'CURRENCIES': [
@@ -37,6 +38,13 @@ CSV_DIRECTORIES = {
 
 }
 
+#---| Columnar (Hive-partitioned Parquet) stores, one partition per symbol
+PARQUET_DIRECTORIES = {
+    'PRICE': {
+        'DAILY': "./parquet/price/daily",
+            },
+}
+
 #---| Primarily for Securities Master Database
 MYSQL_CREDENTIALS = {
             'user': 'YOUR USERNAME',
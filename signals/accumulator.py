@@ -0,0 +1,358 @@
+import numpy as np
+
+
+def _grown(array, size, fill):
+    """
+    array with its first axis grown to at least size, doubling it,
+    the new entries set to fill.
+    """
+    capacity = array.shape[0]
+    if size <= capacity:
+        return array
+    while capacity < size:
+        capacity *= 2
+    grown = np.full((capacity,) + array.shape[1:], fill, dtype=array.dtype)
+    grown[:array.shape[0]] = array
+    return grown
+
+
+def _gather(array, rows, fill):
+    """
+    array[rows], with fill for rows that are unknown (-1) or
+    beyond the end of array.
+    """
+    out = np.full(len(rows), fill, dtype=np.float64)
+    known = (rows >= 0) & (rows < array.shape[0])
+    out[known] = array[rows[known]]
+    return out
+
+
+class RollingMoments(object):
+    """
+    Streaming count, sum, mean and variance of the latest window
+    values of many rows (one per asset) at once.
+    Each append updates the statistics of every row in O(1): the
+    value leaving the window is removed and the new one added,
+    with Neumaier (Kahan) compensated sums and Welford updates of
+    the sum of squared deviations. Missing values (NaN) take their
+    slot in the window but are left out of the statistics, and
+    are counted separately. Every resync appends the statistics
+    are recomputed exactly from the window, bounding any drift.
+    Parameters
+    ----------
+    window : `int`
+        The number of latest values the statistics are over.
+    capacity : `int`, optional
+        The initial number of rows, grown as needed.
+    resync : `int`, optional
+        The number of appends between exact recomputations.
+    """
+
+    def __init__(self, window, capacity=16, resync=1024):
+        self.window = window
+        self.resync = resync
+        capacity = max(capacity, 1)
+        self._values = np.full((capacity, window), np.nan, dtype=np.float64)
+        self._filled = np.zeros(capacity, dtype=np.int64)
+        self._n = np.zeros(capacity, dtype=np.float64)
+        self._nans = np.zeros(capacity, dtype=np.float64)
+        self._sum = np.zeros(capacity, dtype=np.float64)
+        self._comp = np.zeros(capacity, dtype=np.float64)
+        self._m2 = np.zeros(capacity, dtype=np.float64)
+        self._appends = 0
+
+    def _reserve(self, size):
+        if size > self._n.shape[0]:
+            self._values = _grown(self._values, size, np.nan)
+            for name in ('_filled', '_n', '_nans', '_sum', '_comp', '_m2'):
+                setattr(self, name, _grown(getattr(self, name), size, 0))
+
+    def _accumulate(self, rows, values, sign):
+        """
+        Add (sign 1.0) or remove (sign -1.0) one value of each of rows.
+        """
+        n, s, c = self._n[rows], self._sum[rows], self._comp[rows]
+        new_n = n + sign
+        #---| Neumaier compensated s + c += sign * values
+        x = sign * values
+        t = s + x
+        c = c + np.where(np.abs(s) >= np.abs(x), (s - t) + x, (x - t) + s)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            mean = np.where(n > 0, (s + self._comp[rows]) / n, 0.0)
+            new_mean = np.where(new_n > 0, (t + c) / new_n, 0.0)
+        m2 = self._m2[rows] + sign * (values - mean) * (values - new_mean)
+        empty = new_n == 0
+        self._n[rows] = new_n
+        self._sum[rows] = np.where(empty, 0.0, t)
+        self._comp[rows] = np.where(empty, 0.0, c)
+        self._m2[rows] = np.where(empty, 0.0, np.maximum(m2, 0.0))
+
+    def append(self, rows, values):
+        """
+        Append one new value to each of rows.
+        Parameters
+        ----------
+        rows : `np.ndarray[int]`
+            The distinct rows to append to.
+        values : `np.ndarray[float]`
+            The new values, aligned with rows.
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        values = np.asarray(values, dtype=np.float64)
+        if len(rows) == 0:
+            return
+        self._reserve(int(rows.max()) + 1)
+        filled = self._filled[rows]
+        slots = filled % self.window
+        old = self._values[rows, slots]
+        full = filled >= self.window
+        old_missing = np.isnan(old)
+        leaving = full & ~old_missing
+        if leaving.any():
+            self._accumulate(rows[leaving], old[leaving], -1.0)
+        missing = np.isnan(values)
+        if not missing.all():
+            self._accumulate(rows[~missing], values[~missing], 1.0)
+        self._nans[rows] += missing.astype(np.float64) - (full & old_missing)
+        self._values[rows, slots] = values
+        self._filled[rows] = filled + 1
+        self._appends += 1
+        if self._appends % self.resync == 0:
+            self._recompute()
+
+    def load(self, rows, values):
+        """
+        Append a history of values to each of rows in one step,
+        keeping only the latest window of them.
+        Parameters
+        ----------
+        rows : `np.ndarray[int]`
+            The distinct rows to append to.
+        values : `np.ndarray[float]`
+            The values, shaped (number of values, len(rows)),
+            oldest first.
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        values = np.asarray(values, dtype=np.float64)
+        if len(rows) == 0 or len(values) == 0:
+            return
+        self._reserve(int(rows.max()) + 1)
+        if self._filled[rows].any():
+            for row_values in values:
+                self.append(rows, row_values)
+            return
+        count = len(values)
+        kept = np.arange(max(count - self.window, 0), count)
+        self._values[rows[:, None], kept % self.window] = values[kept].T
+        self._filled[rows] = count
+        self._recompute(rows)
+
+    def _recompute(self, rows=slice(None)):
+        """
+        Recompute the statistics of rows (every row by default)
+        exactly from their window.
+        """
+        values = self._values[rows]
+        held = np.arange(self.window) < np.minimum(self._filled[rows], self.window)[:, None]
+        missing = np.isnan(values)
+        valid = held & ~missing
+        n = valid.sum(axis=1).astype(np.float64)
+        total = np.where(valid, values, 0.0).sum(axis=1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            mean = np.where(n > 0, total / n, 0.0)
+        self._n[rows] = n
+        self._nans[rows] = (held & missing).sum(axis=1)
+        self._sum[rows] = total
+        self._comp[rows] = 0.0
+        self._m2[rows] = np.where(valid, (values - mean[:, None]) ** 2, 0.0).sum(axis=1)
+
+    def count(self, rows):
+        """
+        The number of non-missing values in the window of rows.
+        """
+        return _gather(self._n, rows, 0.0)
+
+    def missing(self, rows):
+        """
+        The number of missing values in the window of rows.
+        """
+        return _gather(self._nans, rows, 0.0)
+
+    def sum(self, rows):
+        """
+        The sum of the non-missing values in the window of rows.
+        """
+        return _gather(self._sum, rows, 0.0) + _gather(self._comp, rows, 0.0)
+
+    def mean(self, rows):
+        """
+        The mean of the non-missing values in the window of rows,
+        NaN for rows without any.
+        """
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return self.sum(rows) / self.count(rows)
+
+    def std(self, rows):
+        """
+        The (population) standard deviation of the non-missing
+        values in the window of rows, NaN for rows without any.
+        """
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.sqrt(_gather(self._m2, rows, 0.0) / self.count(rows))
+
+
+class RollingStatistics(object):
+    """
+    The RollingMoments of a stream of values over each of
+    several windows.
+    Parameters
+    ----------
+    windows : `list[int]`
+        The windows to keep statistics over.
+    capacity : `int`, optional
+        The initial number of rows, grown as needed.
+    """
+
+    def __init__(self, windows, capacity=16):
+        self.moments = {
+            window: RollingMoments(window, capacity=capacity)
+            for window in windows
+        }
+
+    def __getitem__(self, window):
+        if window not in self.moments:
+            raise ValueError(
+                'No rolling statistics are kept for lookback "%s", '
+                'only for %s.' % (window, sorted(self.moments))
+            )
+        return self.moments[window]
+
+    def append(self, rows, values):
+        """
+        Append one new value to each of rows, in every window.
+        """
+        for moments in self.moments.values():
+            moments.append(rows, values)
+
+    def load(self, rows, values):
+        """
+        Append a history of values, shaped (number of values,
+        len(rows)), to each of rows in one step, in every window.
+        """
+        for moments in self.moments.values():
+            moments.load(rows, values)
+
+
+class RollingReturns(RollingStatistics):
+    """
+    The RollingMoments of the returns of a stream of prices.
+    As with pd.Series.pct_change().dropna() over the latest window
+    + 1 prices, the returns of a window only use prices of that
+    window: a missing price carries the last price of the window
+    forward (a zero return), and returns up to the first price of
+    the window are left out. Once the last price before a run of
+    missing ones leaves the window, the returns it padded are
+    dropped from the statistics.
+    Parameters
+    ----------
+    windows : `list[int]`
+        The windows, in number of returns, to keep statistics over.
+    capacity : `int`, optional
+        The initial number of rows, grown as needed.
+    log : `Boolean`, optional
+        Whether to keep statistics of log returns rather than
+        simple returns.
+    """
+
+    def __init__(self, windows, capacity=16, log=False):
+        super().__init__(windows, capacity=capacity)
+        self.log = log
+        self.max_window = max(windows)
+        capacity = max(capacity, 1)
+        self._last = np.full(capacity, np.nan, dtype=np.float64)
+        self._last_at = np.full(capacity, -1, dtype=np.int64)
+        self._appended = np.zeros(capacity, dtype=np.int64)
+        #---| whether each of the latest max(windows) + 2 prices was there
+        self._priced = np.zeros((capacity, self.max_window + 2), dtype=bool)
+
+    def _reserve(self, size):
+        self._last = _grown(self._last, size, np.nan)
+        self._last_at = _grown(self._last_at, size, -1)
+        self._appended = _grown(self._appended, size, 0)
+        self._priced = _grown(self._priced, size, False)
+
+    def _was_priced(self, rows, at):
+        """
+        Whether the prices of rows appended at positions at were there,
+        False for positions before the first price.
+        """
+        size = self._priced.shape[1]
+        return (at >= 0) & self._priced[rows, at % size]
+
+    def _drop_unpadded(self, moments, rows, at):
+        """
+        Drop from moments the returns of rows padded by the price at
+        positions at - 1, which just left the window: every return of
+        the run of missing prices starting at positions at, and that
+        of the price ending it. Such rows are few, and recomputed
+        exactly.
+        """
+        window = moments.window
+        run = ~self._was_priced(rows, at)
+        for offset in range(1, window):
+            if not run.any():
+                break
+            moments._values[rows[run], (at[run] + offset) % window] = np.nan
+            run[run] = ~self._was_priced(rows[run], at[run] + offset)
+        moments._recompute(rows)
+
+    def append(self, rows, prices):
+        """
+        Append one new price to each of rows.
+        Parameters
+        ----------
+        rows : `np.ndarray[int]`
+            The distinct rows to append to.
+        prices : `np.ndarray[float]`
+            The new prices, aligned with rows.
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        prices = np.asarray(prices, dtype=np.float64)
+        if len(rows) == 0:
+            return
+        self._reserve(int(rows.max()) + 1)
+        at = self._appended[rows]
+        last, last_at = self._last[rows], self._last_at[rows]
+        missing = np.isnan(prices)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            returns = np.where(missing, np.where(np.isnan(last), np.nan, 0.0), prices / last - 1.0)
+        if self.log:
+            returns = np.log1p(returns)
+        self._priced[rows, at % self._priced.shape[1]] = ~missing
+        self._last[rows] = np.where(missing, last, prices)
+        self._last_at[rows] = np.where(missing, last_at, at)
+        self._appended[rows] = at + 1
+
+        for window, moments in self.moments.items():
+            #---| no price of the window before this one, no return
+            moments.append(rows, np.where(last_at >= at - window, returns, np.nan))
+            leaving = self._was_priced(rows, at - window - 1) & ~self._was_priced(rows, at - window)
+            if leaving.any():
+                self._drop_unpadded(moments, rows[leaving], (at - window)[leaving])
+
+    def load(self, rows, prices):
+        """
+        Append a history of prices to each of rows in one step.
+        Only the latest max(windows) + 1 prices are appended, as
+        returns only depend on prices of their window.
+        Parameters
+        ----------
+        rows : `np.ndarray[int]`
+            The distinct rows to append to.
+        prices : `np.ndarray[float]`
+            The prices, shaped (number of prices, len(rows)),
+            oldest first.
+        """
+        prices = np.asarray(prices, dtype=np.float64)
+        for bar_prices in prices[-(self.max_window + 1):]:
+            self.append(rows, bar_prices)
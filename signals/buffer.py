@@ -1,71 +1,66 @@
-from collections import deque
+import numpy as np
 
 
 class AssetPriceBuffers(object):
     """
-    Utility class to store double-ended queue ("deque")
-    based price buffers for usage in lookback-based
-    indicator calculations.
+    Utility class to store rolling price buffers for usage
+    in lookback-based indicator calculations.
+    All assets share a single 2-D circular buffer of one row
+    per asset and max(lookbacks) columns, with an asset -> row
+    index, so every price is stored once whatever the number
+    of lookbacks. Each price is written twice, at its slot and
+    max(lookbacks) columns further, which keeps the latest N
+    prices of an asset contiguous: lookback windows are views
+    into the buffer rather than copies.
     Parameters
     ----------
     assets : `list[str]`
         The list of assets to create price buffers for.
     lookbacks : `list[int]`, optional
         The number of lookback periods to store prices for.
+    capacity : `int`, optional
+        The initial number of asset rows, grown as needed.
     """
 
-    def __init__(self, assets, lookbacks=[12]):
-        self.assets = assets
+    def __init__(self, assets, lookbacks=[12], capacity=16):
+        self.assets = []
         self.lookbacks = lookbacks
-        self.prices = self._create_all_assets_prices_buffer_dict()
+        self.max_lookback = max(lookbacks)
+        self._row = {}
+        capacity = max(capacity, len(assets), 1)
+        self._data = np.full((capacity, 2 * self.max_lookback), np.nan, dtype=np.float64)
+        self._counts = np.zeros(capacity, dtype=np.int64)
+        for asset in assets:
+            self._add_row(asset)
 
-    @staticmethod
-    def _asset_lookback_key(asset, lookback):
+    def _add_row(self, asset):
         """
-        Create the buffer dictionary lookup key based
-        on asset name and lookback period.
-        Parameters
-        ----------
-        asset : `str`
-            The asset symbol name.
-        lookback : `int`
-            The lookback period.
+        Assign the next free row of the buffer to asset, doubling
+        the number of rows when they are all taken.
         Returns
         -------
-        `str`
-            The lookup key.
-        """
-        return '%s_%s' % (asset, lookback)
-
-    def _create_single_asset_prices_buffer_dict(self, asset):
+        `int`
+            The row of the asset.
         """
-        Creates a dictionary of asset-lookback pair
-        price buffers for a single asset.
-        Returns
-        -------
-        `dict{str: deque[float]}`
-            The price buffer dictionary.
-        """
-        return {
-            AssetPriceBuffers._asset_lookback_key(
-                asset, lookback
-            ): deque(maxlen=lookback)
-            for lookback in self.lookbacks
-        }
+        row = len(self.assets)
+        if row == self._data.shape[0]:
+            self._data = np.concatenate([self._data, np.full_like(self._data, np.nan)])
+            self._counts = np.concatenate([self._counts, np.zeros_like(self._counts)])
+        self._row[asset] = row
+        self.assets.append(asset)
+        return row
 
-    def _create_all_assets_prices_buffer_dict(self):
+    def _rows(self, assets):
         """
-        Creates a dictionary of asset-lookback pair
-        price buffers for all assets.
-        Returns
-        -------
-        `dict{str: deque[float]}`
-            The price buffer dictionary.
+        The rows of assets, adding a row for any asset that may have
+        been added to the universe subsequent to the beginning of the
+        backtest.
         """
-        prices = {}
-        for asset in self.assets:
-            prices.update(self._create_single_asset_prices_buffer_dict(asset))
-        return prices
+        row = self._row
+        return np.fromiter(
+            (row[a] if a in row else self._add_row(a) for a in assets),
+            dtype=np.int64, count=len(assets)
+        )
 
     def add_asset(self, asset):
         """
@@ -77,17 +72,17 @@ class AssetPriceBuffers(object):
         asset : `str`
             The asset symbol name.
         """
-        if asset in self.assets:
+        if asset in self._row:
             raise ValueError(
                 'Unable to add asset "%s" since it already '
                 'exists in this price buffer.' % asset
             )
         else:
-            self.prices.update(self._create_single_asset_prices_buffer_dict(asset))
+            self._add_row(asset)
 
     def append(self, asset, price):
         """
-        Append a new price onto the price deque for
+        Append a new price onto the price buffer for
         the specific asset provided.
         Parameters
         ----------
@@ -96,22 +91,121 @@ class AssetPriceBuffers(object):
         price : `float`
             The new price of the asset.
         """
-        if price <= 0.0:
+        self.append_prices([asset], [price])
+
+    def append_prices(self, assets, prices):
+        """
+        Append a new price onto the price buffers of
+        many assets in one step.
+        Parameters
+        ----------
+        assets : `list[str]`
+            The asset symbol names.
+        prices : `list[float]` or `np.ndarray`
+            The new prices, aligned with assets.
+        Returns
+        -------
+        `np.ndarray[int]`
+            The rows of assets in the buffer.
+        """
+        prices = np.asarray(prices, dtype=np.float64)
+        not_positive = prices <= 0.0
+        if not_positive.any():
+            i = int(np.argmax(not_positive))
             raise ValueError(
                 'Unable to append non-positive price of "%0.2f" '
-                'to metrics buffer for Asset "%s".' % (price, asset)
+                'to metrics buffer for Asset "%s".' % (prices[i], assets[i])
             )
+        rows = self._rows(assets)
+        slots = self._counts[rows] % self.max_lookback
+        self._data[rows, slots] = prices
+        self._data[rows, slots + self.max_lookback] = prices
+        self._counts[rows] += 1
+        return rows
 
-        # The asset may have been added to the universe subsequent
-        # to the beginning of the backtest and as such needs a
-        # newly created pricing buffer
-        asset_lookback_key = AssetPriceBuffers._asset_lookback_key(asset, self.lookbacks[0])
-        if asset_lookback_key not in self.prices:
-            self.prices.update(self._create_single_asset_prices_buffer_dict(asset))
-
-        for lookback in self.lookbacks:
-            self.prices[
-                AssetPriceBuffers._asset_lookback_key(
-                    asset, lookback
+    def load(self, assets, prices):
+        """
+        Append a history of prices onto the price buffers of
+        many assets in one step, keeping only the latest
+        max(lookbacks) of them.
+        Parameters
+        ----------
+        assets : `list[str]`
+            The asset symbol names.
+        prices : `np.ndarray`
+            The prices, shaped (number of prices, len(assets)),
+            oldest first.
+        Returns
+        -------
+        `np.ndarray[int]`
+            The rows of assets in the buffer.
+        """
+        prices = np.asarray(prices, dtype=np.float64)
+        rows = self._rows(assets)
+        if self._counts[rows].any():
+            for bar_prices in prices:
+                self.append_prices(assets, bar_prices)
+            return rows
+        not_positive = prices <= 0.0
+        if not_positive.any():
+            i = int(np.argmax(not_positive.any(axis=0)))
+            raise ValueError(
+                'Unable to append non-positive price of "%0.2f" '
+                'to metrics buffer for Asset "%s".' % (
+                    prices[not_positive[:, i], i][0], assets[i]
                 )
-            ].append(price)
\ No newline at end of file
+            )
+        count = len(prices)
+        kept = np.arange(max(count - self.max_lookback, 0), count)
+        slots = kept % self.max_lookback
+        self._data[rows[:, None], slots] = prices[kept].T
+        self._data[rows[:, None], slots + self.max_lookback] = prices[kept].T
+        self._counts[rows] = count
+        return rows
+
+    def rows(self, assets):
+        """
+        The rows of assets in the buffer, -1 for assets without one.
+        """
+        row = self._row
+        return np.fromiter(
+            (row.get(a, -1) for a in assets), dtype=np.int64, count=len(assets)
+        )
+
+    def count(self, asset):
+        """
+        The number of prices held for asset, at most max(lookbacks).
+        """
+        row = self._row.get(asset)
+        return 0 if row is None else min(int(self._counts[row]), self.max_lookback)
+
+    def window(self, asset, lookback):
+        """
+        The latest lookback prices of asset, oldest first, or
+        as many as have been appended if fewer.
+        The window is a read-only view into the buffer, only
+        valid until the next append.
+        Parameters
+        ----------
+        asset : `str`
+            The asset symbol name.
+        lookback : `int`
+            The lookback period, at most max(lookbacks).
+        Returns
+        -------
+        `np.ndarray`
+            The prices of the window.
+        """
+        if lookback > self.max_lookback:
+            raise ValueError(
+                'Lookback "%s" exceeds the maximum lookback "%s" '
+                'of this price buffer.' % (lookback, self.max_lookback)
+            )
+        row = self._row.get(asset)
+        if row is None:
+            return self._data[0, :0]
+        count = int(self._counts[row])
+        end = (count - 1) % self.max_lookback + 1 + self.max_lookback
+        window = self._data[row, end - min(count, lookback):end]
+        window.flags.writeable = False
+        return window
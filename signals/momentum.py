@@ -1,6 +1,6 @@
 import numpy as np
-import pandas as pd
 
+from qfengine.signals.accumulator import RollingReturns
 from qfengine.signals.signal import Signal
 
 
@@ -12,6 +12,8 @@ class MomentumSignal(Signal):
     If the number of available returns is less than the
     lookback parameter the momentum is calculated on
     this subset.
+    The momentum is kept as a running sum of log returns,
+    updated in O(1) per new price.
     Parameters
     ----------
     start_dt : `pd.Timestamp`
@@ -25,50 +27,41 @@ class MomentumSignal(Signal):
     def __init__(self, universe, lookbacks, start_dt = None):
         bumped_lookbacks = [lookback + 1 for lookback in lookbacks]
         super().__init__(start_dt, universe, bumped_lookbacks)
+        self.returns = RollingReturns(lookbacks, log=True)
 
-    @staticmethod
-    def _asset_lookback_key(asset, lookback):
-        """
-        Create the buffer dictionary lookup key based
-        on asset name and lookback period.
-        Parameters
-        ----------
-        asset : `str`
-            The asset symbol name.
-        lookback : `int`
-            The lookback period.
-        Returns
-        -------
-        `str`
-            The lookup key.
-        """
-        return '%s_%s' % (asset, lookback + 1)
+    def _accumulate(self, rows, prices):
+        self.returns.append(rows, prices)
+
+    def _warm_start(self, rows, prices):
+        self.returns.load(rows, prices)
 
-    def _cumulative_return(self, asset, lookback):
+    def _cumulative_returns(self, assets, lookback):
         """
         Calculate the cumulative returns for the provided
-        lookback period ('momentum') based on the price
-        buffers for a particular asset.
+        lookback period ('momentum') of many assets.
         Parameters
         ----------
-        asset : `str`
-            The asset symbol name.
+        assets : `list[str]`
+            The asset symbol names.
         lookback : `int`
             The lookback period.
         Returns
         -------
-        `float`
-            The cumulative return ('momentum') for the period.
+        `np.ndarray`
+            The cumulative returns ('momentum') for the period.
         """
-        series = pd.Series(
-            self.buffers.prices[MomentumSignal._asset_lookback_key(asset, lookback)]
+        moments = self.returns[lookback]
+        rows = self.buffers.rows(assets)
+        return np.where(
+            moments.count(rows) < 1, 0.0, np.expm1(moments.sum(rows))
         )
-        returns = series.pct_change().dropna().to_numpy()
 
-        if len(returns) < 1:
-            return 0.0
-        else:
-            return (np.cumprod(1.0 + np.array(returns)) - 1.0)[-1]
+    def values(self, assets, lookback):
+        """
+        Calculate the lookback-period momentum
+        for many assets at once.
+        """
+        return self._cumulative_returns(assets, lookback)
 
     def __call__(self, asset, lookback):
         """
@@ -85,4 +78,4 @@ class MomentumSignal(Signal):
         `float`
             The momentum for the period.
         """
-        return self._cumulative_return(asset, lookback)
\ No newline at end of file
+        return float(self._cumulative_returns([asset], lookback)[0])
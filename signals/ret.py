@@ -1,5 +1,6 @@
 import numpy as np
-import pandas as pd
+
+from qfengine.signals.accumulator import RollingReturns
 from qfengine.signals.signal import Signal
 
 
@@ -10,6 +11,8 @@ class AverageReturnsSignal(Signal):
     If the number of available returns is less than the
     lookback parameter the volatility is calculated on
     this subset.
+    The average is kept as running sums of the returns,
+    updated in O(1) per new price.
     Parameters
     ----------
     start_dt : `pd.Timestamp`
@@ -23,54 +26,39 @@ class AverageReturnsSignal(Signal):
     def __init__(self, universe, lookbacks, start_dt = None):
         bumped_lookbacks = [lookback + 1 for lookback in lookbacks]
         super().__init__(start_dt, universe, bumped_lookbacks)
+        self.returns = RollingReturns(lookbacks)
+
+    def _accumulate(self, rows, prices):
+        self.returns.append(rows, prices)
+
+    def _warm_start(self, rows, prices):
+        self.returns.load(rows, prices)
 
-    @staticmethod
-    def _asset_lookback_key(asset, lookback):
+    def _rets(self, assets, lookback):
         """
-        Create the buffer dictionary lookup key based
-        on asset name and lookback period.
+        Calculate the average returns for the provided
+        lookback period of many assets.
         Parameters
         ----------
-        asset : `str`
-            The asset symbol name.
+        assets : `list[str]`
+            The asset symbol names.
         lookback : `int`
             The lookback period.
         Returns
         -------
-        `str`
-            The lookup key.
+        `np.ndarray`
+            The average returns.
         """
-        return '%s_%s' % (asset, lookback + 1)
+        moments = self.returns[lookback]
+        rows = self.buffers.rows(assets)
+        return np.where(moments.count(rows) < 1, 0.0, moments.mean(rows))
 
-    def _ret(self, asset, lookback):
+    def values(self, assets, lookback):
         """
-        Calculate the volatility for the provided
-        lookback period based on the price buffers for a
-        particular asset.
-        Parameters
-        ----------
-        asset : `str`
-            The asset symbol name.
-        lookback : `int`
-            The lookback period.
-        Returns
-        -------
-        `float`
-            The annualised volatility of returns.
+        Calculate the average returns
+        for many assets at once.
         """
-        series = pd.Series(
-            self.buffers.prices[
-                AverageReturnsSignal._asset_lookback_key(
-                    asset, lookback
-                )
-            ]
-        )
-        returns = series.pct_change().dropna().to_numpy()
-
-        if len(returns) < 1:
-            return 0.0
-        else:
-            return np.mean(returns)
+        return self._rets(assets, lookback)
 
     def __call__(self, asset, lookback):
         """
@@ -87,7 +75,7 @@ class AverageReturnsSignal(Signal):
         `float`
             The annualised volatility of returns.
         """
-        return self._ret(asset, lookback)
+        return float(self._rets([asset], lookback)[0])
 
 class AnnualizedAverageReturnsSignal(Signal):
     """
@@ -96,6 +84,8 @@ class AnnualizedAverageReturnsSignal(Signal):
     If the number of available returns is less than the
     lookback parameter the volatility is calculated on
     this subset.
+    The average is kept as running sums of the returns,
+    updated in O(1) per new price.
     Parameters
     ----------
     start_dt : `pd.Timestamp`
@@ -109,54 +99,41 @@ class AnnualizedAverageReturnsSignal(Signal):
     def __init__(self, universe, lookbacks, start_dt = None):
         bumped_lookbacks = [lookback + 1 for lookback in lookbacks]
         super().__init__(start_dt, universe, bumped_lookbacks)
+        self.returns = RollingReturns(lookbacks)
 
-    @staticmethod
-    def _asset_lookback_key(asset, lookback):
-        """
-        Create the buffer dictionary lookup key based
-        on asset name and lookback period.
-        Parameters
-        ----------
-        asset : `str`
-            The asset symbol name.
-        lookback : `int`
-            The lookback period.
-        Returns
-        -------
-        `str`
-            The lookup key.
-        """
-        return '%s_%s' % (asset, lookback + 1)
+    def _accumulate(self, rows, prices):
+        self.returns.append(rows, prices)
 
-    def _annualised_ret(self, asset, lookback):
+    def _warm_start(self, rows, prices):
+        self.returns.load(rows, prices)
+
+    def _annualised_rets(self, assets, lookback):
         """
-        Calculate the annualised volatility for the provided
-        lookback period based on the price buffers for a
-        particular asset.
+        Calculate the annualised average returns for the
+        provided lookback period of many assets.
         Parameters
         ----------
-        asset : `str`
-            The asset symbol name.
+        assets : `list[str]`
+            The asset symbol names.
         lookback : `int`
             The lookback period.
         Returns
         -------
-        `float`
-            The annualised volatility of returns.
+        `np.ndarray`
+            The annualised average returns.
         """
-        series = pd.Series(
-            self.buffers.prices[
-                AnnualizedAverageReturnsSignal._asset_lookback_key(
-                    asset, lookback
-                )
-            ]
+        moments = self.returns[lookback]
+        rows = self.buffers.rows(assets)
+        return np.where(
+            moments.count(rows) < 1, 0.0, moments.mean(rows) * 252
         )
-        returns = series.pct_change().dropna().to_numpy()
 
-        if len(returns) < 1:
-            return 0.0
-        else:
-            return np.mean(returns) * 252
+    def values(self, assets, lookback):
+        """
+        Calculate the annualised average returns
+        for many assets at once.
+        """
+        return self._annualised_rets(assets, lookback)
 
     def __call__(self, asset, lookback):
         """
@@ -173,6 +150,4 @@ class AnnualizedAverageReturnsSignal(Signal):
         `float`
             The annualised volatility of returns.
         """
-        return self._annualised_ret(asset, lookback)
-
-        
\ No newline at end of file
+        return float(self._annualised_rets([asset], lookback)[0])
@@ -1,12 +1,14 @@
 from abc import ABCMeta, abstractmethod
 
+import numpy as np
+
 from qfengine.signals.buffer import AssetPriceBuffers
 
 
 class Signal(object):
     """
     Abstract class to provide historical price range-based
-    rolling signals utilising deque-based 'buffers'.
+    rolling signals utilising shared NumPy price 'buffers'.
     Parameters
     ----------
     start_dt : `pd.Timestamp`
@@ -49,7 +51,72 @@ class Signal(object):
         price : `float`
             The new price of the asset.
         """
-        self.buffers.append(asset, price)
+        self.append_prices([price], [asset])
+
+    def append_prices(self, prices, assets=None):
+        """
+        Append a new price onto the price buffers of many
+        assets in one step.
+        Parameters
+        ----------
+        prices : `list[float]` or `np.ndarray`
+            The new prices, aligned with assets.
+        assets : `list[str]`, optional
+            The asset symbol names, defaulting to the assets
+            of the signal.
+        """
+        prices = np.asarray(prices, dtype=np.float64)
+        rows = self.buffers.append_prices(
+            self.assets if assets is None else assets, prices
+        )
+        self._accumulate(rows, prices)
+
+    def warm_start(self, prices, assets=None):
+        """
+        Initialise the price buffers (and any streaming statistics)
+        from a history of prices in one step, instead of appending
+        them bar by bar.
+        Parameters
+        ----------
+        prices : `np.ndarray` or `pd.DataFrame`
+            The prices, shaped (number of bars, number of assets),
+            oldest first.
+        assets : `list[str]`, optional
+            The asset symbol names of the columns, defaulting to
+            the assets of the signal.
+        """
+        prices = np.asarray(prices, dtype=np.float64)
+        if prices.ndim != 2:
+            raise ValueError(
+                'Unable to warm start signal from prices of shape %s, '
+                'expected (bars, assets).' % (prices.shape,)
+            )
+        rows = self.buffers.load(
+            self.assets if assets is None else assets, prices
+        )
+        self._warm_start(rows, prices)
+
+    def _warm_start(self, rows, prices):
+        """
+        Update any streaming statistics of the signal with a
+        history of prices, shaped (number of bars, len(rows)),
+        once they are in the price buffers.
+        """
+        for bar_prices in prices:
+            self._accumulate(rows, bar_prices)
+
+    def _accumulate(self, rows, prices):
+        """
+        Update any streaming statistics of the signal with new
+        prices, once they are in the price buffers.
+        Parameters
+        ----------
+        rows : `np.ndarray[int]`
+            The price buffer rows of the assets.
+        prices : `np.ndarray`
+            The new prices, aligned with rows.
+        """
+        pass
 
     def update_assets(self, dt):
         """
@@ -71,4 +138,22 @@ class Signal(object):
     def __call__(self, asset, lookback):
         raise NotImplementedError(
             "Should implement __call__()"
+        )
+
+    def values(self, assets, lookback):
+        """
+        Calculate the signal of many assets at once.
+        Parameters
+        ----------
+        assets : `list[str]`
+            The asset symbol names.
+        lookback : `int`
+            The lookback period.
+        Returns
+        -------
+        `np.ndarray`
+            The signal values, aligned with assets.
+        """
+        return np.array(
+            [self(asset, lookback) for asset in assets], dtype=np.float64
         )
\ No newline at end of file
@@ -1,3 +1,7 @@
+import numpy as np
+import pandas as pd
+
+
 class SignalsCollection(object):
     """
     Provides a mechanism for aggregating all signals
@@ -6,6 +10,10 @@ class SignalsCollection(object):
     if a DynamicUniverse is utilised.
     Ensures each signal receives a new data point at the
     appropriate simulation iteration rate.
+    Cross sections of a signal over all its assets are memoised
+    per (signal, lookback, dt) until the next update, so several
+    alpha and risk models reading the same signal on the same
+    bar share a single evaluation.
     Parameters
     ----------
     signals : `dict{str: Signal}`
@@ -18,6 +26,8 @@ class SignalsCollection(object):
         self.signals = signals
         self.data_handler = data_handler
         self.warmup = 0  # Used for 'burn in'
+        self.dt = None
+        self._cross_sections = {}
 
     def __getitem__(self, signal):
         """
@@ -42,15 +52,97 @@ class SignalsCollection(object):
         dt : `pd.Timestamp`
             The time at which the signals are to be updated for.
         """
+        self.dt = dt
+        self._cross_sections = {}
+
         # Ensure any new assets in a DynamicUniverse
         # are added to the signal
         for name, signal in self.signals.items():
             self.signals[name].update_assets(dt)
 
+        # Price every asset of every signal once, in a single lookup
+        assets = {}
+        for name, signal in self.signals.items():
+            for asset in signal.assets:
+                assets[asset] = None
+        column = {asset: i for i, asset in enumerate(assets)}
+        prices = np.asarray(
+            self.data_handler.get_assets_latest_mid_prices(dt, list(assets)),
+            dtype=np.float64
+        )
+
         # Update all of the signals with new prices
         for name, signal in self.signals.items():
-            assets = signal.assets
-            for asset in assets:
-                price = self.data_handler.get_asset_latest_mid_price(dt, asset)
-                self.signals[name].append(asset, price)
-        self.warmup += 1
\ No newline at end of file
+            self.signals[name].append_prices(
+                prices[[column[asset] for asset in signal.assets]]
+            )
+        self.warmup += 1
+
+    def warm_start(self, dt):
+        """
+        Initialise every signal from the historical closes of its
+        assets before dt, in one lookup and one vectorised step per
+        signal, instead of replaying a burn in period bar by bar.
+        Parameters
+        ----------
+        dt : `pd.Timestamp`
+            The time the signals are warmed up to, usually the
+            start of the backtest. A close on dt is left to the
+            first update unless the market has closed by dt.
+        """
+        for name, signal in self.signals.items():
+            self.signals[name].update_assets(dt)
+
+        assets = {}
+        for name, signal in self.signals.items():
+            for asset in signal.assets:
+                assets[asset] = None
+        assets = list(assets)
+        if len(assets) == 0:
+            return
+        closes = self.data_handler.get_assets_historical_closes(
+            assets, end_dt=dt
+        ).reindex(columns=assets).astype(np.float64)
+        for name, signal in self.signals.items():
+            lookback = signal.buffers.max_lookback
+            self.signals[name].warm_start(
+                closes[signal.assets].iloc[-lookback:].to_numpy(dtype=np.float64)
+            )
+        self.warmup += len(closes)
+        self._cross_sections = {}
+
+    def cross_section(self, signal, lookback, dt=None):
+        """
+        The signal for every asset of its universe, in one
+        vectorised evaluation, memoised until the next update.
+        Parameters
+        ----------
+        signal : `str`
+            The signal string.
+        lookback : `int`
+            The lookback period.
+        dt : `pd.Timestamp`, optional
+            The time of the cross section, defaulting to the time
+            of the latest update.
+        Returns
+        -------
+        `pd.Series`
+            The signal values indexed by asset. The Series is
+            shared by all callers until the next update and should
+            not be modified.
+        """
+        dt = self.dt if dt is None else dt
+        key = (signal, lookback, dt)
+        cross_section = self._cross_sections.get(key)
+        if cross_section is None:
+            cross_section = self._cross_sections[key] = self._compute_cross_section(
+                signal, lookback, dt
+            )
+        return cross_section
+
+    def _compute_cross_section(self, signal, lookback, dt):
+        signal = self.signals[signal]
+        assets = signal.assets if dt is None else signal.universe.get_assets(dt)
+        return pd.Series(
+            signal.values(assets, lookback), index=pd.Index(assets, name='asset')
+        )
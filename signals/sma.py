@@ -1,5 +1,6 @@
 import numpy as np
 
+from qfengine.signals.accumulator import RollingStatistics
 from qfengine.signals.signal import Signal
 
 
@@ -7,6 +8,8 @@ class SMASignal(Signal):
     """
     Indicator class to calculate simple moving average
     of last N periods for a set of prices.
+    The averages are kept as running sums, updated in O(1)
+    per new price.
     Parameters
     ----------
     start_dt : `pd.Timestamp`
@@ -19,24 +22,43 @@ class SMASignal(Signal):
 
     def __init__(self, universe, lookbacks, start_dt = None):
         super().__init__(start_dt, universe, lookbacks)
+        self.statistics = RollingStatistics(lookbacks)
 
-    def _simple_moving_average(self, asset, lookback):
+    def _accumulate(self, rows, prices):
+        self.statistics.append(rows, prices)
+
+    def _warm_start(self, rows, prices):
+        self.statistics.load(rows, prices)
+
+    def _simple_moving_averages(self, assets, lookback):
         """
         Calculate the 'trend' for the provided lookback
         period based on the simple moving average of the
-        price buffers for a particular asset.
+        prices of many assets.
         Parameters
         ----------
-        asset : `str`
-            The asset symbol name.
+        assets : `list[str]`
+            The asset symbol names.
         lookback : `int`
             The lookback period.
         Returns
         -------
-        `float`
-            The SMA value ('trend') for the period.
+        `np.ndarray`
+            The SMA values ('trend') for the period, NaN
+            while a price in the period is missing.
+        """
+        moments = self.statistics[lookback]
+        rows = self.buffers.rows(assets)
+        return np.where(
+            moments.missing(rows) > 0, np.nan, moments.mean(rows)
+        )
+
+    def values(self, assets, lookback):
+        """
+        Calculate the lookback-period trend
+        for many assets at once.
         """
-        return np.mean(self.buffers.prices['%s_%s' % (asset, lookback)])
+        return self._simple_moving_averages(assets, lookback)
 
     def __call__(self, asset, lookback):
         """
@@ -53,4 +75,4 @@ class SMASignal(Signal):
         `float`
             The trend (SMA) for the period.
         """
-        return self._simple_moving_average(asset, lookback)
\ No newline at end of file
+        return float(self._simple_moving_averages([asset], lookback)[0])
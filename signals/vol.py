@@ -1,6 +1,6 @@
 import numpy as np
-import pandas as pd
 
+from qfengine.signals.accumulator import RollingReturns
 from qfengine.signals.signal import Signal
 
 
@@ -11,6 +11,8 @@ class VolatilitySignal(Signal):
     If the number of available returns is less than the
     lookback parameter the volatility is calculated on
     this subset.
+    The volatility is kept as running moments of the
+    returns, updated in O(1) per new price.
     Parameters
     ----------
     start_dt : `pd.Timestamp`
@@ -24,54 +26,39 @@ class VolatilitySignal(Signal):
     def __init__(self, universe, lookbacks, start_dt = None):
         bumped_lookbacks = [lookback + 1 for lookback in lookbacks]
         super().__init__(start_dt, universe, bumped_lookbacks)
+        self.returns = RollingReturns(lookbacks)
 
-    @staticmethod
-    def _asset_lookback_key(asset, lookback):
-        """
-        Create the buffer dictionary lookup key based
-        on asset name and lookback period.
-        Parameters
-        ----------
-        asset : `str`
-            The asset symbol name.
-        lookback : `int`
-            The lookback period.
-        Returns
-        -------
-        `str`
-            The lookup key.
-        """
-        return '%s_%s' % (asset, lookback + 1)
+    def _accumulate(self, rows, prices):
+        self.returns.append(rows, prices)
+
+    def _warm_start(self, rows, prices):
+        self.returns.load(rows, prices)
 
-    def _vol(self, asset, lookback):
+    def _vols(self, assets, lookback):
         """
         Calculate the volatility for the provided
-        lookback period based on the price buffers for a
-        particular asset.
+        lookback period of many assets.
         Parameters
         ----------
-        asset : `str`
-            The asset symbol name.
+        assets : `list[str]`
+            The asset symbol names.
         lookback : `int`
             The lookback period.
         Returns
         -------
-        `float`
-            The annualised volatility of returns.
+        `np.ndarray`
+            The volatility of returns.
         """
-        series = pd.Series(
-            self.buffers.prices[
-                VolatilitySignal._asset_lookback_key(
-                    asset, lookback
-                )
-            ]
-        )
-        returns = series.pct_change().dropna().to_numpy()
+        moments = self.returns[lookback]
+        rows = self.buffers.rows(assets)
+        return np.where(moments.count(rows) < 1, 0.0, moments.std(rows))
 
-        if len(returns) < 1:
-            return 0.0
-        else:
-            return np.std(returns)
+    def values(self, assets, lookback):
+        """
+        Calculate the volatility of returns
+        for many assets at once.
+        """
+        return self._vols(assets, lookback)
 
     def __call__(self, asset, lookback):
         """
@@ -88,7 +75,7 @@ class VolatilitySignal(Signal):
         `float`
             The annualised volatility of returns.
         """
-        return self._vol(asset, lookback)
+        return float(self._vols([asset], lookback)[0])
 
 class AnnualizedVolatilitySignal(Signal):
     """
@@ -97,6 +84,8 @@ class AnnualizedVolatilitySignal(Signal):
     If the number of available returns is less than the
     lookback parameter the volatility is calculated on
     this subset.
+    The volatility is kept as running moments of the
+    returns, updated in O(1) per new price.
     Parameters
     ----------
     start_dt : `pd.Timestamp`
@@ -110,54 +99,41 @@ class AnnualizedVolatilitySignal(Signal):
     def __init__(self, start_dt, universe, lookbacks):
         bumped_lookbacks = [lookback + 1 for lookback in lookbacks]
         super().__init__(start_dt, universe, bumped_lookbacks)
+        self.returns = RollingReturns(lookbacks)
 
-    @staticmethod
-    def _asset_lookback_key(asset, lookback):
-        """
-        Create the buffer dictionary lookup key based
-        on asset name and lookback period.
-        Parameters
-        ----------
-        asset : `str`
-            The asset symbol name.
-        lookback : `int`
-            The lookback period.
-        Returns
-        -------
-        `str`
-            The lookup key.
-        """
-        return '%s_%s' % (asset, lookback + 1)
+    def _accumulate(self, rows, prices):
+        self.returns.append(rows, prices)
+
+    def _warm_start(self, rows, prices):
+        self.returns.load(rows, prices)
 
-    def _annualised_vol(self, asset, lookback):
+    def _annualised_vols(self, assets, lookback):
         """
         Calculate the annualised volatility for the provided
-        lookback period based on the price buffers for a
-        particular asset.
+        lookback period of many assets.
         Parameters
         ----------
-        asset : `str`
-            The asset symbol name.
+        assets : `list[str]`
+            The asset symbol names.
         lookback : `int`
             The lookback period.
         Returns
         -------
-        `float`
+        `np.ndarray`
             The annualised volatility of returns.
         """
-        series = pd.Series(
-            self.buffers.prices[
-                VolatilitySignal._asset_lookback_key(
-                    asset, lookback
-                )
-            ]
+        moments = self.returns[lookback]
+        rows = self.buffers.rows(assets)
+        return np.where(
+            moments.count(rows) < 1, 0.0, moments.std(rows) * np.sqrt(252)
         )
-        returns = series.pct_change().dropna().to_numpy()
 
-        if len(returns) < 1:
-            return 0.0
-        else:
-            return np.std(returns) * np.sqrt(252)
+    def values(self, assets, lookback):
+        """
+        Calculate the annualised volatility of
+        returns for many assets at once.
+        """
+        return self._annualised_vols(assets, lookback)
 
     def __call__(self, asset, lookback):
         """
@@ -174,6 +150,4 @@ class AnnualizedVolatilitySignal(Signal):
         `float`
             The annualised volatility of returns.
         """
-        return self._annualised_vol(asset, lookback)
-
-        
\ No newline at end of file
+        return float(self._annualised_vols([asset], lookback)[0])
@@ -1,8 +1,8 @@
 import datetime
 
 import pandas as pd
-from pandas.tseries.offsets import BDay
 from qfengine import settings
+from qfengine.exchange.calendar import as_trading_calendar
 
 from qfengine.simulation.simulation_engine import SimulationEngine
 from qfengine.simulation.simulation_event import SimulationEvent
@@ -11,11 +11,8 @@ from qfengine.simulation.simulation_event import SimulationEvent
 class DailyBusinessDaySimulationEngine(SimulationEngine):
     """
     A SimulationEngine subclass that generates events on a daily
-    frequency defaulting to typical business days, that is
-    Monday-Friday.
-    In particular it does not take into account any specific
-    regional holidays, such as Federal Holidays in the USA or
-    Bank Holidays in the UK.
+    frequency for every trading session of an exchange calendar,
+    skipping weekends and exchange holidays.
     It produces a pre-market event, a market open event,
     a market closing event and a post-market event for every day
     between the starting and ending dates.
@@ -29,6 +26,9 @@ class DailyBusinessDaySimulationEngine(SimulationEngine):
         Whether to include a pre-market event
     post_market : `Boolean`, optional
         Whether to include a post-market event
+    trading_calendar : `TradingCalendar` or `str`, optional
+        The trading calendar (or its name) defining the sessions,
+        defaulting to settings.TRADING_CALENDAR.
     """
 
     def __init__(self,
@@ -36,6 +36,7 @@ class DailyBusinessDaySimulationEngine(SimulationEngine):
                  ending_day,
                  pre_market=True,
                  post_market=True,
+                 trading_calendar=None,
                  **kwargs
     ):
         if ending_day < starting_day:
@@ -49,21 +50,21 @@ class DailyBusinessDaySimulationEngine(SimulationEngine):
         self.ending_day = ending_day
         self.pre_market = pre_market
         self.post_market = post_market
+        self.calendar = as_trading_calendar(trading_calendar)
         self.business_days = self._generate_business_days()
 
     def _generate_business_days(self):
         """
-        Generate the list of business days using midnight EDT as
-        the timestamp.
+        Generate the list of trading session days using midnight
+        as the timestamp.
         Returns
         -------
-        `list[pd.Timestamp]`
-            The business day range list.
+        `pd.DatetimeIndex`
+            The trading session day range.
         """
-        days = pd.date_range(
-            self.starting_day, self.ending_day, freq=BDay()
+        return self.calendar.sessions_in_range(
+            self.starting_day, self.ending_day
         )
-        return days
 
     def __iter__(self):
         """
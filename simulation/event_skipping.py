@@ -0,0 +1,128 @@
+import numpy as np
+import pandas as pd
+from qfengine import settings
+
+from qfengine.simulation.daily_bday import DailyBusinessDaySimulationEngine
+from qfengine.simulation.simulation_event import SimulationEvent
+
+
+class EventSkippingSimulationEngine(DailyBusinessDaySimulationEngine):
+    """
+    A DailyBusinessDaySimulationEngine that only yields the events
+    at which some component of a backtest acts, instead of all four
+    daily events.
+    The emitted stream is the sorted merge of:
+        - every event of a sampled type (market closes by default,
+          where the equity curve is sampled and signals are updated),
+        - every rebalance timestamp that falls on the daily timeline,
+        - the first event after each rebalance at which the exchange
+          is open, where the broker fills the rebalance orders.
+    Rebalances are registered with schedule_rebalances() once the
+    quant trading system has produced its schedule. Until then only
+    the sampled events are yielded.
+    Parameters
+    ----------
+    starting_day : `pd.Timestamp`
+        The starting day of the simulation.
+    ending_day : `pd.Timestamp`
+        The ending day of the simulation.
+    sample_event_types : `tuple[str]`, optional
+        The event types that are always yielded.
+    pre_market : `Boolean`, optional
+        Whether the daily timeline includes a pre-market event
+    post_market : `Boolean`, optional
+        Whether the daily timeline includes a post-market event
+    trading_calendar : `TradingCalendar` or `str`, optional
+        The trading calendar (or its name) defining the sessions.
+    """
+
+    event_offsets = {
+        'pre_market': pd.Timedelta(hours=0),
+        'market_open': pd.Timedelta(hours=9, minutes=30),
+        'market_close': pd.Timedelta(hours=16),
+        'post_market': pd.Timedelta(hours=23, minutes=59),
+    }
+
+    def __init__(self,
+                 starting_day,
+                 ending_day,
+                 sample_event_types=('market_close',),
+                 pre_market=True,
+                 post_market=True,
+                 trading_calendar=None,
+                 **kwargs
+    ):
+        super().__init__(
+            starting_day, ending_day,
+            pre_market=pre_market, post_market=post_market,
+            trading_calendar=trading_calendar
+        )
+        self.sample_event_types = tuple(sample_event_types)
+        self.timestamps, self.event_types = self._generate_timeline()
+        self.emitted = np.isin(self.event_types, self.sample_event_types)
+
+    def _generate_timeline(self):
+        """
+        Generate the full sorted daily timeline of the
+        DailyBusinessDaySimulationEngine at once.
+        Returns
+        -------
+        `tuple(pd.DatetimeIndex, np.ndarray)`
+            The event timestamps and their event types.
+        """
+        event_types = [
+            e for e in self.event_offsets
+            if (e != 'pre_market' or self.pre_market)
+            and (e != 'post_market' or self.post_market)
+        ]
+        days = pd.DatetimeIndex(self.business_days).normalize()
+        if days.tz is not None:
+            days = days.tz_localize(None)
+        offsets = np.array(
+            [self.event_offsets[e].value for e in event_types], dtype=np.int64
+        )
+        stamps = (days.asi8[:, None] + offsets[None, :]).reshape(-1)
+        timestamps = pd.DatetimeIndex(stamps).tz_localize(settings.TIMEZONE)
+        types = np.tile(np.array(event_types, dtype=object), len(days))
+        return timestamps, types
+
+    def schedule_rebalances(self, rebalance_schedule, exchange=None):
+        """
+        Add the rebalance timestamps, and the order fill event after
+        each of them, to the emitted events.
+        Parameters
+        ----------
+        rebalance_schedule : `list[pd.Timestamp]`
+            The rebalance timestamps of the quant trading system.
+        exchange : `Exchange`, optional
+            The exchange the orders are filled on. Without it, orders
+            are assumed to fill at the next market open.
+        """
+        if len(rebalance_schedule) == 0:
+            return
+        rebalances = pd.DatetimeIndex(rebalance_schedule)
+        if rebalances.tz is None:
+            rebalances = rebalances.tz_localize(settings.TIMEZONE)
+        is_rebalance = np.isin(self.timestamps.asi8, rebalances.asi8)
+        self.emitted |= is_rebalance
+
+        for i in np.flatnonzero(is_rebalance):
+            for j in range(i + 1, len(self.timestamps)):
+                if exchange is None:
+                    is_fill = self.event_types[j] == 'market_open'
+                else:
+                    is_fill = exchange.is_open_at_datetime(self.timestamps[j])
+                if is_fill:
+                    self.emitted[j] = True
+                    break
+
+    def __iter__(self):
+        """
+        Yield the emitted events of the daily timeline.
+        Yields
+        ------
+        `SimulationEvent`
+            Market time simulation event to yield
+        """
+        for i in np.flatnonzero(self.emitted):
+            yield SimulationEvent(self.timestamps[i], event_type=self.event_types[i])
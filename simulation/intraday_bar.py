@@ -0,0 +1,116 @@
+import numpy as np
+import pandas as pd
+from qfengine import settings
+
+from qfengine.exchange.calendar import as_trading_calendar
+from qfengine.simulation.simulation_engine import SimulationEngine
+from qfengine.simulation.simulation_event import SimulationEvent
+
+
+class IntradayBarSimulationEngine(SimulationEngine):
+    """
+    A SimulationEngine subclass that generates intraday bar close
+    events at a fixed frequency within the trading sessions of an
+    exchange calendar.
+    For every session it produces a pre-market event, a market
+    open event, a bar close event every bar_length after the open,
+    a market close event at the (possibly early) session close and
+    a post-market event. The whole timeline is computed up front as
+    int64 arrays, so iterating costs one Timestamp per event.
+    Parameters
+    ----------
+    starting_day : `pd.Timestamp`
+        The starting day of the simulation.
+    ending_day : `pd.Timestamp`
+        The ending day of the simulation.
+    bar_length : `str` or `pd.Timedelta`, optional
+        The spacing of the bar close events, defaulting to one minute.
+    pre_market : `Boolean`, optional
+        Whether to include a pre-market event
+    post_market : `Boolean`, optional
+        Whether to include a post-market event
+    trading_calendar : `TradingCalendar` or `str`, optional
+        The trading calendar (or its name) defining the sessions,
+        defaulting to settings.TRADING_CALENDAR.
+    """
+
+    event_types = np.array(
+        ['pre_market', 'market_open', 'bar_close', 'market_close', 'post_market'],
+        dtype=object
+    )
+
+    def __init__(self,
+                 starting_day,
+                 ending_day,
+                 bar_length='1min',
+                 pre_market=True,
+                 post_market=True,
+                 trading_calendar=None,
+                 **kwargs
+    ):
+        if ending_day < starting_day:
+            raise ValueError(
+                "Ending date time %s is earlier than starting date time %s. "
+                "Cannot create IntradayBarSimulationEngine "
+                "instance." % (ending_day, starting_day)
+            )
+
+        self.starting_day = starting_day
+        self.ending_day = ending_day
+        self.bar_length = pd.Timedelta(bar_length)
+        self.pre_market = pre_market
+        self.post_market = post_market
+        self.calendar = as_trading_calendar(trading_calendar)
+        self.timestamps, self.event_codes = self._generate_timeline()
+
+    def _generate_timeline(self):
+        """
+        Generate the sorted event timestamps (int64 ns, UTC) and
+        event type codes (indices into event_types) of all sessions.
+        Returns
+        -------
+        `tuple(np.ndarray, np.ndarray)`
+            The event timestamps and event type codes.
+        """
+        opens, closes = self.calendar.session_bounds_in_range(
+            self.starting_day, self.ending_day
+        )
+        step = self.bar_length.value
+        #---| bar closes strictly inside (open, close), the close itself is market_close
+        n_bars = np.maximum((closes - opens - 1) // step, 0)
+        bar_session = np.repeat(np.arange(len(opens)), n_bars)
+        bar_number = np.arange(len(bar_session)) - np.repeat(np.cumsum(n_bars) - n_bars, n_bars) + 1
+        bars = opens[bar_session] + bar_number * step
+
+        days = pd.DatetimeIndex(opens).tz_localize('UTC').tz_convert(
+            settings.TIMEZONE
+        ).tz_localize(None).normalize()
+
+        stamps = [opens, bars, closes]
+        codes = [np.full(len(opens), 1), np.full(len(bars), 2), np.full(len(closes), 3)]
+        if self.pre_market:
+            stamps.append(days.tz_localize(settings.TIMEZONE).asi8)
+            codes.append(np.full(len(opens), 0))
+        if self.post_market:
+            stamps.append((days + pd.Timedelta(hours=23, minutes=59)).tz_localize(settings.TIMEZONE).asi8)
+            codes.append(np.full(len(opens), 4))
+        stamps = np.concatenate(stamps)
+        codes = np.concatenate(codes)
+        order = np.argsort(stamps, kind='stable')
+        return stamps[order], codes[order]
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    def __iter__(self):
+        """
+        Generate the intraday timestamps and event information.
+        Yields
+        ------
+        `SimulationEvent`
+            Market time simulation event to yield
+        """
+        index = pd.DatetimeIndex(self.timestamps).tz_localize('UTC').tz_convert(settings.TIMEZONE)
+        event_types = self.event_types[self.event_codes]
+        for ts, event_type in zip(index, event_types):
+            yield SimulationEvent(ts, event_type=event_type)
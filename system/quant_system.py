@@ -13,7 +13,7 @@ from qfengine.portfolio.construction.order_sizer import (
                                 LongShortLeveragedOrderSizer
 )
 from qfengine.system.rebalance.rebalance_handler import RebalanceHandler
-from qfengine import settings
+from qfengine.tracing import as_tracer
 
 #--| For Default Alpha & Optimizer 
 #       : Straight forward fixed allocation, primarily for benchmark purpose 
@@ -58,6 +58,8 @@ class QuantTradingSystem(object):
         long/short leveraged portfolios. Defaults to long/short leveraged.
     submit_orders : `Boolean`, optional
         Whether to actually submit generated orders. Defaults to no submission.
+    tracer : `Tracer`, optional
+        The tracer of the trading system events.
     """
 
     def __init__(
@@ -68,6 +70,7 @@ class QuantTradingSystem(object):
         data_handler,
             long_only:bool = False,
             submit_orders:bool = False,
+            tracer = None,
             **kwargs
     ):
         #!--| INTERACTIVE COMPONENTS - ESSENTIAL INHERITANCES FOR A QUANT SYSTEM
@@ -75,6 +78,7 @@ class QuantTradingSystem(object):
         self.universe = universe # Strategy Universe
         self.broker = broker # Broker has its own universe -> can be the same as Strategy's
         self.broker_portfolio_id = broker_portfolio_id
+        self.tracer = as_tracer(tracer)
 
         #!---| BUILDING PORTFOLIO CONSTRUCTION MODEL w/ QUANT MODELS (alpha, risk, optimizer, cost, etc...)
         """
@@ -91,6 +95,7 @@ class QuantTradingSystem(object):
                                                     optimizer = self.optimizer,
                                                     alpha_model = self.alpha_model,
                                                     risk_model = self.risk_model,
+                                                    tracer = self.tracer,
                                                         **self._interactive_components
                                                                 )
 
@@ -105,6 +110,7 @@ class QuantTradingSystem(object):
         
         #!---| REBALANCING SCHEDULE
         self.rebalance_schedule = self._init_rebalance_event_times(**kwargs)
+        self._rebalance_dts = set(self.rebalance_schedule)
     
     @property
     def _interactive_components(self):
@@ -115,6 +121,25 @@ class QuantTradingSystem(object):
             'broker_portfolio_id': self.broker_portfolio_id
         }
 
+    def set_tracer(self, tracer):
+        """
+        Trace the trading system and its portfolio construction
+        with another tracer.
+        """
+        self.tracer = tracer
+        self.portfolio_construction_model.tracer = tracer
+
+    def instrument(self, profiler):
+        """
+        Time the portfolio construction, its quant models and the
+        order execution with a Profiler, until profiler.restore().
+        """
+        pcm = self.portfolio_construction_model
+        for name in ('alpha_model', 'risk_model', 'optimiser', 'order_sizer'):
+            profiler.instrument_callable(pcm, name, 'qts.' + name)
+        profiler.instrument_callable(self, 'portfolio_construction_model', 'qts.portfolio_construction')
+        profiler.instrument_callable(self, 'execution_handler', 'qts.execution')
+
     # TODO: Add more event classifcations from dt for more QTS actions (__call__)
     def _is_rebalance_event(self, dt):
         """
@@ -129,7 +154,7 @@ class QuantTradingSystem(object):
         `Boolean`
             Whether the timestamp is part of the rebalance schedule.
         """
-        return dt in self.rebalance_schedule
+        return dt in self._rebalance_dts
     
     #!---| QTS Initializations
     def _init_execution_algo(self,**kwargs):
@@ -158,8 +183,7 @@ class QuantTradingSystem(object):
 
         if self.long_only:
             if 'cash_buffer_percentage' not in kwargs:
-                if settings.PRINT_EVENTS:
-                    print(
+                self.tracer.warning(
                     'Long only portfolio specified for Quant Trading System '
                     'but no cash buffer percentage supplied. Default to 0.1.'
                         )
@@ -171,8 +195,7 @@ class QuantTradingSystem(object):
         
         else:
             if 'gross_leverage' not in kwargs:
-                if settings.PRINT_EVENTS:
-                    print(
+                self.tracer.warning(
                     'Long/short leveraged portfolio specified for Quant '
                     'Trading System but no gross leverage percentage supplied. Default to 1.0.'
                     )
@@ -244,8 +267,7 @@ class QuantTradingSystem(object):
             The list of rebalance timestamps.
         """
         if 'rebalance' not in kwargs:
-            if settings.PRINT_EVENTS:
-                print("No specified rebalance. Defaulting rebalancing to 'end_of_month'")
+            self.tracer.warning("No specified rebalance. Defaulting rebalancing to 'end_of_month'")
             kwargs['rebalance'] = 'end_of_month'
         
         if kwargs['rebalance'] == 'weekly':
@@ -272,8 +294,7 @@ class QuantTradingSystem(object):
         `None`
         """
         if self._is_rebalance_event(dt):
-            if settings.PRINT_EVENTS:
-                print("(%s) - trading logic and rebalance" % dt)
+            self.tracer.info("(%s) - trading logic and rebalance", dt)
             # Construct the target portfolio
             rebalance_orders = self.portfolio_construction_model(dt, stats=stats)
             # Execute the orders
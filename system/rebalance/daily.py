@@ -2,6 +2,7 @@ import pandas as pd
 import pytz
 
 from qfengine.system.rebalance.rebalance import Rebalance
+from qfengine.exchange.calendar import as_trading_calendar
 from qfengine import settings
 
 
@@ -9,8 +10,7 @@ from qfengine import settings
 class DailyRebalance(Rebalance):
     """
     Generates a list of rebalance timestamps for pre- or post-market,
-    for all business days (Monday-Friday) between two dates.
-    Does not take into account holiday calendars.
+    for all trading sessions of the exchange calendar between two dates.
     All timestamps produced are set to EDT.
     Parameters
     ----------
@@ -20,6 +20,9 @@ class DailyRebalance(Rebalance):
         The ending timestamp of the rebalance range.
     pre_market : `Boolean`, optional
         Whether to carry out the rebalance at market open/close.
+    trading_calendar : `TradingCalendar` or `str`, optional
+        The trading calendar (or its name) whose sessions are
+        rebalanced on, defaulting to settings.TRADING_CALENDAR.
     """
 
     def __init__(
@@ -30,6 +33,7 @@ class DailyRebalance(Rebalance):
     ):
         self.start_date = start_dt
         self.end_date = end_dt
+        self.calendar = as_trading_calendar(kwargs.get('trading_calendar'))
         self.market_time = self._set_market_time(**kwargs)
         self.rebalances = self._generate_rebalances(**kwargs)
     
@@ -61,13 +65,13 @@ class DailyRebalance(Rebalance):
         `list[pd.Timestamp]`
             The list of rebalance timestamps.
         """
-        rebalance_dates = pd.bdate_range(
-            start=self.start_date, end=self.end_date,
+        rebalance_dates = self.calendar.sessions_in_range(
+            self.start_date, self.end_date
         )
 
         rebalance_times = [
             pd.Timestamp(
-                "%s %s" % (date, self.market_time), tz=settings.TIMEZONE
+                "%s %s" % (date.date(), self.market_time), tz=settings.TIMEZONE
             )
             for date in rebalance_dates
         ]
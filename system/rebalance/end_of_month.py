@@ -1,7 +1,9 @@
+import numpy as np
 import pandas as pd
 import pytz
 
 from qfengine.system.rebalance.rebalance import Rebalance
+from qfengine.exchange.calendar import as_trading_calendar
 from qfengine import settings
 
 
@@ -10,8 +12,8 @@ from qfengine import settings
 class EndOfMonthRebalance(Rebalance):
     """
     Generates a list of rebalance timestamps for pre- or post-market,
-    for the final calendar day of the month between the starting and
-    ending dates provided.
+    for the final trading session of each month between the starting
+    and ending dates provided.
     All timestamps produced are set to EDT.
     Parameters
     ----------
@@ -23,6 +25,9 @@ class EndOfMonthRebalance(Rebalance):
         Whether to carry out the rebalance at market open/close on
         the final day of the month. Defaults to False, i.e at
         market close.
+    trading_calendar : `TradingCalendar` or `str`, optional
+        The trading calendar (or its name) whose sessions are
+        rebalanced on, defaulting to settings.TRADING_CALENDAR.
     """
 
     def __init__(
@@ -33,6 +38,7 @@ class EndOfMonthRebalance(Rebalance):
     ):
         self.start_dt = start_dt
         self.end_dt = end_dt
+        self.calendar = as_trading_calendar(kwargs.get('trading_calendar'))
         self.market_time = self._set_market_time(**kwargs)
         self.rebalances = self._generate_rebalances(**kwargs)
 
@@ -58,22 +64,28 @@ class EndOfMonthRebalance(Rebalance):
 
     def _generate_rebalances(self, **kwargs):
         """
-        Utilise the Pandas date_range method to create the appropriate
-        list of rebalance timestamps.
+        Take the last trading session of every month that ends
+        within the rebalance range.
         Returns
         -------
         `List[pd.Timestamp]`
             The list of rebalance timestamps.
         """
-        rebalance_dates = pd.date_range(
+        month_ends = pd.date_range(
             start=self.start_dt,
             end=self.end_dt,
-            freq='BM'
+            freq='M'
         )
+        sessions = self.calendar.sessions_in_range(self.start_dt, self.end_dt)
+        is_last_of_month = np.append(sessions.month[1:] != sessions.month[:-1], True)
+        rebalance_dates = sessions[is_last_of_month]
+        rebalance_dates = rebalance_dates[
+            rebalance_dates.to_period('M').isin(month_ends.to_period('M'))
+        ]
 
         rebalance_times = [
             pd.Timestamp(
-                "%s %s" % (date, self.market_time), tz=settings.TIMEZONE
+                "%s %s" % (date.date(), self.market_time), tz=settings.TIMEZONE
             )
             for date in rebalance_dates
         ]
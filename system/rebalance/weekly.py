@@ -2,6 +2,7 @@ import pandas as pd
 import pytz
 
 from qfengine.system.rebalance.rebalance import Rebalance
+from qfengine.exchange.calendar import as_trading_calendar
 from qfengine import settings
 
 
@@ -9,7 +10,8 @@ class WeeklyRebalance(Rebalance):
     """
     Generates a list of rebalance timestamps for pre- or post-market,
     for a particular trading day of the week between the starting and
-    ending dates provided.
+    ending dates provided. When that day is an exchange holiday the
+    rebalance moves to the next trading session.
     All timestamps produced are set to EDT.
     Parameters
     ----------
@@ -22,6 +24,9 @@ class WeeklyRebalance(Rebalance):
         to rebalance on once per week.
     pre_market : `Boolean`, optional
         Whether to carry out the rebalance at market open/close.
+    trading_calendar : `TradingCalendar` or `str`, optional
+        The trading calendar (or its name) whose sessions are
+        rebalanced on, defaulting to settings.TRADING_CALENDAR.
     """
 
     def __init__(
@@ -32,6 +37,7 @@ class WeeklyRebalance(Rebalance):
     ):
         self.start_date = start_dt
         self.end_date = end_dt
+        self.calendar = as_trading_calendar(kwargs.get('trading_calendar'))
         self.weekday = self._set_weekday(**kwargs)
         self.pre_market_time = self._set_market_time(**kwargs)
         self.rebalances = self._generate_rebalances(**kwargs)
@@ -57,7 +63,7 @@ class WeeklyRebalance(Rebalance):
         weekday = None
         for wd in ['weekday','rebalance_weekday']:
             try:
-                weekday = kwargs['weekday']
+                weekday = kwargs[wd]
                 break
             except:
                 pass
@@ -95,15 +101,19 @@ class WeeklyRebalance(Rebalance):
         `list[pd.Timestamp]`
             The list of rebalance timestamps.
         """
-        rebalance_dates = pd.date_range(
+        weekdays = pd.date_range(
             start=self.start_date,
             end=self.end_date,
             freq='W-%s' % self.weekday
         )
+        rebalance_dates = self.calendar.next_sessions(weekdays).unique()
+        rebalance_dates = rebalance_dates[
+            rebalance_dates.isin(self.calendar.sessions_in_range(self.start_date, self.end_date))
+        ]
 
         rebalance_times = [
             pd.Timestamp(
-                "%s %s" % (date, self.pre_market_time), tz=settings.TIMEZONE
+                "%s %s" % (date.date(), self.pre_market_time), tz=settings.TIMEZONE
             )
             for date in rebalance_dates
         ]
@@ -0,0 +1,291 @@
+import collections
+import pickle
+import sys
+import time
+
+from qfengine import settings
+
+
+DEBUG = 10
+INFO = 20
+WARNING = 30
+
+LEVEL_NAMES = {
+    DEBUG: 'DEBUG',
+    INFO: 'INFO',
+    WARNING: 'WARNING',
+}
+
+
+class TraceRecord(collections.namedtuple(
+    'TraceRecord', ['ts', 'level', 'name', 'fmt', 'args']
+)):
+    """
+    A single trace event. The message is kept as its format
+    string and arguments and only rendered when it is read.
+    Parameters
+    ----------
+    ts : `int`
+        Wall clock time of the event, in nanoseconds since the epoch.
+    level : `int`
+        The level of the event (DEBUG, INFO or WARNING).
+    name : `str`
+        The name of the tracer (e.g. the session) that emitted it.
+    fmt : `str`
+        The %-style format string of the message.
+    args : `tuple`
+        The arguments of the format string.
+    """
+
+    __slots__ = ()
+
+    @property
+    def message(self):
+        return self.fmt % self.args if self.args else self.fmt
+
+
+class TraceSink(object):
+    """
+    Destination of the trace records emitted by a Tracer.
+    """
+
+    def emit(self, record):
+        raise NotImplementedError("Should implement emit()")
+
+    def close(self):
+        pass
+
+
+class PrintSink(TraceSink):
+    """
+    Renders every record to a stream (standard output by default),
+    prefixed with the tracer name when it has one.
+    Parameters
+    ----------
+    stream : `file`, optional
+        The text stream to write to.
+    """
+
+    def __init__(self, stream=None):
+        self.stream = stream
+
+    def emit(self, record):
+        message = record.message
+        if record.name:
+            message = "[%s]: %s" % (record.name, message)
+        print(message, file=self.stream or sys.stdout)
+
+
+class RingBufferSink(TraceSink):
+    """
+    Keeps the latest capacity records in memory, unrendered.
+    Parameters
+    ----------
+    capacity : `int`, optional
+        The number of records kept, older records are dropped.
+    """
+
+    def __init__(self, capacity=10000):
+        self.capacity = capacity
+        self._records = collections.deque(maxlen=capacity)
+
+    def __len__(self):
+        return len(self._records)
+
+    def emit(self, record):
+        self._records.append(record)
+
+    def records(self):
+        """
+        The buffered records, oldest first.
+        """
+        return list(self._records)
+
+    def messages(self):
+        """
+        The rendered messages of the buffered records, oldest first.
+        """
+        return [record.message for record in self._records]
+
+    def clear(self):
+        self._records.clear()
+
+
+class BinaryFileSink(TraceSink):
+    """
+    Appends every record to a binary file of pickled records, read
+    back with read_trace_file(). Arguments that cannot be pickled
+    are stored rendered.
+    Parameters
+    ----------
+    path : `str`
+        The trace file path.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, 'ab')
+
+    def emit(self, record):
+        try:
+            data = pickle.dumps(record, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception:
+            data = pickle.dumps(
+                record._replace(fmt=record.message, args=()),
+                protocol=pickle.HIGHEST_PROTOCOL
+            )
+        self._file.write(data)
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+
+    #---| Pickling re-opens the same file in the new process
+    def __getstate__(self):
+        return {'path': self.path}
+
+    def __setstate__(self, state):
+        self.__init__(state['path'])
+
+
+def read_trace_file(path):
+    """
+    Iterate over the records written to a BinaryFileSink file.
+    Parameters
+    ----------
+    path : `str`
+        The trace file path.
+    Yields
+    ------
+    `TraceRecord`
+        The records, in the order they were written.
+    """
+    with open(path, 'rb') as f:
+        while True:
+            try:
+                yield pickle.load(f)
+            except EOFError:
+                return
+
+
+class Tracer(object):
+    """
+    Structured event tracing of a trading session. Records at or
+    above level are passed, unformatted, to every sink.
+    Callers pass %-style format strings and their arguments, so a
+    record below the level costs one comparison and no formatting.
+    Hot loops may hoist enabled_for() out of the loop.
+    Parameters
+    ----------
+    sinks : `list[TraceSink]`, optional
+        The sinks receiving the records, defaulting to a PrintSink.
+    level : `int`, optional
+        The minimum level of the emitted records.
+    name : `str`, optional
+        The name attached to the records, e.g. a session name.
+    """
+
+    def __init__(self, sinks=None, level=DEBUG, name=None):
+        self.sinks = list(sinks) if sinks is not None else [PrintSink()]
+        self.level = level
+        self.name = name
+
+    def enabled_for(self, level):
+        """
+        Whether records of level are emitted.
+        """
+        return level >= self.level
+
+    def log(self, level, fmt, *args):
+        if level < self.level:
+            return
+        record = TraceRecord(time.time_ns(), level, self.name, fmt, args)
+        for sink in self.sinks:
+            sink.emit(record)
+
+    def debug(self, fmt, *args):
+        if DEBUG >= self.level:
+            self.log(DEBUG, fmt, *args)
+
+    def info(self, fmt, *args):
+        if INFO >= self.level:
+            self.log(INFO, fmt, *args)
+
+    def warning(self, fmt, *args):
+        if WARNING >= self.level:
+            self.log(WARNING, fmt, *args)
+
+    def named(self, name):
+        """
+        A tracer sharing the sinks and level of this one, with
+        another name.
+        """
+        return Tracer(self.sinks, level=self.level, name=name)
+
+    def close(self):
+        for sink in self.sinks:
+            sink.close()
+
+
+class NullTracer(Tracer):
+    """
+    A Tracer that emits nothing. Every call is a no-op.
+    """
+
+    def __init__(self):
+        self.sinks = []
+        self.level = float('inf')
+        self.name = None
+
+    def enabled_for(self, level):
+        return False
+
+    def log(self, level, fmt, *args):
+        pass
+
+    def debug(self, fmt, *args):
+        pass
+
+    def info(self, fmt, *args):
+        pass
+
+    def warning(self, fmt, *args):
+        pass
+
+    def named(self, name):
+        return self
+
+
+NULL_TRACER = NullTracer()
+
+
+def default_tracer(name=None):
+    """
+    The tracer of components created without one: printing every
+    record when settings.PRINT_EVENTS is set, and the NullTracer
+    otherwise.
+    Parameters
+    ----------
+    name : `str`, optional
+        The name attached to the records.
+    Returns
+    -------
+    `Tracer`
+        The default tracer.
+    """
+    if settings.PRINT_EVENTS:
+        return Tracer([PrintSink()], level=DEBUG, name=name)
+    return NULL_TRACER
+
+
+def as_tracer(tracer=None, name=None):
+    """
+    A Tracer from a tracer instance, or the default tracer for None.
+    """
+    if tracer is None:
+        return default_tracer(name)
+    if not isinstance(tracer, Tracer):
+        raise TypeError(
+            "Provided tracer '%s' is not a Tracer instance." % tracer.__class__
+        )
+    return tracer
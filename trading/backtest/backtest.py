@@ -2,7 +2,7 @@ import os
 
 import pandas as pd
 
-from qfengine import settings
+from qfengine.tracing import DEBUG, INFO, as_tracer
 from qfengine.asset.equity import Equity
 
 from qfengine.asset.universe.static import StaticUniverse
@@ -12,6 +12,7 @@ from qfengine.data.backtest_data_handler import BacktestDataHandler
 from qfengine.data.price.daily_price.daily_price_mysql import DailyPriceMySQL
 from qfengine.exchange.simulated import SimulatedExchange
 from qfengine.simulation.daily_bday import DailyBusinessDaySimulationEngine
+from qfengine.simulation.event_skipping import EventSkippingSimulationEngine
 from qfengine.system.quant_system import QuantTradingSystem
 
 from qfengine.system.rebalance.buy_and_hold import BuyAndHoldRebalance
@@ -61,9 +62,28 @@ class BacktestTradingSession(TradingSession):
             long/short leveraged portfolios. Defaults to long/short leveraged.
         fee_model : `FeeModel` class instance, optional
             The optional FeeModel derived subclass to use for transaction cost estimates.
+        slippage_model : `SlippageModel` class instance, optional
+            The optional SlippageModel derived subclass moving fill prices.
+        market_impact_model : `MarketImpactModel` class instance, optional
+            The optional MarketImpactModel derived subclass moving fill prices.
         burn_in_dt : `pd.Timestamp`, optional
             The optional date provided to begin tracking strategy statistics,
             which is used for strategies requiring a period of data 'burn in'
+        warm_start_signals : `Boolean`, optional
+            Whether to initialise the signals from the historical closes
+            before start_dt in one step, so that they need no 'burn in'
+            period of simulated events. Defaults to False.
+        skip_idle_events : `Boolean`, optional
+            Whether to only simulate the events where the strategy acts
+            (market closes, rebalances and their order fills) with an
+            EventSkippingSimulationEngine. Defaults to all daily events.
+        tracer : `Tracer`, optional
+            The tracer shared by the session, its broker and its quant
+            trading system. Defaults to printing every event when
+            settings.PRINT_EVENTS is set and tracing nothing otherwise.
+        profiler : `Profiler`, optional
+            Times the session components per event type during run().
+            Defaults to no profiling.
     """
     def __init__(self,
                 start_dt=None,
@@ -75,6 +95,10 @@ class BacktestTradingSession(TradingSession):
                 portfolio_name = DEFAULT_PORTFOLIO_NAME,
                 long_only = False,
                 signals = None,
+                skip_idle_events = False,
+                warm_start_signals = False,
+                tracer = None,
+                profiler = None,
                 **kwargs #! QUANT MODELS ---- [ALPHA, RISK, OPTIMIZER, ETC...]
     ):
         #---| Part One - Fixed Vars
@@ -87,6 +111,10 @@ class BacktestTradingSession(TradingSession):
         self.portfolio_name = portfolio_name
         self.long_only = long_only
         self.burn_in_dt = burn_in_dt
+        self.skip_idle_events = skip_idle_events
+        self.warm_start_signals = warm_start_signals
+        self.tracer = as_tracer(tracer)
+        self.profiler = profiler
         self.equity_curve = []
         self.target_allocations = []
 
@@ -99,6 +127,10 @@ class BacktestTradingSession(TradingSession):
    
         #---| Finally - QTS
         self.qts = self._init_quant_trading_system(**kwargs)
+        if isinstance(self.sim_engine, EventSkippingSimulationEngine):
+            self.sim_engine.schedule_rebalances(self.qts.rebalance_schedule, exchange = self.exchange)
+        if self.warm_start_signals and self.signals is not None:
+            self.signals.warm_start(self.start_dt)
 
 
     def _is_rebalance_event(self, dt):
@@ -114,7 +146,7 @@ class BacktestTradingSession(TradingSession):
         `Boolean`
             Whether the timestamp is part of the rebalance schedule.
         """
-        return dt in self.rebalance_schedule
+        return self.qts._is_rebalance_event(dt)
 
     #!---| INIT FUNCTIONS
     def _init_data_handler(self, **kwargs):
@@ -136,11 +168,10 @@ class BacktestTradingSession(TradingSession):
         if 'data_handler' in kwargs:
             data_handler = kwargs['data_handler']
         else:
-            if settings.PRINT_EVENTS:
-                print(
-                    'No assigned data_handler for BTS. '
-                    'Defaulting to BacktestDataHandler with Equity data_sources = [DailyPriceMySQL].'
-                    )
+            self.tracer.warning(
+                'No assigned data_handler for BTS. '
+                'Defaulting to BacktestDataHandler with Equity data_sources = [DailyPriceMySQL].'
+                )
             # TODO: Only equities are supported by QSTrader for now.
             data_handler = BacktestDataHandler(
                 price_data_sources = [DailyPriceMySQL(Equity)]
@@ -158,18 +189,16 @@ class BacktestTradingSession(TradingSession):
         
         if self.start_dt:
             if (self.start_dt < min_start):
-                if settings.PRINT_EVENTS:
-                    print("Assigned 'start_dt' %s is too early for data availability in current data_handler." %self.start_dt)
-                    print("Resetting 'start_dt' = %s" %min_start)
+                self.tracer.warning("Assigned 'start_dt' %s is too early for data availability in current data_handler.", self.start_dt)
+                self.tracer.warning("Resetting 'start_dt' = %s", min_start)
                 self.start_dt = min_start
         else:
             self.start_dt = min_start
 
         if self.end_dt:
             if (self.start_dt > max_end):
-                if settings.PRINT_EVENTS:
-                    print("Assigned 'end_dt' %s is too late for data availability in current data_handler." %self.end_dt)
-                    print("Resetting 'end_dt' = %s" %max_end)
+                self.tracer.warning("Assigned 'end_dt' %s is too late for data availability in current data_handler.", self.end_dt)
+                self.tracer.warning("Resetting 'end_dt' = %s", max_end)
                 self.end_dt = max_end
         else:
             self.end_dt = max_end
@@ -197,10 +226,14 @@ class BacktestTradingSession(TradingSession):
             try:
                 iter(kwargs['sim_engine'])
             except:
-                if settings.PRINT_EVENTS:
-                    print("sim_engine assigned is not iterable. Implement __iter__() when designing it. Defaulting to DailyBusinessDaySimulationEngine.")
+                self.tracer.warning("sim_engine assigned is not iterable. Implement __iter__() when designing it. Defaulting to DailyBusinessDaySimulationEngine.")
             else:
                 sim_engine = kwargs['sim_engine']
+        if sim_engine is None and self.skip_idle_events:
+            sim_engine = EventSkippingSimulationEngine(
+                                self.start_dt, self.end_dt,
+                                **kwargs
+                                            )
         if sim_engine is None:
             sim_engine = DailyBusinessDaySimulationEngine(
                                 self.start_dt, self.end_dt,
@@ -210,11 +243,10 @@ class BacktestTradingSession(TradingSession):
     
     def _init_universe(self, **kwargs):
         if 'universe' not in kwargs:
-            if settings.PRINT_EVENTS:
-                print(
-                    'No assigned universe (universe=None) to QTS. ' 
-                    'Defaulting to full universe from initialized data_handler.'
-                    )
+            self.tracer.warning(
+                'No assigned universe (universe=None) to QTS. ' 
+                'Defaulting to full universe from initialized data_handler.'
+                )
             universe = self.data_handler.universe
         else:
             universe = kwargs['universe']
@@ -233,7 +265,9 @@ class BacktestTradingSession(TradingSession):
         if 'exchange' in kwargs:
             return kwargs['exchange']
         else:
-            return SimulatedExchange(self.start_dt)
+            return SimulatedExchange(
+                self.start_dt, trading_calendar = kwargs.get('trading_calendar')
+            )
 
     def _init_broker(self, **kwargs):
         """
@@ -256,7 +290,10 @@ class BacktestTradingSession(TradingSession):
                 data_handler = self.data_handler,
                 account_id=self.account_name,
                 initial_funds=self.initial_cash,
-                fee_model=fee_model
+                fee_model=fee_model,
+                slippage_model=kwargs.get('slippage_model'),
+                market_impact_model=kwargs.get('market_impact_model'),
+                tracer=self.tracer
             )
         else:
             broker = kwargs['broker']
@@ -286,11 +323,80 @@ class BacktestTradingSession(TradingSession):
                         data_handler = self.data_handler,
                         long_only = self.long_only,
                         submit_orders = True,
+                        tracer = self.tracer,
                         **qts_kwargs
                         
                     )
         return qts
 
+    def set_tracer(self, tracer):
+        """
+        Trace the session, its broker and portfolios and its quant
+        trading system with another tracer.
+        Parameters
+        ----------
+        tracer : `Tracer`
+            The new tracer.
+        """
+        self.tracer = tracer
+        self.broker.tracer = tracer
+        for portfolio in self.broker.portfolios.values():
+            portfolio.tracer = tracer
+        self.qts.set_tracer(tracer)
+
+    #---| price lookups of the data handler timed by a profiler
+    profiled_price_lookups = (
+        'get_assets_latest_bid_ask',
+        'get_assets_latest_bid_ask_matrix',
+        'get_asset_latest_bid_price',
+        'get_asset_latest_ask_price',
+        'get_asset_latest_bid_ask_price',
+        'get_asset_latest_mid_price',
+        'get_assets_latest_mid_prices',
+        'get_assets_historical_opens',
+        'get_assets_historical_closes',
+        'get_assets_historical_highs',
+        'get_assets_historical_lows',
+        'get_assets_historical_volumes',
+    )
+
+    def instrument(self, profiler):
+        """
+        Time the broker, signals, quant trading system and price
+        lookups of the session with a Profiler, and count its cache
+        hits, until profiler.restore().
+        Parameters
+        ----------
+        profiler : `Profiler`
+            The profiler recording the timings.
+        """
+        self.qts.instrument(profiler)
+        profiler.instrument_callable(self, 'qts', 'qts')
+        profiler.instrument_method(self.broker, 'update', 'broker.update')
+        if self.signals is not None:
+            profiler.instrument_method(self.signals, 'update', 'signals.update')
+            profiler.instrument_cache(
+                self.signals, 'cross_section', '_compute_cross_section', 'signals.cross_section'
+            )
+        for name in self.profiled_price_lookups:
+            profiler.instrument_method(self.data_handler, name, 'data_handler.' + name)
+        profiler.instrument_cache(
+            self.data_handler, '_get_bid_ask_index', '_load_bid_ask_index', 'bid_ask_index'
+        )
+        for price_source in getattr(self.data_handler, 'price_data_sources', []):
+            profiler.watch_lru_caches(price_source)
+
+    def _start_profiling(self):
+        if self.profiler is not None:
+            self.profiler.start_run()
+            self.instrument(self.profiler)
+
+    def _end_profiling(self):
+        if self.profiler is not None:
+            self.profiler.end_run()
+            if self.tracer.enabled_for(INFO):
+                self.tracer.info("%s", self.profiler.summary())
+
     def _update_equity_curve(self, dt):
         """
         Update the equity curve values.
@@ -353,46 +459,52 @@ class BacktestTradingSession(TradingSession):
         results : `Boolean`, optional
             Whether to output the current portfolio holdings
         """
-        if settings.PRINT_EVENTS:
-            print("Beginning backtest simulation...")
+        self.tracer.info("Beginning backtest simulation...")
 
         stats = {'target_allocations': []}
-
-        for event in self.sim_engine:
-            # Output the system event and timestamp
-            dt = event.ts
-            if settings.PRINT_EVENTS:
-                print("(%s) - %s" % (dt, event.event_type))
-
-            # Update the simulated broker
-            self.broker.update(dt)
-
-            # Update any signals on a daily basis
-            if self.signals is not None and event.event_type == "market_close":
-                self.signals.update(dt)
-
-            # Run QTS on every event - rebalance config resides in QTS
-            self.qts(dt, stats=stats)
-
-            # Out of market hours we want a daily
-            # performance update, but only if we
-            # are past the 'burn in' period
-            if event.event_type == "market_close":
-                if self.burn_in_dt is not None:
-                    if dt >= self.burn_in_dt:
+        trace_events = self.tracer.enabled_for(DEBUG)
+        profiler = self.profiler
+        self._start_profiling()
+        try:
+            for event in self.sim_engine:
+                # Output the system event and timestamp
+                dt = event.ts
+                if trace_events:
+                    self.tracer.debug("(%s) - %s", dt, event.event_type)
+                if profiler is not None:
+                    profiler.event_type = event.event_type
+
+                # Update the simulated broker
+                self.broker.update(dt)
+
+                # Update any signals on a daily basis
+                if self.signals is not None and event.event_type == "market_close":
+                    self.signals.update(dt)
+
+                # Run QTS on every event - rebalance config resides in QTS
+                self.qts(dt, stats=stats)
+
+                # Out of market hours we want a daily
+                # performance update, but only if we
+                # are past the 'burn in' period
+                if event.event_type == "market_close":
+                    if self.burn_in_dt is not None:
+                        if dt >= self.burn_in_dt:
+                            self._update_equity_curve(dt)
+                    else:
                         self._update_equity_curve(dt)
-                else:
-                    self._update_equity_curve(dt)
 
-        self.target_allocations = stats['target_allocations']
+            self.target_allocations = stats['target_allocations']
+        finally:
+            #---| give back the instrumented components even if the run fails
+            self._end_profiling()
 
         # At the end of the simulation output the
         # portfolio holdings if desired
         if results:
             self.output_holdings()
 
-        if settings.PRINT_EVENTS:
-            print("Ending backtest simulation.")
+        self.tracer.info("Ending backtest simulation.")
 
 
 
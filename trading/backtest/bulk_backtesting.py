@@ -1,11 +1,12 @@
 
 from qfengine.data.backtest_data_handler import BacktestDataHandler
 from qfengine.trading.backtest import BacktestTradingSession
+from qfengine.trading.backtest.vectorized import VectorizedBacktestSession
 from qfengine.statistics.strategy_statistics import StrategyStatistics
 from qfengine.data.price.daily_price.daily_price_mysql import DailyPriceMySQL
 from qfengine.asset.equity import Equity
 from qfengine.asset.universe.static import StaticUniverse
-from qfengine import settings
+from qfengine.tracing import DEBUG, NULL_TRACER, PrintSink, Tracer
 
 from typing import Union, Dict, List, Tuple
 import itertools
@@ -14,39 +15,108 @@ import concurrent.futures
 import os
 
 
+BENCHMARK_SESSION_PARAMS = {'universe': StaticUniverse(['SPY'])}
+
+
+class BacktestDataHandlerSpec(object):
+    """
+        Picklable recipe of a BacktestDataHandler, shipped to worker processes
+        in place of a live handler (whose price sources hold MySQL connections).
+        Each worker builds its handler once and copies it per session.
+        Parameters
+        ----------
+        price_source_class : `PriceDataSource` class, optional
+            Price data source to instantiate in the worker. Defaults to DailyPriceMySQL.
+        price_source_init : `dict`, optional
+            Keyword arguments of price_source_class. Defaults to {'asset_type': Equity}.
+        price_panel_dir : `str`, optional
+            Directory of a DailyPricePanel. When given, workers attach to the
+            memory-mapped panel instead and price_source_class is ignored.
+        universe : `Universe`, optional
+            Universe of the handler.
+    """
+    def __init__(self,
+                 price_source_class = DailyPriceMySQL,
+                 price_source_init:dict = None,
+                 price_panel_dir:str = None,
+                 universe = None,
+    ):
+        self.price_source_class = price_source_class
+        self.price_source_init = price_source_init if price_source_init is not None else {'asset_type': Equity}
+        self.price_panel_dir = price_panel_dir
+        self.universe = universe
+
+    def __call__(self)->BacktestDataHandler:
+        if self.price_panel_dir is not None:
+            return BacktestDataHandler.from_price_panel(
+                                    self.price_panel_dir,
+                                    universe = self.universe,
+                    )
+        return BacktestDataHandler(
+                    price_data_sources = [self.price_source_class(**self.price_source_init)],
+                    universe = self.universe,
+                )
+
+
+class BacktestSessionResult(object):
+    """
+        Outcome of a session ran in a worker process, exposing the same
+        result accessors as BacktestTradingSession.
+    """
+    def __init__(self,
+                 equity_curve:list,
+                 target_allocations:list,
+                 burn_in_dt = None,
+    ):
+        self.equity_curve = equity_curve
+        self.target_allocations = target_allocations
+        self.burn_in_dt = burn_in_dt
+
+    def get_equity_curve(self):
+        equity_df = pd.DataFrame(
+            self.equity_curve, columns=['Date', 'Equity']
+        ).set_index('Date')
+        equity_df.index = equity_df.index.date
+        return equity_df
+
+    def get_target_allocations(self):
+        equity_curve = self.get_equity_curve()
+        alloc_df = pd.DataFrame(self.target_allocations).set_index('Date')
+        alloc_df.index = alloc_df.index.date
+        alloc_df = alloc_df.reindex(index=equity_curve.index, method='ffill')
+        if self.burn_in_dt is not None:
+            alloc_df = alloc_df[self.burn_in_dt:]
+        return alloc_df
+
+
 def _generate_backtest_trading_sessions(
                             BTS_params_grid,
                             data_handler = None,
-                            include_default_benchmark=True
+                            include_default_benchmark=True,
+                            price_panel_dir = None,
+                            session_class = BacktestTradingSession,
 ):
-    def get_bts_name(bts):
-        return ",".join(
-                            [
-            (qts_component + "=" + str(getattr(bts.qts,qts_component)))
-                for qts_component in ['universe','alpha_model', 'risk_model', 'optimizer']
-                            ]
-                    )
-    
-    settings.PRINT_EVENTS = False
     data_handler = data_handler or BacktestDataHandler(
                         price_data_sources = DailyPriceMySQL(Equity),
                                  )
     for s in data_handler.price_data_sources:
         if isinstance(s, DailyPriceMySQL):
-            s.executeSQL("set global max_connections = 50000")
             s.executeSQL("set global innodb_buffer_pool_size = 6000000000")
-    all_params = [
-            dict(zip(BTS_params_grid.keys(), v)) 
-            for v in itertools.product(*BTS_params_grid.values())
-                ]
+    if price_panel_dir is not None:
+        #---| one memory-mapped copy of the prices shared by every session below
+        panel_symbols = data_handler.assetsList()
+        if include_default_benchmark and ('SPY' not in panel_symbols):
+            panel_symbols.append('SPY')
+        data_handler.share_price_panel(price_panel_dir, asset_symbols = panel_symbols)
+    all_params = _generate_backtest_session_params(BTS_params_grid)
     
     BTS = {}
     for kwargs in all_params:
-        new_bts = BacktestTradingSession(
+        new_bts = session_class(
                                     data_handler = data_handler.copy(),
-                                    **kwargs
+                                    **{'tracer': NULL_TRACER, **kwargs}
                                     )
-        new_bts_name = get_bts_name(new_bts)
+        new_bts_name = _get_bts_name(new_bts)
         print("--------------| New Backtest Trading Session Initialized |--------------")
         print(new_bts_name)
         print(new_bts.start_dt, "to", new_bts.end_dt)
@@ -55,28 +125,62 @@ def _generate_backtest_trading_sessions(
         BTS[new_bts_name] = new_bts
 
     if include_default_benchmark:
-        BTS['benchmark'] = BacktestTradingSession(
+        BTS['benchmark'] = session_class(
                             data_handler = data_handler.copy(),
-                            universe = StaticUniverse(['SPY']),
+                            tracer = NULL_TRACER,
+                            **BENCHMARK_SESSION_PARAMS
                 )
-    settings.PRINT_EVENTS = True
     
     return BTS
 
+def _generate_backtest_session_params(
+                            BTS_params_grid,
+)->List[dict]:
+    return [
+            dict(zip(BTS_params_grid.keys(), v)) 
+            for v in itertools.product(*BTS_params_grid.values())
+                ]
+
+def _get_bts_name(bts):
+    return ",".join(
+                        [
+        (qts_component + "=" + str(getattr(bts.qts,qts_component)))
+            for qts_component in ['universe','alpha_model', 'risk_model', 'optimizer']
+                        ]
+                )
+
+def _session_tracer(
+                name = None,
+                print_events = False,
+                tracer = None,
+)->Tracer:
+    # each session gets its own tracer, named after it, instead of a process-wide flag
+    if tracer is not None:
+        return tracer.named(name)
+    if print_events:
+        return Tracer([PrintSink()], level = DEBUG, name = name)
+    return NULL_TRACER
+
 def _run_session(
                 bts,
                 name = None
 ):
-    stats = {'target_allocations': []}
-    if settings.PRINT_EVENTS:
-        print("Beginning backtest simulation...")
+    tracer = bts.tracer
+    if isinstance(bts, VectorizedBacktestSession):
         if name:
-            print('Session: ' + name)
+            tracer.info('Session: %s', name)
+        bts.run()
+        return
+    stats = {'target_allocations': []}
+    tracer.info("Beginning backtest simulation...")
+    if name:
+        tracer.info('Session: %s', name)
+    trace_events = tracer.enabled_for(DEBUG)
     for event in bts.sim_engine:
         # Output the system event and timestamp
         dt = event.ts
-        if settings.PRINT_EVENTS:
-            print("[%s]: (%s) - %s" % (bts.portfolio_id, dt, event.event_type))
+        if trace_events:
+            tracer.debug("(%s) - %s", dt, event.event_type)
 
         bts.broker.update(dt)
 
@@ -96,12 +200,14 @@ def _run_session(
 def _run_backtest_trading_sessions_in_parallel(
                         sessions:Union[List,Dict],
                         print_events = True,
+                        tracer:Tracer = None,
 ):
     if isinstance(sessions, list):
         sessions = {("session_" + str(sessions.index(s))) : s for s in sessions}
     
-    _toreset = settings.PRINT_EVENTS
-    settings.PRINT_EVENTS = print_events
+    _toreset = {name: bts.tracer for name,bts in sessions.items()}
+    for name,bts in sessions.items():
+        bts.set_tracer(_session_tracer(name, print_events = print_events, tracer = tracer))
     t0 = pd.Timestamp.now()
     result = list(
         concurrent.futures.ThreadPoolExecutor().map(
@@ -110,8 +216,71 @@ def _run_backtest_trading_sessions_in_parallel(
                                                     )
                 )
     tf = pd.Timestamp.now()
-    print(tf - t0)
-    settings.PRINT_EVENTS = _toreset
+    _session_tracer('bulk_backtesting', print_events = print_events, tracer = tracer).info(
+                                                    "Ran %s sessions in %s", len(sessions), tf - t0)
+    for name,bts in sessions.items():
+        bts.set_tracer(_toreset[name])
+
+#!---| Process Pool Backend
+_WORKER_DATA_HANDLER = None
+_WORKER_SESSION_CLASS = BacktestTradingSession
+_WORKER_PRINT_EVENTS = False
+_WORKER_TRACER = None
+
+def _init_session_worker(
+                data_handler_spec:BacktestDataHandlerSpec,
+                print_events = False,
+                session_class = BacktestTradingSession,
+                tracer:Tracer = None,
+):
+    global _WORKER_DATA_HANDLER, _WORKER_SESSION_CLASS, _WORKER_PRINT_EVENTS, _WORKER_TRACER
+    _WORKER_DATA_HANDLER = data_handler_spec()
+    _WORKER_SESSION_CLASS = session_class
+    _WORKER_PRINT_EVENTS = print_events
+    _WORKER_TRACER = tracer
+
+def _run_session_from_params(
+                session_params:dict,
+                name = None,
+)->Tuple[str, BacktestSessionResult]:
+    bts = _WORKER_SESSION_CLASS(
+                        data_handler = _WORKER_DATA_HANDLER.copy(),
+                        **{'tracer': NULL_TRACER, **session_params}
+                    )
+    name = name or _get_bts_name(bts)
+    bts.set_tracer(_session_tracer(name, print_events = _WORKER_PRINT_EVENTS, tracer = _WORKER_TRACER))
+    _run_session(bts, name)
+    result = BacktestSessionResult(
+                        equity_curve = bts.equity_curve,
+                        target_allocations = bts.target_allocations,
+                        burn_in_dt = bts.burn_in_dt,
+                    )
+    close_sessions({name: bts})
+    return name, result
+
+def _run_backtest_session_params_in_processes(
+                        session_params:List[Tuple[str, dict]],
+                        data_handler_spec:BacktestDataHandlerSpec,
+                        print_events = False,
+                        max_workers:int = None,
+                        session_class = BacktestTradingSession,
+                        tracer:Tracer = None,
+)->Dict[str, BacktestSessionResult]:
+    # session_params: (name, BacktestTradingSession kwargs) pairs, name = None to derive it from the QTS
+    names = [name for name,_ in session_params]
+    params = [p for _,p in session_params]
+
+    t0 = pd.Timestamp.now()
+    with concurrent.futures.ProcessPoolExecutor(
+                                max_workers = max_workers,
+                                initializer = _init_session_worker,
+                                initargs = (data_handler_spec, print_events, session_class, tracer),
+    ) as executor:
+        result = dict(executor.map(_run_session_from_params, params, names))
+    tf = pd.Timestamp.now()
+    _session_tracer('bulk_backtesting', print_events = print_events, tracer = tracer).info(
+                                                    "Ran %s sessions in %s", len(result), tf - t0)
+    return result
 
 def save_ran_sessions(
                 sessions:Union[List,Dict],
@@ -135,7 +304,8 @@ def close_sessions(
 ):
     for bts in BTS.values():
         for price_source in bts.data_handler.price_data_sources:
-            price_source._conn.close()
+            if hasattr(price_source, 'close_connections'):
+                price_source.close_connections()
 
 
 def run(
@@ -145,22 +315,85 @@ def run(
         include_default_benchmark = True,
         print_events = True,
         save_dir_path = None,
+        price_panel_dir = None,
+        backend = 'thread',
+        data_handler_spec:BacktestDataHandlerSpec = None,
+        max_workers:int = None,
+        session_class = BacktestTradingSession,
+        tracer:Tracer = None,
 )->dict: # returns strategy statistics
+    '''
+        backend = 'thread' runs live BacktestTradingSession objects in a thread pool.
+        backend = 'process' ships only BTS_params_grid points to a process pool;
+        each worker rebuilds its data handler from data_handler_spec (or attaches
+        to the price panel at price_panel_dir, or defaults to MySQL when no
+        data_handler is given either) and returns equity curves and
+        target allocations, so sessions use every core instead of sharing the GIL.
+        session_class = VectorizedBacktestSession runs every grid point (and the
+        benchmark) with the vectorized engine instead of the event-driven one.
+        tracer, when given, is shared (sinks and level) by every session under
+        the session's name; otherwise print_events picks a printing tracer or
+        none. With backend = 'process' each worker gets a pickled copy of it.
+    '''
     #!----------------------------------|
     save_dir_path = os.path.join(
                             os.getcwd(),'backtest_results'
                                 ) if save_dir_path is None else save_dir_path
+    if backend == 'process':
+        assert BTS is None, "backend = 'process' rebuilds sessions in workers, pass BTS_params_grid instead of BTS"
+        assert BTS_params_grid is not None
+        if data_handler_spec is None:
+            if price_panel_dir is not None:
+                if data_handler is not None:
+                    panel_symbols = data_handler.assetsList()
+                    if include_default_benchmark and ('SPY' not in panel_symbols):
+                        panel_symbols.append('SPY')
+                    data_handler.share_price_panel(price_panel_dir, asset_symbols = panel_symbols)
+                data_handler_spec = BacktestDataHandlerSpec(price_panel_dir = price_panel_dir)
+            elif data_handler is not None:
+                #--| a live handler cannot be shipped to workers, nor silently swapped for MySQL
+                raise ValueError(
+                    "backend = 'process' cannot rebuild the given data_handler in workers, "
+                    "pass data_handler_spec or price_panel_dir instead"
+                )
+            else:
+                data_handler_spec = BacktestDataHandlerSpec()
+        session_params = [(None, p) for p in _generate_backtest_session_params(BTS_params_grid)]
+        if include_default_benchmark:
+            session_params.append(('benchmark', BENCHMARK_SESSION_PARAMS))
+        results = _run_backtest_session_params_in_processes(
+                                            session_params,
+                                            data_handler_spec = data_handler_spec,
+                                            print_events = print_events,
+                                            max_workers = max_workers,
+                                            session_class = session_class,
+                                            tracer = tracer,
+                                            )
+        save_ran_sessions(
+                    sessions = results,
+                    save_dir_path = save_dir_path
+                        )
+        return {
+            name: StrategyStatistics(
+                        strategy_equity = result.get_equity_curve(),
+                        title = name
+                                ) for name,result in results.items()
+                }
+
     if BTS is None:
         assert BTS_params_grid is not None
         assert data_handler is not None
         BTS = _generate_backtest_trading_sessions(BTS_params_grid,
                                             data_handler = data_handler,
                                             include_default_benchmark = include_default_benchmark,
+                                            price_panel_dir = price_panel_dir,
+                                            session_class = session_class,
                                             )
 
 
     _run_backtest_trading_sessions_in_parallel(BTS,
                                             print_events = print_events,
+                                            tracer = tracer,
                                             )
 
 
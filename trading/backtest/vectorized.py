@@ -0,0 +1,126 @@
+import numpy as np
+
+from qfengine.trading.backtest.backtest import BacktestTradingSession
+
+
+
+class VectorizedBacktestSession(BacktestTradingSession):
+    """
+        Backtest of the same quant trading system as BacktestTradingSession
+        (universe, alpha model, risk model, optimizer, rebalance schedule,
+        order sizer and fee model) that only does work where the strategy acts.
+
+        The event-driven session updates the broker and calls the QTS on
+        each of the four daily simulation events. Here the broker is only
+        touched at rebalance timestamps, where target weights and orders come
+        from the usual portfolio construction model, and at the next event
+        the exchange is open, where the orders are filled with the usual fee
+        model. Holdings and cash are therefore piecewise constant between
+        fills. The equity curve is marked at every market close with one
+        batched bid/ask lookup over all closes and held assets.
+
+        Takes the same parameters as BacktestTradingSession, and its
+        get_equity_curve() and get_target_allocations() match those of an
+        event-driven session with the same inputs.
+    """
+
+    def run(self, results=False):
+        """
+        Iterate over the simulation events, acting only on rebalances,
+        order fills and (when signals are given) market closes, then mark
+        the equity curve at every market close at once.
+        Parameters
+        ----------
+        results : `Boolean`, optional
+            Whether to output the current portfolio holdings
+        """
+        self.tracer.info("Beginning vectorized backtest simulation...")
+
+        stats = {'target_allocations': []}
+        portfolio = self.broker.portfolios[self.portfolio_id]
+        rebalance_dts = set(self.qts.rebalance_schedule)
+
+        #---| (fill dt value, cash, {asset: quantity}) after every batch of fills
+        holdings = [(np.iinfo(np.int64).min, portfolio.cash, {})]
+        close_dts = []
+        orders_pending = False
+        dt = None
+        profiler = self.profiler
+        self._start_profiling()
+        try:
+            for event in self.sim_engine:
+                dt = event.ts
+                if profiler is not None:
+                    profiler.event_type = event.event_type
+                is_rebalance = dt in rebalance_dts
+                fill_orders = orders_pending and self.exchange.is_open_at_datetime(dt)
+
+                if fill_orders or is_rebalance:
+                    self.broker.update(dt)
+                if fill_orders:
+                    orders_pending = False
+                    holdings.append((
+                        dt.value,
+                        portfolio.cash,
+                        dict(zip(portfolio.pos_handler.assets, portfolio.pos_handler.net_quantities().tolist())),
+                    ))
+
+                if self.signals is not None and event.event_type == "market_close":
+                    self.signals.update(dt)
+
+                if is_rebalance:
+                    self.qts(dt, stats=stats)
+                    orders_pending = any(
+                        not orders.empty() for orders in self.broker.open_orders.values()
+                    )
+
+                if event.event_type == "market_close":
+                    if (self.burn_in_dt is None) or (dt >= self.burn_in_dt):
+                        close_dts.append(dt)
+
+            if profiler is not None:
+                profiler.event_type = 'mark_to_market'
+            self.equity_curve = list(zip(close_dts, self._mark_to_market(close_dts, holdings)))
+            self.target_allocations = stats['target_allocations']
+
+            if dt is not None:
+                self.broker.update(dt)
+        finally:
+            #---| give back the instrumented components even if the run fails
+            self._end_profiling()
+        if results:
+            self.output_holdings()
+
+        self.tracer.info("Ending vectorized backtest simulation.")
+
+    def _mark_to_market(self, dts, holdings):
+        """
+        Total equity at each of dts from the holdings in effect at that time.
+        Parameters
+        ----------
+        dts : `list[pd.Timestamp]`
+            The (sorted) timestamps to mark the portfolio at.
+        holdings : `list[tuple]`
+            (fill dt value, cash, {asset: quantity}) sorted by fill time.
+        Returns
+        -------
+        `np.ndarray`
+            The total equity at each of dts.
+        """
+        if len(dts) == 0:
+            return np.empty(0, dtype = np.float64)
+        assets = sorted(set().union(*[h[2].keys() for h in holdings]))
+        which = np.searchsorted(
+                    np.array([h[0] for h in holdings], dtype = np.int64),
+                    np.array([dt.value for dt in dts], dtype = np.int64),
+                    side = 'right'
+        ) - 1
+        cash = np.array([h[1] for h in holdings], dtype = np.float64)[which]
+        if len(assets) == 0:
+            return cash
+        quantities = np.array(
+                    [[h[2].get(a, 0.0) for a in assets] for h in holdings], dtype = np.float64
+        )[which]
+        bids, asks = self.data_handler.get_assets_latest_bid_ask_matrix(dts, assets)
+        market_values = np.where(quantities != 0.0, quantities * (bids + asks) / 2.0, 0.0)
+        return cash + market_values.sum(axis = 1)